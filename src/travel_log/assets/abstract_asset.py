@@ -1,14 +1,29 @@
 import abc
 import os
-from dataclasses import dataclass
-from functools import cached_property
-from typing import TypeVar, Type
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple, Optional, TypeVar, Type
+
+from travel_log.utils.dataclass_utils import add_slots
 
 T = TypeVar('T', bound='AbstractAsset')
 
 
+class FileStat(NamedTuple):
+    """
+    The metadata of a file used to tell if it changed (by the caches), without reading it.
+    """
+
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, stat: os.stat_result) -> 'FileStat':
+        return cls(stat.st_size, stat.st_mtime_ns)
+
+
 # Trick to enable type hinting on dataclass inheritance:
 # from https://github.com/python/mypy/issues/5374#issuecomment-650656381
+@add_slots
 @dataclass
 class _AbstractAsset(abc.ABC):
     path: str
@@ -22,6 +37,11 @@ class _AbstractAsset(abc.ABC):
     """
     is_read_only: bool = True
 
+    """
+    Cache for `file_stat`. Filled by the AssetScanner, which already has it.
+    """
+    _file_stat: Optional[FileStat] = field(default=None, init=False, repr=False, compare=False)
+
 
 class AbstractAsset(_AbstractAsset, abc.ABC):
     """
@@ -32,26 +52,70 @@ class AbstractAsset(_AbstractAsset, abc.ABC):
 
     Properties:
         * filename: the filename (extracted from the path)
+        * extension: the extension of the file, lower case and without the dot
+        * file_stat: the size and modification time of the file
         * allowed_extensions: a list of extensions allowed
+
+    Slotted (no `__dict__`), so subclasses with many instances alive at once (pictures) can be
+    slotted as well.
     """
 
+    __slots__ = ()
+
     @classmethod
     def from_folder_path(cls: Type[T], folder_path: str) -> list[T]:
-        objects: list[T] = []
-
-        for filename in os.listdir(folder_path):
-            extension = filename.split('.')[-1]
+        return cls.from_filenames(folder_path, os.listdir(folder_path))
 
-            if extension in cls.allowed_extensions():
-                objects.append(cls(os.path.join(folder_path, filename)))
+    @classmethod
+    def from_filenames(cls: Type[T], folder_path: str, filenames: Iterable[str]) -> list[T]:
+        """
+        Same as `from_folder_path`, for an already known list of filenames in the folder.
+        """
+        return [
+            cls(os.path.join(folder_path, filename))
+            for filename in filenames
+            if cls.accepts(filename)
+        ]
 
-        return objects
+    @classmethod
+    def accepts(cls, filename: str) -> bool:
+        """
+        :return: if the file has one of the allowed extensions (case insensitive, so `IMG.JPG`
+        from cameras is a picture as well)
+        """
+        return extension_of(filename) in cls.allowed_extensions()
 
-    @cached_property
+    @property
     def filename(self) -> str:
         return os.path.basename(self.path)
 
+    @property
+    def extension(self) -> str:
+        return extension_of(self.path)
+
+    @property
+    def file_stat(self) -> FileStat:
+        if self._file_stat is None:
+            self._file_stat = FileStat.of(os.stat(self.path))
+
+        return self._file_stat
+
+    @file_stat.setter
+    def file_stat(self, value: FileStat) -> None:
+        """
+        Sets the stat already known (eg: from listing the folder), so the file is not stat'ed
+        again.
+        """
+        self._file_stat = value
+
     @classmethod
     @abc.abstractmethod
     def allowed_extensions(cls) -> list[str]:
         ...
+
+
+def extension_of(filename: str) -> str:
+    """
+    :return: the extension of the file, lower case and without the dot (empty if there is none)
+    """
+    return os.path.splitext(filename)[1][1:].lower()
@@ -0,0 +1,75 @@
+import os
+from typing import Iterable, Optional, Type
+
+from travel_log.assets.abstract_asset import AbstractAsset, FileStat, extension_of
+
+
+class AssetScanner:
+    """
+    Finds the assets of a folder (and of its sub folders), listing each folder only once.
+
+    Each file is dispatched to the asset type registered for its extension (case insensitive).
+    The stat of each asset (size and modification time) comes from the listing, so the caches
+    can tell if it changed without any other system call on the file.
+
+    Hidden files and folders (starting with a dot, such as `.DS_Store` or the `._IMG.JPG`
+    metadata files created by macOS on external drives) are skipped.
+    """
+
+    def __init__(self, asset_types: Iterable[Type[AbstractAsset]] = ()):
+        # extension (lower case, without the dot) -> asset type
+        self.registry: dict[str, Type[AbstractAsset]] = {}
+
+        for asset_type in asset_types:
+            self.register(asset_type)
+
+    def register(self, asset_type: Type[AbstractAsset]) -> None:
+        for extension in asset_type.allowed_extensions():
+            extension = extension.lower()
+            registered = self.registry.get(extension)
+
+            if registered and registered is not asset_type:
+                raise RuntimeError(
+                    f'Extension {extension} is already registered for {registered.__name__}'
+                )
+
+            self.registry[extension] = asset_type
+
+    def asset_type_for(self, filename: str) -> Optional[Type[AbstractAsset]]:
+        return self.registry.get(extension_of(filename))
+
+    def scan(self, folder_path: str, *, recursive: bool = True) -> list[AbstractAsset]:
+        """
+        :param folder_path: the folder to be scanned
+        :param recursive: also scan the sub folders (at any depth)
+        :return: the assets found, sorted by their path (relative to the folder). Files of
+        extensions not registered are ignored.
+        """
+        assets: list[AbstractAsset] = []
+        folders = [folder_path]
+
+        while folders:
+            current_folder = folders.pop()
+
+            with os.scandir(current_folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+
+                    if entry.is_dir():
+                        if recursive:
+                            folders.append(entry.path)
+                        continue
+
+                    asset_type = self.asset_type_for(entry.name)
+
+                    if asset_type is None or not entry.is_file():
+                        continue
+
+                    asset = asset_type(entry.path)
+                    # Free on Windows (part of the listing), one call elsewhere (and cached by
+                    # the entry)
+                    asset.file_stat = FileStat.of(entry.stat())
+                    assets.append(asset)
+
+        return sorted(assets, key=lambda asset: os.path.relpath(asset.path, folder_path))
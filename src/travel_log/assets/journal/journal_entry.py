@@ -1,3 +1,4 @@
 """
-To be added. For now, the "journal" is simply an entry on the day.yaml files
+To be added. For now, the "journal" is simply an entry on the day.yaml files (the summary of the
+day), rendered as Markdown (see MarkdownRenderer)
 """
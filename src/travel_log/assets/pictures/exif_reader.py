@@ -0,0 +1,201 @@
+"""
+A minimal EXIF reader, for the few tags we need on every picture (the GPS coordinates).
+
+Only the beginning of the file is read (until the APP1 segment, which comes right after the start
+of the JPEG), and only the GPS IFD is decoded. The `exif` library, used for everything else, reads
+the whole file and decodes every tag, which is much slower.
+"""
+
+import struct
+from typing import BinaryIO, Optional
+
+JPEG_START_OF_IMAGE = b'\xff\xd8'
+JPEG_APP1 = 0xE1
+JPEG_START_OF_SCAN = 0xDA
+JPEG_END_OF_IMAGE = 0xD9
+
+# Markers that are not followed by a length (and a payload)
+JPEG_MARKERS_WITHOUT_LENGTH = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+EXIF_HEADER = b'Exif\x00\x00'
+
+TAG_GPS_IFD = 0x8825
+TAG_ORIENTATION = 0x0112
+
+# GPS tag id -> name (same names used by the `exif` library)
+GPS_TAGS = {
+    0x0001: 'gps_latitude_ref',
+    0x0002: 'gps_latitude',
+    0x0003: 'gps_longitude_ref',
+    0x0004: 'gps_longitude',
+}
+
+TYPE_ASCII = 2
+TYPE_SHORT = 3
+TYPE_LONG = 4
+TYPE_RATIONAL = 5
+
+# TIFF type -> size (in bytes) of each value
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+
+
+class ExifReaderError(ValueError):
+    """
+    The EXIF metadata could not be decoded (not a JPEG, corrupted, unsupported, etc).
+    """
+
+
+def read_app1_exif(file: BinaryIO) -> Optional[bytes]:
+    """
+    Walks the segments at the beginning of a JPEG file (without reading their content) until
+    the EXIF APP1 segment.
+
+    :return: the content of the EXIF segment (a TIFF structure), or None if there is none
+    """
+    if file.read(2) != JPEG_START_OF_IMAGE:
+        raise ExifReaderError('Not a JPEG file')
+
+    while True:
+        byte = file.read(1)
+
+        if not byte:
+            return None
+
+        if byte != b'\xff':
+            raise ExifReaderError('Invalid JPEG marker')
+
+        marker = file.read(1)
+
+        # Markers can be padded with any number of 0xFF
+        while marker == b'\xff':
+            marker = file.read(1)
+
+        if not marker:
+            return None
+
+        marker_type = marker[0]
+
+        if marker_type in JPEG_MARKERS_WITHOUT_LENGTH:
+            continue
+
+        if marker_type in (JPEG_START_OF_SCAN, JPEG_END_OF_IMAGE):
+            # The image data starts, there is no more metadata
+            return None
+
+        length_bytes = file.read(2)
+
+        if len(length_bytes) < 2:
+            return None
+
+        (length,) = struct.unpack('>H', length_bytes)
+
+        if marker_type == JPEG_APP1:
+            content = file.read(length - 2)
+
+            if content.startswith(EXIF_HEADER):
+                return content.removeprefix(EXIF_HEADER)
+        else:
+            file.seek(length - 2, 1)
+
+
+class _TiffReader:
+    def __init__(self, data: bytes):
+        if data[:2] == b'II':
+            self.byte_order = '<'
+        elif data[:2] == b'MM':
+            self.byte_order = '>'
+        else:
+            raise ExifReaderError('Invalid TIFF header')
+
+        self.data = data
+
+    def unpack(self, struct_format: str, offset: int) -> tuple:
+        try:
+            return struct.unpack_from(self.byte_order + struct_format, self.data, offset)
+        except struct.error as error:
+            raise ExifReaderError(f'Truncated EXIF data: {error}')
+
+    @property
+    def first_ifd_offset(self) -> int:
+        magic, offset = self.unpack('HI', 2)
+
+        if magic != 42:
+            raise ExifReaderError('Invalid TIFF header')
+
+        return offset
+
+    def entries(self, ifd_offset: int):
+        """
+        Iterates over the entries of an IFD.
+
+        :return: an iterator of (tag, type, count, offset of the value)
+        """
+        (count,) = self.unpack('H', ifd_offset)
+
+        for index in range(count):
+            entry_offset = ifd_offset + 2 + index * 12
+            tag, value_type, value_count = self.unpack('HHI', entry_offset)
+            size = TYPE_SIZES.get(value_type, 1) * value_count
+
+            # Values of up to 4 bytes are stored in the entry itself
+            if size <= 4:
+                value_offset = entry_offset + 8
+            else:
+                (value_offset,) = self.unpack('I', entry_offset + 8)
+
+            yield tag, value_type, value_count, value_offset
+
+    def value(self, value_type: int, count: int, offset: int):
+        if value_type == TYPE_ASCII:
+            end = offset + count
+            return self.data[offset:end].split(b'\x00')[0].decode('ascii', 'replace')
+
+        if value_type == TYPE_SHORT:
+            return self.unpack(f'{count}H', offset)
+
+        if value_type == TYPE_LONG:
+            return self.unpack(f'{count}I', offset)
+
+        if value_type == TYPE_RATIONAL:
+            values = self.unpack(f'{count * 2}I', offset)
+            pairs = zip(values[0::2], values[1::2])
+
+            return tuple(
+                numerator / denominator if denominator else float('nan')
+                for numerator, denominator in pairs
+            )
+
+        return None
+
+
+def read_gps(file: BinaryIO) -> dict:
+    """
+    Reads the GPS tags (latitude and longitude, with their references) of a JPEG file.
+
+    :param file: the JPEG file, opened in binary mode
+    :return: a dict with the tags found (named as in the `exif` library, see GPS_TAGS). Empty if
+    the picture has no EXIF metadata or no GPS information.
+    """
+    data = read_app1_exif(file)
+
+    if not data:
+        return {}
+
+    tiff = _TiffReader(data)
+    gps_ifd_offset = None
+
+    for tag, value_type, count, value_offset in tiff.entries(tiff.first_ifd_offset):
+        if tag == TAG_GPS_IFD:
+            gps_ifd_offset = tiff.value(value_type, count, value_offset)[0]
+            break
+
+    if gps_ifd_offset is None:
+        return {}
+
+    gps = {}
+
+    for tag, value_type, count, value_offset in tiff.entries(gps_ifd_offset):
+        if tag in GPS_TAGS:
+            gps[GPS_TAGS[tag]] = tiff.value(value_type, count, value_offset)
+
+    return gps
@@ -1,34 +1,123 @@
-from dataclasses import dataclass
-from functools import cached_property
+import logging
+import math
+from dataclasses import dataclass, field
 from typing import Optional
 
 import exif
+from PIL import Image
 from travel_log.assets.abstract_asset import AbstractAsset
+from travel_log.assets.pictures.exif_reader import (
+    GPS_TAGS,
+    TAG_ORIENTATION,
+    ExifReaderError,
+    read_gps,
+)
 from travel_log.models.coordinates import Coordinates
+from travel_log.utils.dataclass_utils import add_slots
+from travel_log.utils.file_links import break_hardlink
 from travel_log.utils.geospatial_utils import convert_degrees_to_decimal
 
 PICTURES_ALLOWED_EXTENSIONS = ['jpg', 'jpeg']
 
+logger = logging.getLogger(__name__)
 
+# The orientations (EXIF) of the pictures displayed rotated by 90 degrees
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+@add_slots
 @dataclass
 class Picture(AbstractAsset):
     """
     A picture. Can have coordinates on the EXIF metadata.
+
+    Slotted, since there can be tens of thousands of them alive at once (the caches below are
+    slots as well, instead of cached properties).
     """
 
     is_exif_coordinates_ignored: bool = False
 
+    """
+    Caches for `exif`, `gps` and `dimensions`, filled on first access.
+    """
+    _exif: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _gps: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _dimensions: Optional[tuple[int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     @classmethod
     def allowed_extensions(cls) -> list[str]:
         return PICTURES_ALLOWED_EXTENSIONS
 
-    @cached_property
+    @property
     def exif(self) -> dict:
-        # The library returns an object, but we want a dict
-        with open(self.path, 'rb') as file:
-            image = exif.Image(file)
+        """
+        All the EXIF tags of the picture. Slow: the whole file is read and every tag decoded, so
+        prefer `gps` (or `coordinates`) when only the location is needed.
+        """
+        if self._exif is None:
+            # The library returns an object, but we want a dict
+            with open(self.path, 'rb') as file:
+                image = exif.Image(file)
+
+            self._exif = {attribute: image.get(attribute) for attribute in image.list_all()}
 
-        return {attribute: image.get(attribute) for attribute in image.list_all()}
+        return self._exif
+
+    @property
+    def gps(self) -> dict:
+        """
+        The GPS tags of the picture (see `exif_reader.GPS_TAGS`), read from the beginning of
+        the file only.
+        """
+        if self._gps is None:
+            try:
+                with open(self.path, 'rb') as file:
+                    self._gps = read_gps(file)
+            except ExifReaderError:
+                # Falls back to the (slower, but more lenient) exif library
+                self._gps = {
+                    tag: self.exif[tag]
+                    for tag in GPS_TAGS.values()
+                    if self.exif.get(tag) is not None
+                }
+
+        return self._gps
+
+    @gps.setter
+    def gps(self, value: dict) -> None:
+        """
+        Sets the GPS tags already known (eg: from a cache), so the file is not read.
+        """
+        self._gps = value
+
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        """
+        The (width, height) of the picture as displayed (with the EXIF orientation applied),
+        read from the beginning of the file only. (0, 0) if the file could not be read.
+        """
+        if self._dimensions is None:
+            try:
+                with Image.open(self.path) as image:
+                    width, height = image.size
+
+                    if image.getexif().get(TAG_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+                        width, height = height, width
+            except OSError:
+                width, height = 0, 0
+
+            self._dimensions = (width, height)
+
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, value: tuple[int, int]) -> None:
+        """
+        Sets the dimensions already known (eg: from a cache), so the file is not read.
+        """
+        self._dimensions = value
 
     @property
     def coordinates(self) -> Optional[Coordinates]:
@@ -40,22 +129,29 @@ class Picture(AbstractAsset):
         if self.is_exif_coordinates_ignored:
             return None
 
-        return self._exif_coordinates
+        return self.exif_coordinates
 
-    @cached_property
-    def _exif_coordinates(self) -> Optional[Coordinates]:
+    @property
+    def exif_coordinates(self) -> Optional[Coordinates]:
+        """
+        The coordinates in the EXIF metadata, even if ignored (eg: to check the privacy zones
+        again).
+        """
         try:
             longitude = convert_degrees_to_decimal(
-                self.exif['gps_longitude'], self.exif['gps_latitude_ref']
+                self.gps['gps_longitude'], self.gps['gps_longitude_ref']
             )
             latitude = convert_degrees_to_decimal(
-                self.exif['gps_latitude'], self.exif['gps_longitude_ref']
+                self.gps['gps_latitude'], self.gps['gps_latitude_ref']
             )
+        except (KeyError, IndexError, TypeError):
+            return None
 
-            return Coordinates(longitude, latitude)
-        except KeyError:
+        if math.isnan(longitude) or math.isnan(latitude):
             return None
 
+        return Coordinates(longitude, latitude)
+
     def remove_exif_coordinates(self) -> None:
         """
         Actually removes the EXIF coordinates from the underlying file.
@@ -66,7 +162,7 @@ class Picture(AbstractAsset):
         if self.is_read_only:
             raise RuntimeError('Abort! Trying to remove exif coordinates from a read_only asset.')
 
-        print(f'Removing EXIF coordinates for Picture {self.path}')
+        logger.info('Removing EXIF coordinates of %s', self.path, extra={'picture': self.path})
 
         with open(self.path, 'rb') as file:
             image = exif.Image(file)
@@ -74,9 +170,15 @@ class Picture(AbstractAsset):
         del image.gps_latitude
         del image.gps_longitude
 
+        # Written in place: the other names of the file (eg: a cached rendition, if this is an
+        # output linked to it) must not be modified
+        break_hardlink(self.path)
+
         with open(self.path, 'wb') as file:
             file.write(image.get_file())
 
+        self._exif, self._gps = None, None
+
     def ignore_exif_coordinates(self) -> None:
         """
         Does not remove the EXIF coordinates from the underlying file, but
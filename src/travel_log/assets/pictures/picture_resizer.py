@@ -1,111 +1,275 @@
+import logging
 import os
-import shutil
-from hashlib import md5
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
 
 from PIL import Image
 
+from travel_log.assets.pictures.exif_reader import TAG_GPS_IFD
 from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.rendition_cache import (
+    EXIF_POLICY_KEEP,
+    EXIF_POLICY_STRIP_GPS,
+    FORMAT_EXTENSIONS,
+    FORMAT_JPEG,
+    FORMAT_WEBP,
+    RenditionCache,
+)
+from travel_log.utils.file_links import LINK_STRATEGY_AUTO, link_file
 
-THUMBNAIL_SIZE = (150, 150)
-FULL_SIZE = (1600, 1600)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """
+    A resized version of a picture. The picture is resized to fit inside `size` (keeping its
+    aspect ratio) and saved in the given `image_format` (JPEG or WebP) with the given `quality`.
+
+    The name is used to group the renditions in the output folder (eg: pictures/<date>/<name>/).
+    """
+
+    name: str
+    size: tuple[int, int]
+    quality: int = 75
+    image_format: str = FORMAT_JPEG
+
+    def cache_key(self, exif_policy: str = EXIF_POLICY_KEEP) -> str:
+        return RenditionCache.rendition_key(self.size, self.quality, exif_policy, self.image_format)
+
+    def output_filename(self, filename: str) -> str:
+        """
+        :return: the name of the rendition of a picture. JPEG renditions keep the name of the
+        original, others get their extension appended (eg: picture.jpg.webp), so pictures with
+        the same name but different extensions do not collide.
+        """
+        if self.image_format == FORMAT_JPEG:
+            return filename
+
+        return f'{filename}.{FORMAT_EXTENSIONS[self.image_format]}'
+
+    def output_size(self, dimensions: tuple[int, int]) -> tuple[int, int]:
+        """
+        :param dimensions: the (width, height) of the original picture
+        :return: the (width, height) of the rendition (pictures are never enlarged). The size of
+        the rendition itself, if the dimensions of the original are unknown.
+        """
+        width, height = dimensions
+
+        if not width or not height:
+            return self.size
+
+        scale = min(self.size[0] / width, self.size[1] / height, 1)
+
+        return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+THUMBNAIL = Rendition('thumbnail', (150, 150))
+FULL = Rendition('full', (1600, 1600))
+
+# The widths (between the thumbnail and the full size) of the pictures on the srcset of the pages
+DEFAULT_RESPONSIVE_WIDTHS = (320, 640, 1024)
+
+
+def responsive_renditions(
+    full: Rendition = FULL,
+    thumbnail: Rendition = THUMBNAIL,
+    widths: Iterable[int] = DEFAULT_RESPONSIVE_WIDTHS,
+) -> tuple[Rendition, ...]:
+    """
+    :return: the full size and the thumbnail renditions (JPEG: linked by the pages and used by
+    the maps, and the fallback of the browsers without WebP), plus a WebP rendition with the
+    size of each of them and each of the widths in between (named after its width, eg:
+    webp-640), to be picked by the browsers (srcset) depending on the screen
+    """
+    ladder = sorted(
+        {full.size[0], thumbnail.size[0]}
+        | {width for width in widths if thumbnail.size[0] < width < full.size[0]}
+    )
+
+    return (
+        full,
+        thumbnail,
+        *(Rendition(f'webp-{width}', (width, width), image_format=FORMAT_WEBP) for width in ladder),
+    )
+
+
+DEFAULT_RENDITIONS = responsive_renditions()
 
 
 class PictureResizer:
     @classmethod
     def generate_full_size(
-        cls, picture: Picture, output_path: str, *, cache_folder: str = None
+        cls, picture: Picture, output_path: str, *, cache: Optional[RenditionCache] = None
     ) -> None:
         """
-        Generates a thumbnail and saves it with the same original filename on the
-        given output_folder.
-
-        For the caching behavior, see the `generate_thumbnail` docs.
+        Generates the full size version and saves it on the given output_path.
 
+        For the caching behavior, see the `generate_renditions` docs.
         """
-        cls._generate_with_cache(
-            picture, output_path, FULL_SIZE, cache_folder=cache_folder, cache_prefix='full'
-        )
+        cls.generate_renditions(picture, {FULL: output_path}, cache=cache)
 
     @classmethod
     def generate_thumbnail(
-        cls, picture: Picture, output_path: str, *, cache_folder: str = None
+        cls, picture: Picture, output_path: str, *, cache: Optional[RenditionCache] = None
     ) -> None:
         """
-        Generates a thumbnail and saves it with the same original filename on the
-        given output_folder.
-
-        If a cache folder is provided, it first looks for a cached thumbnail there before
-        generating one. If the cache exists, the cached version is copied to the output_folder.
+        Generates a thumbnail and saves it on the given output_path.
 
-        To preserve the original filename in the cache but still avoid naming conflicts with
-        the same filename from different trip days, we add the cached thumbnail on a subfolder.
-        The original path (with filename) is hashed to create the subfolder name and the cached
-        thumbnail is stored there with the original file name.
-
-        :param picture: the picture to be resized
-        :param output_path: str with a path (including file name) where the picture should be saved
-        :param cache_folder: optional path to a cache folder
-        :return: none
+        For the caching behavior, see the `generate_renditions` docs.
         """
-
-        cls._generate_with_cache(
-            picture,
-            output_path,
-            THUMBNAIL_SIZE,
-            cache_folder=cache_folder,
-            cache_prefix='thumbnail',
-        )
+        cls.generate_renditions(picture, {THUMBNAIL: output_path}, cache=cache)
 
     @classmethod
-    def _generate_with_cache(
+    def generate_renditions(
         cls,
         picture: Picture,
-        output_path: str,
-        size,
+        output_paths: Mapping[Rendition, str],
         *,
-        cache_folder: str = None,
-        cache_prefix: str = None,
-    ) -> None:
-        if cache_folder:
-            original_full_path = os.path.join(picture.path, picture.filename)
-            hashed_path = md5(original_full_path.encode())
+        cache: Optional[RenditionCache] = None,
+        exif_policy: str = EXIF_POLICY_KEEP,
+        link_strategy: str = LINK_STRATEGY_AUTO,
+    ) -> int:
+        """
+        Generates all the given renditions of a picture, decoding the original file only once.
+
+        If a cache is provided, it first looks for cached renditions there before generating
+        them. Only the missing ones are generated (and added to the cache), and all of them are
+        then put on their output paths according to the `link_strategy` (hardlinked or
+        reflinked if possible, see `link_file`). Renditions are never modified once encoded, so
+        the outputs can share the files of the cache. The cache is keyed by the content of the
+        original picture and the rendition parameters (see `RenditionCache`).
+
+        :param picture: the picture to be resized
+        :param output_paths: the path (including file name) where each rendition should be saved
+        :param cache: optional cache (or a view of it, see `RenditionCache.view_for`)
+        :param exif_policy: what is kept from the EXIF metadata of the original (eg:
+        EXIF_POLICY_STRIP_GPS for pictures inside privacy zones). Applied when the renditions
+        are encoded, so the files are never rewritten afterwards.
+        :param link_strategy: how cached renditions are put on their output paths (see
+        LINK_STRATEGIES)
+        :return: the number of renditions generated (the others were found in the cache)
+        """
+        if not cache:
+            cls._generate_resized(picture, output_paths, exif_policy)
+            return len(output_paths)
+
+        digest = cache.source_digest(picture.path)
+        keys = {rendition: rendition.cache_key(exif_policy) for rendition in output_paths}
 
-            cached_full_path = os.path.join(
-                cache_folder, hashed_path.hexdigest(), cache_prefix or '', picture.filename
+        missing = {
+            rendition: cache.path_for(digest, key)
+            for rendition, key in keys.items()
+            if not cache.contains(digest, key)
+        }
+
+        if missing:
+            for cached_path in missing.values():
+                os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+
+            cls._generate_resized(picture, missing, exif_policy)
+
+            for rendition in missing:
+                cache.add(digest, keys[rendition])
+
+            logger.info(
+                'Generated %d renditions of %s',
+                len(missing),
+                picture.filename,
+                extra={'picture': picture.path, 'renditions': len(missing)},
             )
+        else:
+            logger.debug(
+                'Renditions of %s found in the cache',
+                picture.filename,
+                extra={'picture': picture.path, 'renditions': 0},
+            )
+
+        generated = len(missing)
 
+        for rendition, output_path in output_paths.items():
             try:
-                shutil.copyfile(cached_full_path, output_path)
-                print(f'[Picture] Cache for {picture.filename} used')
-                return
+                link_file(cache.path_for(digest, keys[rendition]), output_path, link_strategy)
             except FileNotFoundError:
-                try:
-                    os.makedirs(Path(cached_full_path).parent)
-                except FileExistsError:
-                    pass
+                # The index was out of sync with the disk (eg: files removed by hand)
+                cache.forget(digest, keys[rendition])
+                generated += cls.generate_renditions(
+                    picture,
+                    {rendition: output_path},
+                    cache=cache,
+                    exif_policy=exif_policy,
+                    link_strategy=link_strategy,
+                )
+                continue
 
-                cls._generate_resized(picture, size, cached_full_path)
-                print(f'[Picture] Cache for {picture.filename} generated')
+            if rendition not in missing:
+                cache.touch(digest, keys[rendition])
 
-                shutil.copyfile(cached_full_path, output_path)
-                return
-
-        cls._generate_resized(picture, size, output_path)
+        return generated
 
     @staticmethod
-    def _generate_resized(picture: Picture, size: tuple[int, int], full_output_path: str) -> None:
+    def _generate_resized(
+        picture: Picture, output_paths: Mapping[Rendition, str], exif_policy: str = EXIF_POLICY_KEEP
+    ) -> None:
         """
-        Internal method used to actually generate and save the resized image.
-        Extracted to an internal method to allow for reuse within the cache logic.
+        Internal method used to actually generate and save the resized images.
 
-        :param full_output_path: path with filename
+        The original is decoded once, already scaled down by the JPEG decoder (DCT scaling,
+        by a factor of up to 8) to the smallest size still bigger than the largest rendition.
+        Each rendition is then resized from the previous (bigger) one, so the work done per
+        rendition decreases with its size.
+
+        :param output_paths: path with filename for each rendition
         :return: None
         """
+        renditions = sorted(
+            output_paths, key=lambda rendition: rendition.size[0] * rendition.size[1], reverse=True
+        )
+
+        with Image.open(picture.path) as image:
+            # If you are not explicit with EXIF, pillow will not preserve it
+            # https://stackoverflow.com/a/17047039/3950305
+            exif = image.info.get('exif')
+
+            if exif_policy not in (EXIF_POLICY_KEEP, EXIF_POLICY_STRIP_GPS):
+                raise RuntimeError(f'Unknown EXIF policy: {exif_policy}')
+
+            if exif and exif_policy == EXIF_POLICY_STRIP_GPS:
+                # The whole GPS IFD (and not only the coordinates) is left out, since the
+                # altitude, the direction, etc could also give the place away
+                sanitized_exif = image.getexif()
+                sanitized_exif.pop(TAG_GPS_IFD, None)
+                exif = sanitized_exif.tobytes()
 
-        # If you are not explicit with EXIF, pillow will not preserve it
-        # https://stackoverflow.com/a/17047039/3950305
-        image = Image.open(picture.path)
-        image.thumbnail(size)
-        exif = image.info['exif']
-        image.save(full_output_path, optimize=True, exif=exif)
+            image.draft(None, renditions[0].size)
+
+            for rendition in renditions:
+                # Resizes in place, so the next (smaller) rendition starts from this one
+                image.thumbnail(rendition.size)
+
+                save_options = {'quality': rendition.quality}
+
+                if rendition.image_format == FORMAT_JPEG:
+                    save_options['optimize'] = True
+                elif rendition.image_format == FORMAT_WEBP:
+                    # Slower than the default (4), but smaller files
+                    save_options['method'] = 5
+                else:
+                    raise RuntimeError(f'Unknown image format: {rendition.image_format}')
+
+                if exif:
+                    save_options['exif'] = exif
+
+                # Written aside and then replaced atomically, never written through: the path
+                # might be hardlinked (eg: an output of a previous build, linked to a cached
+                # rendition), linked while being written (another worker, processing an
+                # identical picture), or left half written by an interrupted build
+                output_path = output_paths[rendition]
+                temporary_path = f'{output_path}.{os.getpid()}.tmp'
+
+                try:
+                    image.save(temporary_path, format=rendition.image_format, **save_options)
+                    os.replace(temporary_path, output_path)
+                finally:
+                    if os.path.exists(temporary_path):
+                        os.remove(temporary_path)
@@ -0,0 +1,293 @@
+import json
+import os
+import shutil
+import time
+from hashlib import md5
+from typing import Optional
+
+INDEX_FILENAME = 'index.json'
+INDEX_VERSION = 1
+
+# Describes what happens with the EXIF metadata of the original picture in a rendition. It is part
+# of the cache key, so renditions with different EXIF are never mixed up.
+EXIF_POLICY_KEEP = 'exif'
+# All the EXIF metadata, but the GPS information (for pictures inside privacy zones)
+EXIF_POLICY_STRIP_GPS = 'nogps'
+
+# The image formats of the renditions (as named by Pillow), and the extension of their files
+FORMAT_JPEG = 'JPEG'
+FORMAT_WEBP = 'WEBP'
+FORMAT_EXTENSIONS = {FORMAT_JPEG: 'jpg', FORMAT_WEBP: 'webp'}
+
+
+def file_digest(path: str) -> str:
+    """
+    Hashes the content of a file, reading it in chunks to keep the memory usage low.
+    """
+    digest = md5()
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class RenditionCache:
+    """
+    A content addressed cache for picture renditions (thumbnails, full size, etc).
+
+    Renditions are stored under the hash of the content of the original picture, plus the
+    parameters used to generate them. Editing a picture in place invalidates its renditions,
+    and moving the trip folder around does not.
+
+    Layout on disk:
+        <folder>/index.json
+        <folder>/<digest[:2]>/<digest>/<rendition parameters>.<jpg|webp>
+
+    The index keeps track of:
+        * sources: path -> (size, mtime, digest) of the original pictures, so the (expensive)
+          content hash is only recomputed when a picture changes
+        * renditions: digest -> rendition parameters -> (size in bytes, last used timestamp),
+          so lookups do not need to touch the disk and the least recently used renditions can
+          be evicted when the cache grows bigger than `max_size` (in bytes)
+
+    The index is owned by the main process. Worker processes receive a `view_for` one picture,
+    update it and send it back to be `merge`d.
+    """
+
+    def __init__(self, folder: str, *, max_size: Optional[int] = None):
+        self.folder = folder
+        self.max_size = max_size
+
+        self.sources: dict[str, tuple[int, int, str]] = {}
+        self.renditions: dict[str, dict[str, tuple[int, float]]] = {}
+
+    @classmethod
+    def load(cls, folder: str, *, max_size: Optional[int] = None) -> 'RenditionCache':
+        cache = cls(folder, max_size=max_size)
+
+        try:
+            with open(os.path.join(folder, INDEX_FILENAME)) as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cache
+
+        if index.get('version') != INDEX_VERSION:
+            return cache
+
+        cache.sources = {path: tuple(value) for path, value in index['sources'].items()}
+        cache.renditions = {
+            digest: {key: tuple(value) for key, value in entries.items()}
+            for digest, entries in index['renditions'].items()
+        }
+
+        return cache
+
+    def save(self) -> None:
+        """
+        Evicts the least recently used renditions (if the cache is too big) and persists the
+        index. The index is written to a temporary file first, so a crash never leaves a
+        half-written index behind.
+        """
+        self.evict()
+
+        os.makedirs(self.folder, exist_ok=True)
+        index_path = os.path.join(self.folder, INDEX_FILENAME)
+
+        with open(f'{index_path}.tmp', 'w') as file:
+            json.dump(
+                {
+                    'version': INDEX_VERSION,
+                    'sources': self.sources,
+                    'renditions': self.renditions,
+                },
+                file,
+            )
+
+        os.replace(f'{index_path}.tmp', index_path)
+
+    @staticmethod
+    def rendition_key(
+        size: tuple[int, int], quality: int, exif_policy: str, image_format: str = FORMAT_JPEG
+    ) -> str:
+        key = f'{size[0]}x{size[1]}-q{quality}-{exif_policy}'
+
+        # JPEG keys have no suffix (as before other formats were supported)
+        if image_format != FORMAT_JPEG:
+            key = f'{key}-{FORMAT_EXTENSIONS[image_format]}'
+
+        return key
+
+    def path_for(self, digest: str, key: str) -> str:
+        extension = key.rsplit('-', 1)[-1]
+
+        if extension not in FORMAT_EXTENSIONS.values():
+            extension = FORMAT_EXTENSIONS[FORMAT_JPEG]
+
+        return os.path.join(self.folder, digest[:2], digest, f'{key}.{extension}')
+
+    def source_digest(self, path: str) -> str:
+        """
+        :return: the hash of the content of the file, from the index if the file did not
+        change since it was last hashed
+        """
+        stat = os.stat(path)
+        known = self.sources.get(path)
+
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        digest = file_digest(path)
+        self.sources[path] = (stat.st_size, stat.st_mtime_ns, digest)
+
+        return digest
+
+    def contains(self, digest: str, key: str) -> bool:
+        """
+        Checks the index first. Renditions missing from the index might still exist on disk
+        (eg: the index was lost, or this is a view sent to a worker), so only in that case the
+        disk is checked.
+        """
+        if key in self.renditions.get(digest, {}):
+            return True
+
+        path = self.path_for(digest, key)
+
+        if os.path.exists(path):
+            self.add(digest, key)
+            return True
+
+        return False
+
+    def add(self, digest: str, key: str) -> None:
+        size = os.path.getsize(self.path_for(digest, key))
+        self.renditions.setdefault(digest, {})[key] = (size, time.time())
+
+    def touch(self, digest: str, key: str) -> None:
+        size, _ = self.renditions[digest][key]
+        self.renditions[digest][key] = (size, time.time())
+
+    def forget(self, digest: str, key: str) -> None:
+        self.renditions.get(digest, {}).pop(key, None)
+
+    def view_for(self, path: str) -> 'RenditionCache':
+        """
+        :return: a small copy of this cache, with only the index entries related to the given
+        original picture. Cheap to send to a worker process.
+        """
+        view = RenditionCache(self.folder, max_size=self.max_size)
+
+        if path in self.sources:
+            view.sources[path] = self.sources[path]
+            digest = self.sources[path][2]
+
+            if digest in self.renditions:
+                view.renditions[digest] = dict(self.renditions[digest])
+
+        return view
+
+    def merge(self, view: 'RenditionCache') -> None:
+        self.sources.update(view.sources)
+
+        for digest, entries in view.renditions.items():
+            self.renditions.setdefault(digest, {}).update(entries)
+
+    @property
+    def total_size(self) -> int:
+        return sum(size for entries in self.renditions.values() for size, _ in entries.values())
+
+    @property
+    def rendition_count(self) -> int:
+        return sum(len(entries) for entries in self.renditions.values())
+
+    def evict(self, max_size: Optional[int] = None) -> tuple[int, int]:
+        """
+        Removes the least recently used renditions until the cache is not bigger than
+        max_size (or the max_size given to the constructor).
+
+        :return: a tuple with the number of renditions removed and the bytes freed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        total_size = self.total_size
+
+        if max_size is None or total_size <= max_size:
+            return 0, 0
+
+        entries = sorted(
+            (
+                (last_used, size, digest, key)
+                for digest, renditions in self.renditions.items()
+                for key, (size, last_used) in renditions.items()
+            )
+        )
+
+        removed, freed = 0, 0
+
+        for _, size, digest, key in entries:
+            if total_size - freed <= max_size:
+                break
+
+            try:
+                os.remove(self.path_for(digest, key))
+            except FileNotFoundError:
+                pass
+
+            self.forget(digest, key)
+            removed += 1
+            freed += size
+
+        self.renditions = {digest: keys for digest, keys in self.renditions.items() if keys}
+
+        return removed, freed
+
+    def prune(self, max_size: Optional[int] = None) -> tuple[int, int]:
+        """
+        Cleans up the cache:
+            * forgets the original pictures that no longer exist
+            * forgets the renditions whose file no longer exists
+            * removes the files (eg: left by older versions) that are not in the index
+            * evicts the least recently used renditions, if bigger than max_size
+
+        :return: a tuple with the number of files removed and the bytes freed
+        """
+        self.sources = {path: value for path, value in self.sources.items() if os.path.exists(path)}
+
+        for digest, entries in self.renditions.items():
+            for key in list(entries):
+                if not os.path.exists(self.path_for(digest, key)):
+                    del entries[key]
+
+        self.renditions = {digest: keys for digest, keys in self.renditions.items() if keys}
+
+        removed, freed = 0, 0
+        known_paths = {
+            self.path_for(digest, key)
+            for digest, entries in self.renditions.items()
+            for key in entries
+        }
+
+        for entry in os.scandir(self.folder) if os.path.isdir(self.folder) else []:
+            if entry.name == INDEX_FILENAME:
+                continue
+
+            if entry.is_dir():
+                for root, _, filenames in os.walk(entry.path):
+                    for filename in filenames:
+                        path = os.path.join(root, filename)
+
+                        if path not in known_paths:
+                            freed += os.path.getsize(path)
+                            removed += 1
+                            os.remove(path)
+
+                if not any(files for _, _, files in os.walk(entry.path)):
+                    shutil.rmtree(entry.path)
+            else:
+                freed += entry.stat().st_size
+                removed += 1
+                os.remove(entry.path)
+
+        evicted, evicted_bytes = self.evict(max_size)
+
+        return removed + evicted, freed + evicted_bytes
@@ -0,0 +1,207 @@
+"""
+Streaming (event based) reading and rewriting of GPX files. Unlike gpxpy, the whole document is
+never loaded in memory, so it works for very long recordings (hundreds of MB) in bounded memory.
+"""
+
+import xml.sax
+from collections import namedtuple
+from io import TextIOBase
+from typing import Callable, Iterator, Optional
+from xml.etree import ElementTree
+from xml.sax.handler import ContentHandler
+from xml.sax.saxutils import XMLGenerator
+
+import numpy as np
+
+GpxPoint = namedtuple('GpxPoint', 'segment latitude longitude elevation time')
+
+# Receives arrays with latitudes and longitudes, returns a boolean array (True to remove)
+PointsMask = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+DEFAULT_BATCH_SIZE = 4096
+
+
+def _local_name(tag: str) -> str:
+    # ElementTree tags are "{namespace}name"
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_track_points(path: str) -> Iterator[GpxPoint]:
+    """
+    Iterates over all the track points of a GPX file, without loading the whole file.
+
+    :param path: path to the GPX file
+    :return: an iterator of GpxPoint. `segment` is a sequential number for the segments of all
+    the tracks in the file. `elevation` and `time` are the raw strings (or None if missing).
+    """
+    segment = -1
+    elevation: Optional[str] = None
+    time: Optional[str] = None
+
+    for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+        name = _local_name(element.tag)
+
+        if event == 'start':
+            if name == 'trkseg':
+                segment += 1
+            elif name == 'trkpt':
+                elevation, time = None, None
+
+            continue
+
+        if name == 'ele':
+            elevation = element.text
+        elif name == 'time':
+            time = element.text
+        elif name == 'trkpt':
+            yield GpxPoint(
+                segment,
+                float(element.attrib['lat']),
+                float(element.attrib['lon']),
+                elevation,
+                time,
+            )
+            element.clear()
+        elif name == 'trkseg':
+            # Frees the (already cleared) points of the segment
+            element.clear()
+
+
+class _TrackPointsFilter(ContentHandler):
+    """
+    Copies all SAX events to an XMLGenerator, except for the track points (<trkpt>) for which
+    the mask returns True. Track points are buffered in batches, so the mask can be computed
+    for many points at once.
+    """
+
+    def __init__(self, output: TextIOBase, is_removed: PointsMask, batch_size: int):
+        super().__init__()
+
+        self.generator = XMLGenerator(output, encoding='utf-8', short_empty_elements=True)
+        self.is_removed = is_removed
+        self.batch_size = batch_size
+
+        # Events of the points waiting for the mask, and their coordinates
+        self.batch: list[list[tuple]] = []
+        self.latitudes: list[float] = []
+        self.longitudes: list[float] = []
+
+        # Events of the point being read (None when not inside a <trkpt>)
+        self.point: Optional[list[tuple]] = None
+        self.point_depth = 0
+
+        # Whitespace before a point is removed together with the point
+        self.whitespace: list[tuple] = []
+
+        self.points_removed = 0
+
+    def _emit(self, method: str, *args) -> None:
+        if self.point is not None:
+            self.point.append((method, args))
+            return
+
+        if method == 'characters' and not args[0].strip():
+            self.whitespace.append((method, args))
+            return
+
+        self.flush()
+        self._replay(self.whitespace)
+        self.whitespace = []
+        getattr(self.generator, method)(*args)
+
+    def _replay(self, events: list[tuple]) -> None:
+        for method, args in events:
+            getattr(self.generator, method)(*args)
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+
+        removed = self.is_removed(np.array(self.latitudes), np.array(self.longitudes))
+
+        for events, is_removed in zip(self.batch, removed.tolist()):
+            if not is_removed:
+                self._replay(events)
+
+        self.points_removed += int(removed.sum())
+        self.batch, self.latitudes, self.longitudes = [], [], []
+
+    def startDocument(self):
+        self.generator.startDocument()
+
+    def endDocument(self):
+        self.flush()
+        self._replay(self.whitespace)
+        self.generator.endDocument()
+
+    def startPrefixMapping(self, prefix, uri):
+        self._emit('startPrefixMapping', prefix, uri)
+
+    def endPrefixMapping(self, prefix):
+        self._emit('endPrefixMapping', prefix)
+
+    def startElementNS(self, name, qname, attrs):
+        if self.point is None and name[1] == 'trkpt':
+            self.point = self.whitespace
+            self.whitespace = []
+            self.point_depth = 0
+            self.latitudes.append(float(attrs.getValue((None, 'lat'))))
+            self.longitudes.append(float(attrs.getValue((None, 'lon'))))
+
+        if self.point is not None:
+            self.point_depth += 1
+
+        self._emit('startElementNS', name, qname, attrs)
+
+    def endElementNS(self, name, qname):
+        self._emit('endElementNS', name, qname)
+
+        if self.point is not None:
+            self.point_depth -= 1
+
+            if self.point_depth == 0:
+                self.batch.append(self.point)
+                self.point = None
+
+                if len(self.batch) >= self.batch_size:
+                    self.flush()
+
+    def characters(self, content):
+        self._emit('characters', content)
+
+    def ignorableWhitespace(self, whitespace):
+        self._emit('characters', whitespace)
+
+    def processingInstruction(self, target, data):
+        self._emit('processingInstruction', target, data)
+
+
+def filter_track_points(
+    input_path: str,
+    output_path: str,
+    is_removed: PointsMask,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Rewrites a GPX file without the track points for which `is_removed` returns True. Reads
+    and writes the files as streams, keeping at most `batch_size` points in memory.
+
+    Everything else in the file (metadata, waypoints, routes, extensions, namespaces) is kept.
+    XML comments are not.
+
+    :param input_path: the GPX file to be read
+    :param output_path: where the filtered GPX file is written (must not be the input_path)
+    :param is_removed: receives arrays of latitudes and longitudes, returns a boolean array
+    :param batch_size: how many points are checked at once
+    :return: the number of points removed
+    """
+    with open(output_path, 'w', encoding='utf-8') as output:
+        handler = _TrackPointsFilter(output, is_removed, batch_size)
+
+        parser = xml.sax.make_parser()
+        parser.setFeature(xml.sax.handler.feature_namespaces, True)
+        parser.setContentHandler(handler)
+        parser.parse(input_path)
+
+    return handler.points_removed
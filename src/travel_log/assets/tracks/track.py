@@ -1,16 +1,21 @@
+import logging
 from dataclasses import dataclass, field
+from functools import cached_property
 
 import gpxpy.gpx
 from travel_log.assets.abstract_asset import AbstractAsset
+from travel_log.assets.tracks.track_arrays import SegmentArrays, read_segments
+from travel_log.assets.tracks.track_stats import TrackStats
 
 TRACKS_ALLOWED_EXTENSIONS = ['gpx']
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class Track(AbstractAsset):
     """
-    A GPS track. More methods will be added to retrieve stats (such as time moving, distance
-    travelled, etc)
+    A GPS track. Stats (such as time moving, distance travelled, etc) are available in `stats`.
     """
 
     """
@@ -27,17 +32,35 @@ class Track(AbstractAsset):
     @property
     def data(self):
         """
-        Returns a gpxpy object with the parsed track data.
+        Returns a gpxpy object with the parsed track data. The file is only parsed once (on the
+        first access), and the same object is returned afterwards.
+
+        For very large files, prefer the streaming functions in `gpx_stream`, which do not load
+        the whole file in memory.
         """
+        if self._data is None:
+            with open(self.path, 'r') as file:
+                self._data = gpxpy.parse(file)
 
-        with open(self.path, 'r') as file:
-            return gpxpy.parse(file)
+        return self._data
 
     @data.setter
     def data(self, value):
         self.is_dirty = True
         self._data = value
 
+    @cached_property
+    def segments(self) -> list[SegmentArrays]:
+        """
+        The points of each segment of the track, as NumPy arrays. Read straight from the file
+        (streaming), without building the gpxpy objects.
+        """
+        return read_segments(self.path)
+
+    @cached_property
+    def stats(self) -> TrackStats:
+        return TrackStats.of_segments(self.segments)
+
     def persist_data(self) -> bool:
         """
         Saves the underlying data property (if it was defined using the setter) back
@@ -52,7 +75,7 @@ class Track(AbstractAsset):
             raise RuntimeError('Abort! Trying to modify a read_only asset.')
 
         if self.is_dirty:
-            print(f'Overwriting Track {self.path}')
+            logger.info('Overwriting track %s', self.path, extra={'track': self.path})
 
             self._data.nsmap['gpx_style'] = 'http://www.topografix.com/GPX/gpx_style/0/2'
 
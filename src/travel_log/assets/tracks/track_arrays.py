@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+from gpxpy.gpxfield import parse_time
+from travel_log.assets.tracks.gpx_stream import GpxPoint, iter_track_points
+
+
+def _parse_elevations(elevations: list[Optional[str]]) -> np.ndarray:
+    return np.array([np.nan if value is None else float(value) for value in elevations])
+
+
+def _parse_times(times: list[Optional[str]]) -> np.ndarray:
+    """
+    :return: array with the times as seconds since the epoch (UTC), NaN when missing
+    """
+    utc_times = [value[:-1] for value in times if value is not None and value.endswith('Z')]
+
+    if len(utc_times) == len(times):
+        # The usual case (UTC times), parsed at once by numpy
+        parsed = np.array(utc_times, dtype='datetime64[ms]')
+        return parsed.astype(np.int64) / 1000
+
+    seconds = []
+
+    for value in times:
+        time = parse_time(value) if value else None
+        seconds.append(time.timestamp() if time else np.nan)
+
+    return np.array(seconds, dtype=float)
+
+
+@dataclass(frozen=True)
+class SegmentArrays:
+    """
+    The points of a track segment, stored column by column in NumPy arrays (instead of one
+    Python object per point), so operations on the whole segment can be vectorized.
+
+    All the arrays have the same length (the number of points).
+    """
+
+    """
+    In decimal degrees.
+    """
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+
+    """
+    In meters. NaN for points without elevation.
+    """
+    elevations: np.ndarray
+
+    """
+    In seconds since the epoch (UTC). NaN for points without time.
+    """
+    times: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @classmethod
+    def from_points(cls, points: list[GpxPoint]) -> 'SegmentArrays':
+        return cls(
+            latitudes=np.array([point.latitude for point in points], dtype=float),
+            longitudes=np.array([point.longitude for point in points], dtype=float),
+            elevations=_parse_elevations([point.elevation for point in points]),
+            times=_parse_times([point.time for point in points]),
+        )
+
+    def masked(self, keep: np.ndarray) -> 'SegmentArrays':
+        """
+        :param keep: boolean array, True for the points to keep
+        :return: a new segment with only the points kept
+        """
+        return SegmentArrays(
+            self.latitudes[keep], self.longitudes[keep], self.elevations[keep], self.times[keep]
+        )
+
+    def split(self, keep: np.ndarray) -> list['SegmentArrays']:
+        """
+        :param keep: boolean array, True for the points to keep
+        :return: one segment per run of consecutive points kept, so the points removed are not
+        bridged by a straight line
+        """
+        # Where the runs of kept points start and end (exclusive)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], keep.astype(np.int8), [0]))))
+
+        return [
+            SegmentArrays(
+                self.latitudes[start:end],
+                self.longitudes[start:end],
+                self.elevations[start:end],
+                self.times[start:end],
+            )
+            for start, end in zip(edges[::2], edges[1::2])
+        ]
+
+
+def read_segments(path: str) -> list[SegmentArrays]:
+    """
+    Reads all the track segments of a GPX file (streaming the file, without building gpxpy
+    objects). Empty segments are skipped.
+    """
+    return segments_from_points(iter_track_points(path))
+
+
+def segments_from_points(points: Iterable[GpxPoint]) -> list[SegmentArrays]:
+    segments = []
+    current_segment: list[GpxPoint] = []
+
+    for point in points:
+        if current_segment and current_segment[-1].segment != point.segment:
+            segments.append(SegmentArrays.from_points(current_segment))
+            current_segment = []
+
+        current_segment.append(point)
+
+    if current_segment:
+        segments.append(SegmentArrays.from_points(current_segment))
+
+    return segments
@@ -0,0 +1,92 @@
+import numpy as np
+from travel_log.assets.tracks.track_arrays import SegmentArrays
+from travel_log.utils.geospatial_utils import EARTH_RADIUS_KM
+
+# In meters. Default tolerance of the simplification: points closer than this to the simplified
+# line are dropped. Invisible on a map at the zoom levels used by the website.
+DEFAULT_SIMPLIFY_TOLERANCE = 5.0
+
+
+def project_to_meters(
+    latitudes: np.ndarray, longitudes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Projects the points to a local plane (equirectangular projection centered on the points), in
+    meters. Precise enough for the size of a track.
+
+    :return: a tuple with (x, y) arrays
+    """
+    center_latitude = np.radians((latitudes.min() + latitudes.max()) / 2)
+    meters_per_radian = EARTH_RADIUS_KM * 1000
+
+    # Unwrapped, so tracks crossing the antimeridian are continuous
+    longitudes_radians = np.unwrap(np.radians(longitudes))
+
+    x = longitudes_radians * np.cos(center_latitude) * meters_per_radian
+    y = np.radians(latitudes) * meters_per_radian
+
+    return x, y
+
+
+def douglas_peucker_mask(x: np.ndarray, y: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker simplification of a line. Iterative (no recursion limit for long
+    tracks), and the distances of all the points of a range to its chord are computed at once.
+
+    :param x: x coordinates of the points (in the same unit as tolerance)
+    :param y: y coordinates of the points
+    :param tolerance: maximum distance between a dropped point and the simplified line
+    :return: boolean array, True for the points kept
+    """
+    keep = np.zeros(len(x), dtype=bool)
+
+    if len(x) <= 2:
+        keep[:] = True
+        return keep
+
+    keep[0] = keep[-1] = True
+    ranges = [(0, len(x) - 1)]
+
+    while ranges:
+        first, last = ranges.pop()
+
+        if last - first < 2:
+            continue
+
+        inner = slice(first + 1, last)
+        chord_x, chord_y = x[last] - x[first], y[last] - y[first]
+        points_x, points_y = x[inner] - x[first], y[inner] - y[first]
+        chord_length_squared = chord_x * chord_x + chord_y * chord_y
+
+        if chord_length_squared == 0:
+            # Closed loop (or standing still): distance to the first point
+            distances = np.hypot(points_x, points_y)
+        else:
+            # Distance to the closest point of the chord (not of the infinite line)
+            t = (points_x * chord_x + points_y * chord_y) / chord_length_squared
+            t = np.clip(t, 0, 1)
+            distances = np.hypot(points_x - t * chord_x, points_y - t * chord_y)
+
+        farthest = int(np.argmax(distances))
+
+        if distances[farthest] > tolerance:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            ranges.append((first, middle))
+            ranges.append((middle, last))
+
+    return keep
+
+
+def simplify_segment(segment: SegmentArrays, tolerance: float) -> SegmentArrays:
+    """
+    :param segment: the segment to be simplified
+    :param tolerance: in meters (see `douglas_peucker_mask`)
+    :return: a new segment, with only the points needed to draw it within the tolerance
+    """
+    if len(segment) <= 2 or tolerance <= 0:
+        return segment
+
+    x, y = project_to_meters(segment.latitudes, segment.longitudes)
+
+    return segment.masked(douglas_peucker_mask(x, y, tolerance))
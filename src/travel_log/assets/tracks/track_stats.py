@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+from travel_log.assets.tracks.track_arrays import SegmentArrays
+from travel_log.utils.geospatial_utils import haversine_distances
+
+# Below this speed (in km/h) between two points, we consider that we were stopped (same default
+# as gpxpy)
+MOVING_SPEED_THRESHOLD = 1.0
+
+SECONDS_PER_HOUR = 3600
+
+
+def smooth_elevations(elevations: np.ndarray) -> np.ndarray:
+    """
+    Smooths out the GPS noise of the elevations (ignoring the missing ones) with a weighted
+    average of each point and its neighbours. Same smoothing used by gpxpy (so the elevation
+    gain/loss are the same), but vectorized.
+    """
+    elevations = elevations[~np.isnan(elevations)]
+
+    if len(elevations) < 3:
+        return elevations
+
+    smoothed = elevations.copy()
+    smoothed[1:-1] = 0.3 * elevations[:-2] + 0.4 * elevations[1:-1] + 0.3 * elevations[2:]
+
+    return smoothed
+
+
+@dataclass(frozen=True)
+class Bounds:
+    """
+    The bounding box of some points, in decimal degrees.
+    """
+
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+
+    def union(self, other: Optional['Bounds']) -> 'Bounds':
+        if other is None:
+            return self
+
+        return Bounds(
+            min(self.min_latitude, other.min_latitude),
+            min(self.min_longitude, other.min_longitude),
+            max(self.max_latitude, other.max_latitude),
+            max(self.max_longitude, other.max_longitude),
+        )
+
+    @classmethod
+    def union_of(cls, many_bounds: Iterable[Optional['Bounds']]) -> Optional['Bounds']:
+        union = None
+
+        for bounds in many_bounds:
+            if bounds is not None:
+                union = bounds.union(union)
+
+        return union
+
+    def to_list(self) -> list[list[float]]:
+        """
+        :return: [[south, west], [north, east]], the format used by Leaflet
+        """
+        return [[self.min_latitude, self.min_longitude], [self.max_latitude, self.max_longitude]]
+
+    @classmethod
+    def from_list(cls, bounds: list[list[float]]) -> 'Bounds':
+        return cls(bounds[0][0], bounds[0][1], bounds[1][0], bounds[1][1])
+
+
+@dataclass(frozen=True)
+class TrackStats:
+    """
+    Statistics of one or many track segments (a track, a trip day, a whole trip).
+
+    Computed with vectorized operations on SegmentArrays, and combined by summing (or taking
+    the max, or the union of the bounds) so aggregates never go back to the points.
+    """
+
+    points_count: int = 0
+
+    """
+    In km. Great-circle distance between consecutive points.
+    """
+    distance: float = 0.0
+
+    """
+    In meters. Sum of the elevation differences between consecutive points, after smoothing
+    (see `smooth_elevations`).
+    """
+    elevation_gain: float = 0.0
+    elevation_loss: float = 0.0
+
+    """
+    In seconds. Moving time only counts the steps faster than MOVING_SPEED_THRESHOLD.
+    """
+    total_time: float = 0.0
+    moving_time: float = 0.0
+
+    """
+    In km/h.
+    """
+    max_speed: float = 0.0
+
+    """
+    In km, the distance travelled during the moving time (used for the average speed).
+    """
+    moving_distance: float = 0.0
+
+    bounds: Optional[Bounds] = None
+
+    @property
+    def average_speed(self) -> float:
+        """
+        Average speed while moving, in km/h.
+        """
+        if not self.moving_time:
+            return 0.0
+
+        return self.moving_distance / (self.moving_time / SECONDS_PER_HOUR)
+
+    @classmethod
+    def of_segment(cls, segment: SegmentArrays) -> 'TrackStats':
+        if len(segment) == 0:
+            return cls()
+
+        bounds = Bounds(
+            float(segment.latitudes.min()),
+            float(segment.longitudes.min()),
+            float(segment.latitudes.max()),
+            float(segment.longitudes.max()),
+        )
+
+        distances = haversine_distances(
+            segment.latitudes[1:],
+            segment.longitudes[1:],
+            segment.latitudes[:-1],
+            segment.longitudes[:-1],
+        )
+
+        elevation_differences = np.diff(smooth_elevations(segment.elevations))
+
+        durations = np.diff(segment.times)
+        timed = ~np.isnan(durations) & (durations > 0)
+        speeds = np.zeros(len(durations))
+        speeds[timed] = distances[timed] / (durations[timed] / SECONDS_PER_HOUR)
+        moving = timed & (speeds > MOVING_SPEED_THRESHOLD)
+
+        return cls(
+            points_count=len(segment),
+            distance=float(distances.sum()),
+            elevation_gain=float(elevation_differences[elevation_differences > 0].sum()),
+            elevation_loss=float(-elevation_differences[elevation_differences < 0].sum()),
+            total_time=float(durations[timed].sum()),
+            moving_time=float(durations[moving].sum()),
+            max_speed=float(speeds[moving].max()) if moving.any() else 0.0,
+            moving_distance=float(distances[moving].sum()),
+            bounds=bounds,
+        )
+
+    @classmethod
+    def combine(cls, many_stats: Iterable['TrackStats']) -> 'TrackStats':
+        combined = cls()
+
+        for stats in many_stats:
+            combined = cls(
+                points_count=combined.points_count + stats.points_count,
+                distance=combined.distance + stats.distance,
+                elevation_gain=combined.elevation_gain + stats.elevation_gain,
+                elevation_loss=combined.elevation_loss + stats.elevation_loss,
+                total_time=combined.total_time + stats.total_time,
+                moving_time=combined.moving_time + stats.moving_time,
+                max_speed=max(combined.max_speed, stats.max_speed),
+                moving_distance=combined.moving_distance + stats.moving_distance,
+                bounds=stats.bounds.union(combined.bounds) if stats.bounds else combined.bounds,
+            )
+
+        return combined
+
+    @classmethod
+    def of_segments(cls, segments: Iterable[SegmentArrays]) -> 'TrackStats':
+        return cls.combine(cls.of_segment(segment) for segment in segments)
@@ -0,0 +1,147 @@
+import os
+from hashlib import md5
+
+import click
+
+from travel_log.benchmarks.suite import (
+    BENCHMARKS,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    load_results,
+    run_suite,
+    save_results,
+)
+from travel_log.benchmarks.synthetic_trip import SyntheticTripParameters, generate_synthetic_trip
+from travel_log.main import CACHE_FOLDER
+
+BENCHMARKS_FOLDER = os.path.join(CACHE_FOLDER, 'benchmarks')
+
+# Length of the hash in the names of the trip folders
+HASH_LENGTH = 10
+
+
+def format_size(size) -> str:
+    return '-' if size is None else f'{size / 1024 / 1024:.1f} MB'
+
+
+@click.command()
+@click.option('--days', default=SyntheticTripParameters.days, type=click.IntRange(min=1))
+@click.option(
+    '--pictures-per-day',
+    default=SyntheticTripParameters.pictures_per_day,
+    type=click.IntRange(min=0),
+)
+@click.option(
+    '--tracks-per-day', default=SyntheticTripParameters.tracks_per_day, type=click.IntRange(min=0)
+)
+@click.option(
+    '--points-per-track',
+    default=SyntheticTripParameters.points_per_track,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--privacy-zones', default=SyntheticTripParameters.privacy_zones, type=click.IntRange(min=0)
+)
+@click.option('--seed', default=SyntheticTripParameters.seed, type=int)
+@click.option(
+    '--only',
+    multiple=True,
+    type=click.Choice(list(BENCHMARKS)),
+    help='Run only this benchmark (can be repeated). All of them by default',
+)
+@click.option(
+    '--repeat',
+    default=3,
+    type=click.IntRange(min=1),
+    help='Timed runs of each benchmark (the fastest one is reported)',
+)
+@click.option(
+    '--folder',
+    default=BENCHMARKS_FOLDER,
+    help='Where the synthetic trips are generated (and kept for the next runs)',
+)
+@click.option('--save', default=None, help='Save the results (JSON) to this file')
+@click.option(
+    '--baseline',
+    default=None,
+    help='Compare with the results saved (with --save) by a previous run, eg: of another commit',
+)
+@click.option(
+    '--threshold',
+    default=DEFAULT_THRESHOLD,
+    type=click.FloatRange(min=0),
+    help='How much slower (or more memory), relative to the baseline, is a regression',
+)
+def benchmark(
+    days,
+    pictures_per_day,
+    tracks_per_day,
+    points_per_track,
+    privacy_zones,
+    seed,
+    only,
+    repeat,
+    folder,
+    save,
+    baseline,
+    threshold,
+):
+    """
+    Benchmarks the build on a synthetic trip (generated once per set of parameters). Exits with
+    an error if any benchmark regressed compared to the baseline.
+    """
+    parameters = SyntheticTripParameters(
+        days=days,
+        pictures_per_day=pictures_per_day,
+        tracks_per_day=tracks_per_day,
+        points_per_track=points_per_track,
+        privacy_zones=privacy_zones,
+        seed=seed,
+    )
+    # One folder per set of parameters, so they are all kept
+    trip_folder = os.path.join(
+        folder, f'trip-{md5(repr(parameters).encode()).hexdigest()[:HASH_LENGTH]}'
+    )
+
+    if generate_synthetic_trip(trip_folder, parameters):
+        click.echo(f'Generated trip: {trip_folder}')
+
+    results = run_suite(trip_folder, os.path.join(folder, 'work'), only, repeat=repeat)
+
+    click.echo(
+        f'{"benchmark":<20}{"items":>8}{"seconds":>10}{"throughput":>20}'
+        f'{"peak rss":>12}{"allocated":>12}'
+    )
+    for result in results:
+        throughput = f'{result.throughput:.1f} {result.unit}/s'
+        click.echo(
+            f'{result.name:<20}{result.items:>8}{result.seconds:>10.3f}{throughput:>20}'
+            f'{format_size(result.peak_rss):>12}{format_size(result.peak_traced):>12}'
+        )
+
+    if save:
+        save_results(save, parameters, results)
+        click.echo(f'Saved: {save}')
+
+    if baseline and not os.path.exists(baseline):
+        click.echo(f'No baseline to compare with: {baseline}')
+    elif baseline:
+        details, baseline_results = load_results(baseline)
+
+        if details['parameters'] != parameters:
+            raise click.ClickException('The baseline was run on a different synthetic trip')
+
+        regressions = find_regressions(results, baseline_results, threshold)
+        click.echo(f'Baseline: commit {details["commit"]}')
+
+        for regression in regressions:
+            click.echo(f'Regression: {regression}')
+
+        if regressions:
+            raise SystemExit(1)
+
+        click.echo('No regressions')
+
+
+if __name__ == '__main__':
+    benchmark()
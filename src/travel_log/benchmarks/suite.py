@@ -0,0 +1,417 @@
+"""
+Benchmarks of the main stages of the build, run on a synthetic trip (see `synthetic_trip`).
+
+Each benchmark runs in a new process (so the peak memory of one is not inherited by the next,
+and nothing is warm from a previous one), a few times: the fastest run is kept. Its peak
+memory is reported twice: the peak resident size of the process during the runs (including
+the memory of the C libraries, eg: of the decoded pictures), and the peak of the Python
+allocations during a run (measured on an extra run, not timed, since tracing slows it down).
+
+Results can be saved (as JSON) and compared with the ones of a previous commit (a baseline).
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from types import ModuleType
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from travel_log.assets.pictures.picture_resizer import DEFAULT_RENDITIONS, PictureResizer
+from travel_log.benchmarks.synthetic_trip import SyntheticTripParameters
+from travel_log.parsers.parse_cache import ParseCache
+from travel_log.parsers.trip_parser import TripParser
+from travel_log.website.build_manifest import BuildManifest
+from travel_log.website.website_generator import generate_website, render_pages_to_files
+
+resource: Optional[ModuleType]
+
+try:
+    import resource
+except ImportError:
+    # Not on Windows
+    resource = None
+
+RESULTS_VERSION = 1
+
+# Linux only: writing '5' to clear_refs resets the peak resident memory (VmHWM, on status)
+CLEAR_REFS_PATH = '/proc/self/clear_refs'
+CLEAR_REFS_PEAK_RSS = '5'
+STATUS_PATH = '/proc/self/status'
+
+# Slower than the baseline by more than this (relative) is a regression
+DEFAULT_THRESHOLD = 0.1
+
+
+class Benchmark(NamedTuple):
+    name: str
+
+    # What the throughput is measured in (eg: pictures per second)
+    unit: str
+
+    # (trip folder, work folder) -> state given to `run`. Not timed, called before every run
+    setup: Callable[[str, str], Any]
+
+    # state -> number of items (of `unit`) processed. Timed
+    run: Callable[[Any], int]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    unit: str
+    items: int
+
+    """
+    Duration (in seconds) of the fastest run
+    """
+    seconds: float
+
+    """
+    Peak resident memory (in bytes) of the process during the runs, if known. Includes the setup
+    of the benchmark where it cannot be reset (eg: not on Linux)
+    """
+    peak_rss: Optional[int]
+
+    """
+    Peak of the memory allocated by Python (in bytes) during a run
+    """
+    peak_traced: int
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else float('inf')
+
+
+def parse_trip(trip_folder: str):
+    return TripParser.parse_folder(trip_folder, ParseCache())
+
+
+def setup_resize(trip_folder: str, work_folder: str):
+    trip = parse_trip(trip_folder)
+    pictures = [picture for trip_day in trip.trip_days for picture in trip_day.pictures]
+    output_folder = os.path.join(work_folder, 'renditions')
+    os.makedirs(output_folder)
+
+    return pictures, output_folder
+
+
+def run_resize(state) -> int:
+    pictures, output_folder = state
+
+    for picture in pictures:
+        output_paths = {
+            rendition: os.path.join(
+                output_folder, f'{rendition.name}-{rendition.output_filename(picture.filename)}'
+            )
+            for rendition in DEFAULT_RENDITIONS
+        }
+        PictureResizer.generate_renditions(picture, output_paths)
+
+    return len(pictures)
+
+
+def setup_privacy_zones(trip_folder: str, work_folder: str):
+    trip = parse_trip(trip_folder)
+    tracks = [track for trip_day in trip.trip_days for track in trip_day.tracks]
+
+    # Parsed beforehand (and again before every run, the points are removed in place): only
+    # the processing is measured
+    points = sum(track.data.get_points_no() for track in tracks)
+
+    return trip.privacy_zone_index, tracks, points
+
+
+def run_privacy_zones(state) -> int:
+    privacy_zone_index, tracks, points = state
+
+    for track in tracks:
+        privacy_zone_index.process_track(track)
+
+    return points
+
+
+def setup_render(trip_folder: str, work_folder: str):
+    website_folder = os.path.join(work_folder, 'website')
+    os.makedirs(website_folder)
+    manifest = BuildManifest(website_folder, os.path.join(work_folder, 'manifest.json'))
+
+    return parse_trip(trip_folder), website_folder, manifest
+
+
+def run_render(state) -> int:
+    trip, website_folder, manifest = state
+    render_pages_to_files(website_folder, trip, manifest, page_per_day=True)
+
+    # The summary, plus one page per day
+    return len(trip.trip_days) + 1
+
+
+def setup_build(trip_folder: str, work_folder: str):
+    return parse_trip(trip_folder), work_folder
+
+
+def run_build(state, incremental: bool = False) -> int:
+    trip, work_folder = state
+    generate_website(
+        trip,
+        os.path.join(work_folder, 'website'),
+        os.path.join(work_folder, 'cache'),
+        incremental=incremental,
+        publish_gpx=True,
+    )
+
+    return sum(len(trip_day.pictures) for trip_day in trip.trip_days)
+
+
+def setup_incremental_build(trip_folder: str, work_folder: str):
+    state = setup_build(trip_folder, work_folder)
+    run_build(state)
+
+    # Parsed again, as a new run would
+    return parse_trip(trip_folder), work_folder
+
+
+def count_files(trip) -> int:
+    return sum(len(trip_day.pictures) + len(trip_day.tracks) for trip_day in trip.trip_days)
+
+
+BENCHMARKS = {
+    benchmark.name: benchmark
+    for benchmark in (
+        Benchmark(
+            'parse',
+            'files',
+            lambda trip_folder, _: trip_folder,
+            lambda trip_folder: count_files(parse_trip(trip_folder)),
+        ),
+        Benchmark('resize', 'pictures', setup_resize, run_resize),
+        Benchmark('privacy_zones', 'points', setup_privacy_zones, run_privacy_zones),
+        Benchmark('render', 'pages', setup_render, run_render),
+        Benchmark('build', 'pictures', setup_build, run_build),
+        Benchmark(
+            'incremental_build',
+            'pictures',
+            setup_incremental_build,
+            lambda state: run_build(state, incremental=True),
+        ),
+    )
+}
+
+
+def _setup(benchmark: Benchmark, trip_folder: str, work_folder: str):
+    # Every run starts from an empty work folder
+    shutil.rmtree(work_folder, ignore_errors=True)
+    os.makedirs(work_folder)
+
+    return benchmark.setup(trip_folder, work_folder)
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Resets the peak resident memory of the process (Linux only), so the setup of the benchmark
+    (and the memory of the parent process, kept by Linux across `exec`) is not counted.
+
+    :return: whether it was reset
+    """
+    try:
+        with open(CLEAR_REFS_PATH, 'w') as file:
+            file.write(CLEAR_REFS_PEAK_RSS)
+    except OSError:
+        return False
+
+    return True
+
+
+def _peak_rss() -> Optional[int]:
+    """
+    :return: the peak resident memory (in bytes) of the process, since the last reset if
+    possible, if known
+    """
+    try:
+        with open(STATUS_PATH) as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    # In kB
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # In bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_benchmark(name: str, trip_folder: str, work_folder: str, repeat: int) -> BenchmarkResult:
+    """
+    Runs the benchmark `repeat` times (and once more, to measure the Python allocations).
+    What the build prints is discarded.
+    """
+    benchmark = BENCHMARKS[name]
+    items, seconds = 0, float('inf')
+    peak_rss: Optional[int] = None
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            state = _setup(benchmark, trip_folder, work_folder)
+            _reset_peak_rss()
+
+            start = time.perf_counter()
+            items = benchmark.run(state)
+            seconds = min(seconds, time.perf_counter() - start)
+
+            run_peak_rss = _peak_rss()
+            peak_rss = max(peak_rss or 0, run_peak_rss or 0) or None
+
+        state = _setup(benchmark, trip_folder, work_folder)
+        tracemalloc.start()
+
+        try:
+            benchmark.run(state)
+            _, peak_traced = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    shutil.rmtree(work_folder, ignore_errors=True)
+
+    return BenchmarkResult(name, benchmark.unit, items, seconds, peak_rss, peak_traced)
+
+
+def run_suite(
+    trip_folder: str,
+    work_folder: str,
+    names: Optional[Iterable[str]] = None,
+    *,
+    repeat: int = 3,
+    isolated: bool = True,
+) -> list[BenchmarkResult]:
+    """
+    :param trip_folder: the trip the benchmarks run on (see `generate_synthetic_trip`)
+    :param work_folder: a folder the benchmarks can write to (deleted afterwards)
+    :param names: the benchmarks to run (all of them, by default)
+    :param repeat: number of timed runs of each benchmark (the fastest one is kept)
+    :param isolated: whether to run each benchmark in a new process. Otherwise, the peak
+    resident memory is the one of the current process, and not of the benchmark
+    """
+    results = []
+
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise RuntimeError(f'Unknown benchmark: {name}')
+
+        if isolated:
+            # Spawned (and not forked), so nothing is inherited from this process
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                result = executor.submit(
+                    run_benchmark, name, trip_folder, work_folder, repeat
+                ).result()
+        else:
+            result = run_benchmark(name, trip_folder, work_folder, repeat)
+
+        results.append(result)
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """
+    :return: the commit the benchmarks ran on, if known
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.realpath(__file__)),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(
+    path: str, parameters: SyntheticTripParameters, results: list[BenchmarkResult]
+) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(path, 'w') as file:
+        json.dump(
+            {
+                'version': RESULTS_VERSION,
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'parameters': asdict(parameters),
+                'results': [asdict(result) for result in results],
+            },
+            file,
+            indent=2,
+        )
+
+
+def load_results(path: str) -> tuple[dict, list[BenchmarkResult]]:
+    """
+    :return: the details of the run (commit, SyntheticTripParameters, etc) and its results
+    """
+    with open(path) as file:
+        details = json.load(file)
+
+    if details.get('version') != RESULTS_VERSION:
+        raise RuntimeError(f'Unsupported benchmark results: {path}')
+
+    results = [BenchmarkResult(**result) for result in details.pop('results')]
+    parameters = details['parameters']
+    details['parameters'] = SyntheticTripParameters(
+        **{**parameters, 'picture_size': tuple(parameters['picture_size'])}
+    )
+
+    return details, results
+
+
+def find_regressions(
+    results: list[BenchmarkResult],
+    baseline: list[BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """
+    Compares the results with the ones of a baseline (run with the same parameters): a
+    benchmark that got slower, or allocates more memory, by more than the threshold (relative)
+    is a regression. Benchmarks missing on either side are ignored.
+
+    :return: a description of each regression
+    """
+    baseline_by_name = {result.name: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        previous = baseline_by_name.get(result.name)
+
+        if previous is None:
+            continue
+
+        if result.seconds > previous.seconds * (1 + threshold):
+            regressions.append(
+                f'{result.name}: {result.throughput:.1f} {result.unit}/s '
+                f'(was {previous.throughput:.1f})'
+            )
+
+        if result.peak_traced > previous.peak_traced * (1 + threshold):
+            regressions.append(
+                f'{result.name}: {result.peak_traced / 1024 / 1024:.1f} MB allocated '
+                f'(was {previous.peak_traced / 1024 / 1024:.1f})'
+            )
+
+    return regressions
@@ -0,0 +1,247 @@
+"""
+Generates trip folders of any size (days, pictures, tracks and privacy zones), to measure how
+the build scales. The trips are reproducible: the same parameters (and seed) always generate
+the same files.
+"""
+
+import datetime
+import json
+import os
+import random
+import shutil
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from travel_log.assets.pictures.exif_reader import TAG_GPS_IFD
+
+# Where the trips start (around the sample project)
+START_DATE = datetime.date(2021, 5, 3)
+START_LATITUDE = 63.3
+START_LONGITUDE = 13.35
+
+# Distance (in degrees, roughly 10 meters) between two points of a track
+STEP = 0.0001
+
+# Written inside the folder, so a trip is not generated again with the same parameters
+PARAMETERS_FILENAME = '.synthetic_trip.json'
+
+LOREM_IPSUM = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt '
+    'ut labore et dolore magna aliqua. Non arcu risus quis varius quam quisque id diam vel.'
+)
+
+
+@dataclass(frozen=True)
+class SyntheticTripParameters:
+    days: int = 5
+    pictures_per_day: int = 10
+    tracks_per_day: int = 1
+    points_per_track: int = 2000
+    privacy_zones: int = 2
+
+    """
+    Radius (in km) of the privacy zones
+    """
+    privacy_zone_radius: float = 0.2
+
+    """
+    Width and height (in pixels) of the pictures
+    """
+    picture_size: tuple[int, int] = (1024, 768)
+
+    seed: int = 0
+
+
+def random_walk(
+    rng: np.random.Generator, latitude: float, longitude: float, points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :return: the latitudes and longitudes of a wandering path starting at the given point
+    """
+    angles = np.cumsum(rng.normal(0, 0.3, points))
+    latitudes = latitude + np.cumsum(np.sin(angles) * STEP)
+    longitudes = longitude + np.cumsum(np.cos(angles) * STEP * 2)
+
+    return latitudes, longitudes
+
+
+def write_gpx(
+    path: str,
+    name: str,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    start: datetime.datetime,
+) -> None:
+    with open(path, 'w') as file:
+        file.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<gpx version="1.1" creator="travel_log" xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f'<trk>\n<name>{name}</name>\n<trkseg>\n'
+        )
+
+        for index, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+            time = (start + datetime.timedelta(seconds=5 * index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            file.write(
+                f'<trkpt lat="{latitude:.7f}" lon="{longitude:.7f}">'
+                f'<ele>{400 + index % 50}</ele><time>{time}</time></trkpt>\n'
+            )
+
+        file.write('</trkseg>\n</trk>\n</gpx>\n')
+
+
+def to_degrees(value: float) -> tuple[float, float, float]:
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round((value - degrees - minutes / 60) * 3600, 2)
+
+    return float(degrees), float(minutes), seconds
+
+
+def write_picture(
+    path: str, rng: np.random.Generator, size: tuple[int, int], latitude: float, longitude: float
+) -> None:
+    """
+    Writes a JPEG with the coordinates on its EXIF metadata. The content is smooth gradients
+    with some noise: it compresses (and takes as long to encode) like a photo, roughly.
+    """
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    # One (horizontal and vertical) frequency per channel
+    frequencies = rng.uniform(0.002, 0.02, (3, 2))
+    channels = [
+        127 + 100 * np.sin(x * horizontal + y * vertical) for horizontal, vertical in frequencies
+    ]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 12, (height, width, 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+    exif = Image.Exif()
+    exif[TAG_GPS_IFD] = {
+        1: 'N' if latitude >= 0 else 'S',
+        2: to_degrees(latitude),
+        3: 'E' if longitude >= 0 else 'W',
+        4: to_degrees(longitude),
+    }
+
+    image.save(path, format='JPEG', quality=90, exif=exif.tobytes())
+
+
+def generate_synthetic_trip(folder_path: str, parameters: SyntheticTripParameters) -> bool:
+    """
+    Generates the trip on the folder (replacing anything on it), unless it was already generated
+    there with the same parameters.
+
+    :return: whether the trip was generated
+    """
+    parameters_path = os.path.join(folder_path, PARAMETERS_FILENAME)
+    description = json.dumps(asdict(parameters), sort_keys=True)
+
+    try:
+        with open(parameters_path) as file:
+            if file.read() == description:
+                return False
+    except FileNotFoundError:
+        pass
+
+    shutil.rmtree(folder_path, ignore_errors=True)
+    os.makedirs(folder_path)
+
+    rng = np.random.default_rng(parameters.seed)
+    # For the choices that do not need numpy
+    choices = random.Random(parameters.seed)
+
+    latitude, longitude = START_LATITUDE, START_LONGITUDE
+    # Points the privacy zones can be placed on (so they actually hide something)
+    visited = []
+
+    for day in range(parameters.days):
+        date = START_DATE + datetime.timedelta(days=day)
+        day_folder = os.path.join(folder_path, date.isoformat())
+        os.makedirs(day_folder)
+
+        day_latitudes, day_longitudes = [], []
+
+        for track in range(parameters.tracks_per_day):
+            latitudes, longitudes = random_walk(
+                rng, latitude, longitude, parameters.points_per_track
+            )
+            latitude, longitude = latitudes[-1], longitudes[-1]
+            day_latitudes.extend(latitudes.tolist())
+            day_longitudes.extend(longitudes.tolist())
+
+            start = datetime.datetime.combine(date, datetime.time(8 + track))
+            write_gpx(
+                os.path.join(day_folder, f'track{track + 1}.gpx'),
+                f'Day {day + 1}: track {track + 1}',
+                latitudes,
+                longitudes,
+                start,
+            )
+
+        if not day_latitudes:
+            day_latitudes, day_longitudes = [latitude], [longitude]
+
+        filenames = []
+
+        for picture in range(parameters.pictures_per_day):
+            point = choices.randrange(len(day_latitudes))
+            filename = f'day{day + 1}-p{picture + 1}.jpg'
+            filenames.append(filename)
+            write_picture(
+                os.path.join(day_folder, filename),
+                rng,
+                parameters.picture_size,
+                day_latitudes[point],
+                day_longitudes[point],
+            )
+
+        middle = len(day_latitudes) // 2
+        visited.append((day_latitudes[middle], day_longitudes[middle]))
+
+        day_metadata: dict[str, Any] = {'summary': LOREM_IPSUM}
+
+        # A highlight every few days, some of them for multiple days
+        if day % 3 == 0 and filenames:
+            to_date = date + datetime.timedelta(days=min(day % 2, parameters.days - day - 1))
+            day_metadata['highlights'] = [
+                {
+                    'name': f'Highlight of day {day + 1}',
+                    'summary': LOREM_IPSUM,
+                    'picture': f'{date.isoformat()}/{filenames[0]}',
+                    'to_date': to_date.isoformat(),
+                }
+            ]
+
+        with open(os.path.join(day_folder, 'day.yaml'), 'w') as file:
+            yaml.safe_dump(day_metadata, file)
+
+    privacy_zones = [
+        {
+            'name': f'Privacy zone {index + 1}',
+            'lat': round(float(zone_latitude), 7),
+            'lng': round(float(zone_longitude), 7),
+            'radius': parameters.privacy_zone_radius,
+        }
+        for index, (zone_latitude, zone_longitude) in enumerate(
+            choices.sample(visited, min(parameters.privacy_zones, len(visited)))
+        )
+    ]
+
+    with open(os.path.join(folder_path, 'trip.yaml'), 'w') as file:
+        yaml.safe_dump(
+            {
+                'title': f'Synthetic trip ({parameters.days} days)',
+                'summary': LOREM_IPSUM,
+                'privacy_zones': privacy_zones,
+            },
+            file,
+        )
+
+    with open(parameters_path, 'w') as file:
+        file.write(description)
+
+    return True
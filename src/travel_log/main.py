@@ -1,11 +1,48 @@
+import logging
 import os
+import time
+from dataclasses import replace
+from hashlib import md5
+from typing import Callable
 
 import click
 
-from travel_log.parsers.trip_parser import TripParser
-from travel_log.website.website_generator import generate_website
+from travel_log.assets.pictures.picture_resizer import (
+    DEFAULT_RESPONSIVE_WIDTHS,
+    FULL,
+    THUMBNAIL,
+    responsive_renditions,
+)
+from travel_log.assets.tracks.track_simplifier import DEFAULT_SIMPLIFY_TOLERANCE
+from travel_log.models.trip import Trip
+from travel_log.parsers.parse_cache import ParseCache
+from travel_log.parsers.trip_parser import DEFAULT_PARSE_WORKERS, TripParser
+from travel_log.utils.build_profiler import BuildProfiler
+from travel_log.utils.file_links import LINK_STRATEGIES, LINK_STRATEGY_AUTO
+from travel_log.utils.file_watcher import create_watcher
+from travel_log.utils.logging_utils import LOG_LEVELS, configure_logging
+from travel_log.website.dev_server import DevServer
+from travel_log.website.website_generator import (
+    TEMPLATES_FOLDERS,
+    generate_website,
+    generate_website_streaming,
+)
 
 CURRENT_FOLDER = os.path.dirname(os.path.realpath(__file__))
+CACHE_FOLDER = os.path.join(CURRENT_FOLDER, '../../output/.cache')
+
+logger = logging.getLogger(__name__)
+
+
+def load_parse_cache(input_folder: str, enabled: bool, rebuild: bool) -> ParseCache:
+    if not enabled:
+        return ParseCache()
+
+    path = os.path.join(
+        CACHE_FOLDER, 'parser', f'{md5(os.path.realpath(input_folder).encode()).hexdigest()}.pickle'
+    )
+
+    return ParseCache(path) if rebuild else ParseCache.load(path)
 
 
 @click.command()
@@ -15,12 +52,316 @@ CURRENT_FOLDER = os.path.dirname(os.path.realpath(__file__))
     default='../../output/website/',
     help='The folder where the website will be generated',
 )
-def main(input_folder, output_folder):
-    trip = TripParser.parse_folder(input_folder)
+@click.option(
+    '--jobs',
+    default=1,
+    type=click.IntRange(min=1),
+    help='Number of worker processes used to process the pictures',
+)
+@click.option(
+    '--parse-jobs',
+    default=DEFAULT_PARSE_WORKERS,
+    type=click.IntRange(min=1),
+    help='Number of day folders read at the same time (threads) when parsing the trip',
+)
+@click.option(
+    '--full-size',
+    default=FULL.size[0],
+    type=click.IntRange(min=1),
+    help='Maximum width and height (in pixels) of the full size pictures',
+)
+@click.option(
+    '--thumbnail-size',
+    default=THUMBNAIL.size[0],
+    type=click.IntRange(min=1),
+    help='Maximum width and height (in pixels) of the thumbnails',
+)
+@click.option(
+    '--responsive-width',
+    'responsive_widths',
+    default=DEFAULT_RESPONSIVE_WIDTHS,
+    multiple=True,
+    type=click.IntRange(min=1),
+    help='Width (in pixels) of a WebP version of the pictures, besides the thumbnail and the '
+    'full size ones, for the browsers to pick from. Can be repeated',
+)
+@click.option(
+    '--cache-max-size',
+    default=4096,
+    type=click.IntRange(min=0),
+    help='Maximum size (in MB) of the pictures cache. The least recently used pictures are evicted',
+)
+@click.option(
+    '--incremental/--full',
+    default=False,
+    help='Only regenerate the outputs whose inputs changed since the previous build',
+)
+@click.option(
+    '--track-tolerance',
+    default=DEFAULT_SIMPLIFY_TOLERANCE,
+    type=click.FloatRange(min=0),
+    help='Tolerance (in meters) used to simplify the tracks shown on the maps. 0 to disable',
+)
+@click.option(
+    '--publish-gpx/--no-publish-gpx',
+    default=False,
+    help='Also publish the GPX files (without the points inside privacy zones) for download',
+)
+@click.option(
+    '--page-per-day/--single-page',
+    default=False,
+    help='Render one page per day (linked from the summary), instead of a single page with all '
+    'the days. Recommended for long trips',
+)
+@click.option(
+    '--link-strategy',
+    default=LINK_STRATEGY_AUTO,
+    type=click.Choice(LINK_STRATEGIES),
+    help='How the pictures (from the cache) and the tracks are put on the output folder. '
+    'Hardlinks and reflinks (copy on write) are not written again. auto: reflink, then '
+    'hardlink, then copy (the fallback of every strategy)',
+)
+@click.option(
+    '--precompress/--no-precompress',
+    default=True,
+    help='Also write compressed versions (.gz, and .br if brotli is installed) of the pages, '
+    'scripts, styles, payloads and tracks, for static hosts that serve them directly',
+)
+@click.option(
+    '--parse-cache/--no-parse-cache',
+    default=True,
+    help='Reuse what was read from the unchanged files of the trip folder in previous runs',
+)
+@click.option(
+    '--rebuild-parse-cache',
+    is_flag=True,
+    help='Read everything from the trip folder again (and save it for the next runs)',
+)
+@click.option(
+    '--watch',
+    is_flag=True,
+    help='Keep running: rebuild what changed whenever the trip (or the templates) change, and '
+    'serve the website with live reload',
+)
+@click.option(
+    '--port',
+    default=8000,
+    type=click.IntRange(min=0, max=65535),
+    help='Port used to serve the website on watch mode',
+)
+@click.option(
+    '--streaming',
+    is_flag=True,
+    help='Parse, process and render one day at a time, keeping only what the summary page needs '
+    'in memory. For very long trips. Always renders one page per day. Not available on watch mode',
+)
+@click.option(
+    '--memory-limit',
+    default=None,
+    type=click.IntRange(min=1),
+    help='Maximum memory (in MB) of a streaming build: it fails if processing a day leaves it '
+    'using more',
+)
+@click.option('--log-level', default='info', type=click.Choice(LOG_LEVELS))
+@click.option(
+    '--log-json',
+    is_flag=True,
+    help='Log JSON objects (one per line, with the details of each message as fields)',
+)
+@click.option(
+    '--profile',
+    'profile_path',
+    default=None,
+    help='Save a report (JSON) of where the time of the build went: wall and CPU time, bytes '
+    'written and cache hits and misses, per stage and per asset',
+)
+@click.option(
+    '--profile-trace',
+    'profile_trace_path',
+    default=None,
+    help='Also save the stages and assets as a trace, to be opened on chrome://tracing (or '
+    'https://ui.perfetto.dev). Implies profiling',
+)
+def main(
+    input_folder,
+    output_folder,
+    jobs,
+    parse_jobs,
+    full_size,
+    thumbnail_size,
+    responsive_widths,
+    cache_max_size,
+    incremental,
+    track_tolerance,
+    publish_gpx,
+    page_per_day,
+    link_strategy,
+    precompress,
+    parse_cache,
+    rebuild_parse_cache,
+    watch,
+    port,
+    streaming,
+    memory_limit,
+    log_level,
+    log_json,
+    profile_path,
+    profile_trace_path,
+):
+    if streaming and watch:
+        raise click.UsageError('--streaming cannot be combined with --watch')
+
+    if memory_limit and not streaming:
+        raise click.UsageError('--memory-limit only applies to --streaming builds')
+
+    configure_logging(log_level, json_format=log_json)
+    profiling = bool(profile_path or profile_trace_path)
+
+    def parse(profiler: BuildProfiler, parse_trip: Callable[[], Trip]) -> Trip:
+        hits, misses = cache.hits, cache.misses
+
+        with profiler.stage('parse'):
+            trip = parse_trip()
+            cache.save()
 
+        count_parse_cache(profiler, hits, misses)
+
+        return trip
+
+    def count_parse_cache(profiler: BuildProfiler, hits: int, misses: int):
+        profiler.count('parse', 'cache_hits', cache.hits - hits)
+        profiler.count('parse', 'cache_misses', cache.misses - misses)
+        logger.info(
+            'Parse cache: %d hits, %d misses',
+            cache.hits - hits,
+            cache.misses - misses,
+            extra={'cache_hits': cache.hits - hits, 'cache_misses': cache.misses - misses},
+        )
+
+    def save_profile(profiler: BuildProfiler):
+        if not profiling:
+            return
+
+        logger.info('Profile: %s', profiler.summary())
+
+        if profile_path:
+            profiler.save_report(profile_path)
+            logger.info('Saved the profile report to %s', profile_path)
+
+        if profile_trace_path:
+            profiler.save_trace(profile_trace_path)
+            logger.info('Saved the profile trace to %s', profile_trace_path)
+
+    cache = load_parse_cache(input_folder, parse_cache, rebuild_parse_cache)
+    profiler = BuildProfiler(enabled=profiling)
     output_path = os.path.join(CURRENT_FOLDER, output_folder)
-    cache_path = os.path.join(CURRENT_FOLDER, '../../output/.cache')
-    generate_website(trip, output_path, cache_path)
+    renditions = responsive_renditions(
+        replace(FULL, size=(full_size, full_size)),
+        replace(THUMBNAIL, size=(thumbnail_size, thumbnail_size)),
+        responsive_widths,
+    )
+
+    if streaming:
+        # The days are parsed as the website is generated
+        generate_website_streaming(
+            TripParser.stream_folder(input_folder, cache, profiler=profiler),
+            output_path,
+            CACHE_FOLDER,
+            jobs=jobs,
+            renditions=renditions,
+            cache_max_size=cache_max_size * 1024 * 1024,
+            incremental=incremental,
+            simplify_tolerance=track_tolerance,
+            publish_gpx=publish_gpx,
+            link_strategy=link_strategy,
+            precompress=precompress,
+            memory_limit=memory_limit * 1024 * 1024 if memory_limit else None,
+            profiler=profiler,
+        )
+        cache.save()
+        count_parse_cache(profiler, 0, 0)
+        save_profile(profiler)
+        return
+
+    trip = parse(
+        profiler,
+        lambda: TripParser.parse_folder(
+            input_folder, cache, max_workers=parse_jobs, profiler=profiler
+        ),
+    )
+
+    def build(trip, incremental, profiler):
+        generate_website(
+            trip,
+            output_path,
+            CACHE_FOLDER,
+            jobs=jobs,
+            renditions=renditions,
+            cache_max_size=cache_max_size * 1024 * 1024,
+            incremental=incremental,
+            simplify_tolerance=track_tolerance,
+            publish_gpx=publish_gpx,
+            page_per_day=page_per_day,
+            link_strategy=link_strategy,
+            precompress=precompress,
+            profiler=profiler,
+        )
+
+    build(trip, incremental, profiler)
+    save_profile(profiler)
+
+    if not watch:
+        return
+
+    server = DevServer(output_path, port=port)
+    server.start()
+    watcher = create_watcher([input_folder, *TEMPLATES_FOLDERS])
+    logger.info('Serving on %s, watching for changes (Ctrl+C to stop)', server.url)
+
+    try:
+        # Changes not built yet (the previous rebuild failed)
+        changed_paths = set()
+
+        while True:
+            changed_paths |= watcher.wait_for_changes()
+            start = time.perf_counter()
+            # A profile per rebuild (each one replacing the previous one)
+            profiler = BuildProfiler(enabled=profiling)
+
+            try:
+                # The trip and the parse cache are kept in memory: only the days affected are
+                # parsed again, and only the outputs affected are generated again
+                trip = parse(
+                    profiler,
+                    lambda: TripParser.update(
+                        trip,
+                        input_folder,
+                        changed_paths,
+                        cache,
+                        max_workers=parse_jobs,
+                        profiler=profiler,
+                    ),
+                )
+                build(trip, incremental=True, profiler=profiler)
+            except Exception:
+                # Keeps watching (and serving the previous build) until the problem is fixed
+                logger.exception('Rebuild failed')
+                continue
+
+            server.reload()
+            save_profile(profiler)
+            logger.info(
+                'Rebuilt in %.2fs (%d changes)',
+                time.perf_counter() - start,
+                len(changed_paths),
+                extra={'seconds': time.perf_counter() - start, 'changes': len(changed_paths)},
+            )
+            changed_paths = set()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.stop()
 
 
 if __name__ == '__main__':
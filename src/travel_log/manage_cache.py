@@ -0,0 +1,52 @@
+import os
+
+import click
+
+from travel_log.assets.pictures.rendition_cache import RenditionCache
+from travel_log.main import CACHE_FOLDER
+
+RENDITIONS_CACHE_FOLDER = os.path.join(CACHE_FOLDER, 'renditions')
+
+
+def format_size(size: int) -> str:
+    return f'{size / 1024 / 1024:.1f} MB'
+
+
+@click.group()
+def cache():
+    """
+    Inspect and clean up the pictures cache (under output/.cache).
+    """
+
+
+@cache.command()
+def stats():
+    rendition_cache = RenditionCache.load(RENDITIONS_CACHE_FOLDER)
+
+    click.echo(f'Folder: {os.path.realpath(RENDITIONS_CACHE_FOLDER)}')
+    click.echo(f'Original pictures: {len(rendition_cache.sources)}')
+    click.echo(f'Renditions: {rendition_cache.rendition_count}')
+    click.echo(f'Size: {format_size(rendition_cache.total_size)}')
+
+
+@cache.command()
+@click.option(
+    '--max-size',
+    default=None,
+    type=click.IntRange(min=0),
+    help='Also evict the least recently used pictures until the cache fits in this size (in MB)',
+)
+def prune(max_size):
+    """
+    Removes files not tracked by the cache index and references to deleted pictures.
+    """
+    rendition_cache = RenditionCache.load(RENDITIONS_CACHE_FOLDER)
+
+    removed, freed = rendition_cache.prune(None if max_size is None else max_size * 1024 * 1024)
+    rendition_cache.save()
+
+    click.echo(f'Removed {removed} files ({format_size(freed)})')
+
+
+if __name__ == '__main__':
+    cache()
@@ -0,0 +1,96 @@
+import datetime
+from typing import Iterable
+
+from travel_log.models.highlight import Highlight
+
+
+class HighlightIndex:
+    """
+    A static interval tree over the dates of many highlights (from `from_date` to `to_date`,
+    both inclusive).
+
+    The highlights are sorted by their first date, and seen as an implicit balanced binary tree
+    (the middle of each range is the root of its subtree). Each node keeps the last date of its
+    whole subtree, so subtrees that end before the queried range are skipped, as well as the
+    nodes that start after it. Queries take O(log n + k), k being the number of highlights found.
+    """
+
+    def __init__(self, highlights: Iterable[Highlight]):
+        # Stable: highlights of the same date keep their order
+        self.highlights = sorted(highlights, key=lambda highlight: highlight.from_date)
+
+        # The last date of each highlight (its `from_date`, if it has no `to_date`)
+        self._to_dates: list[datetime.date] = [
+            highlight.to_date or highlight.from_date for highlight in self.highlights
+        ]
+
+        # For the node at each position: the latest last date of its subtree
+        self._max_to_dates = list(self._to_dates)
+
+        if self.highlights:
+            self._build(0, len(self.highlights))
+
+    def __len__(self) -> int:
+        return len(self.highlights)
+
+    def _build(self, start: int, end: int) -> datetime.date:
+        middle = (start + end) // 2
+        max_to_date = self._max_to_dates[middle]
+
+        if start < middle:
+            max_to_date = max(max_to_date, self._build(start, middle))
+
+        if middle + 1 < end:
+            max_to_date = max(max_to_date, self._build(middle + 1, end))
+
+        self._max_to_dates[middle] = max_to_date
+
+        return max_to_date
+
+    def on_date(self, date: datetime.date) -> list[Highlight]:
+        """
+        :return: the highlights happening on the date (including multiple day highlights that
+        started before it), sorted by their first date
+        """
+        return self.overlapping(date, date)
+
+    def overlapping(self, from_date: datetime.date, to_date: datetime.date) -> list[Highlight]:
+        """
+        :return: the highlights happening on any day from `from_date` to `to_date` (inclusive),
+        sorted by their first date
+        """
+        found: list[Highlight] = []
+
+        if self.highlights:
+            self._collect(0, len(self.highlights), from_date, to_date, found)
+
+        return found
+
+    def _collect(
+        self,
+        start: int,
+        end: int,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        found: list[Highlight],
+    ) -> None:
+        middle = (start + end) // 2
+
+        # Everything on this subtree ended before the range
+        if self._max_to_dates[middle] < from_date:
+            return
+
+        if start < middle:
+            self._collect(start, middle, from_date, to_date, found)
+
+        highlight = self.highlights[middle]
+
+        # This one (and everything after it) starts after the range
+        if highlight.from_date > to_date:
+            return
+
+        if self._to_dates[middle] >= from_date:
+            found.append(highlight)
+
+        if middle + 1 < end:
+            self._collect(middle + 1, end, from_date, to_date, found)
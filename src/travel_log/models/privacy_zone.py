@@ -1,11 +1,21 @@
-from copy import copy
+import logging
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Union
 
 import geopy.distance
+import numpy as np
 from travel_log.assets.pictures.picture import Picture
 from travel_log.assets.tracks.track import Track
 from travel_log.models.coordinates import Coordinates
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
+from travel_log.utils.file_links import LINK_STRATEGY_AUTO
+from travel_log.utils.geospatial_utils import (
+    HAVERSINE_MAX_RELATIVE_ERROR,
+    bounding_box_mask,
+    haversine_distances,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -34,6 +44,40 @@ class PrivacyZone:
 
         return distance <= self.radius
 
+    def points_inside_mask(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of `_is_point_inside`, for many points at once (eg: a track).
+
+        Gives exactly the same results as the geodesic check done point by point:
+            1) a cheap bounding box discards most of the points
+            2) the haversine distance is computed for the remaining ones
+            3) since haversine can be off by up to HAVERSINE_MAX_RELATIVE_ERROR, points that
+               close to the border of the zone are checked again with the geodesic distance
+
+        :param latitudes: array with the latitudes of the points
+        :param longitudes: array with the longitudes of the points
+        :return: boolean array, True for the points inside this privacy zone
+        """
+        mask = bounding_box_mask(latitudes, longitudes, self.lat, self.lng, self.radius)
+        candidates = np.flatnonzero(mask)
+
+        if len(candidates) == 0:
+            return mask
+
+        distances = haversine_distances(
+            latitudes[candidates], longitudes[candidates], self.lat, self.lng
+        )
+        mask[candidates] = distances <= self.radius
+
+        uncertain = np.abs(distances - self.radius) <= self.radius * HAVERSINE_MAX_RELATIVE_ERROR
+
+        for index in candidates[uncertain]:
+            mask[index] = self._is_point_inside(
+                Coordinates(latitude=latitudes[index], longitude=longitudes[index])
+            )
+
+        return mask
+
     def is_picture_inside(self, picture: Picture) -> bool:
         if not picture.coordinates:
             return False
@@ -41,24 +85,32 @@ class PrivacyZone:
         return self._is_point_inside(picture.coordinates)
 
     @staticmethod
-    def apply_many_on_processed_picture(privacy_zones: Iterable['PrivacyZone'], path: str) -> bool:
+    def apply_many_on_processed_picture(
+        privacy_zones: Union[PrivacyZoneIndex, Iterable['PrivacyZone']], path: str
+    ) -> bool:
         '''
         Takes many privacy zones and a path to a picture and check if the picture has
         EXIF geolocation and if it lies inside any privacy zone. If it does, the
         EXIF geolocation is removed and the method returns True.
 
-        :param privacy_zones: a list of privacy zones
+        :param privacy_zones: a list (or an index) of privacy zones
         :param path: the path to a picture
         :return: whether the picture lies inside a privacy zone
         '''
         picture = Picture(path)
         picture.is_read_only = False
 
-        for privacy_zone in privacy_zones:
-            if privacy_zone.is_picture_inside(picture):
-                print(f'Picture inside {privacy_zone.name}')
-                picture.remove_exif_coordinates()
-                return True
+        privacy_zone = PrivacyZoneIndex.of(privacy_zones).zone_containing_picture(picture)
+
+        if privacy_zone:
+            logger.info(
+                'Picture %s inside %s',
+                picture.filename,
+                privacy_zone.name,
+                extra={'picture': picture.path, 'privacy_zone': privacy_zone.name},
+            )
+            picture.remove_exif_coordinates()
+            return True
 
         return False
 
@@ -70,38 +122,37 @@ class PrivacyZone:
         :param input_track:
         :return: the track (either original or modified)
         """
+        return PrivacyZoneIndex([self]).process_track(input_track)
 
-        track_data = input_track.data
-
-        points_removed = 0
-
-        for track in track_data.tracks:
-            for segment in track.segments:
-                for point in copy(segment.points):
-                    point_coordinates = Coordinates(
-                        latitude=point.latitude, longitude=point.longitude
-                    )
-
-                    if self._is_point_inside(point_coordinates):
-                        segment.points.remove(point)
-                        points_removed += 1
-
-        if points_removed > 0:
-            print(
-                f'Track {input_track.filename} had points {points_removed} removed from '
-                f'inside "{self.name}" privacy zone'
-            )
-
-            input_track.data = track_data
+    @staticmethod
+    def apply_many_on_processed_track(
+        privacy_zones: Union[PrivacyZoneIndex, Iterable['PrivacyZone']], path: str
+    ) -> bool:
+        """
+        Removes (in place) the points of the track file inside any of the privacy zones. The
+        file is streamed, so this works in bounded memory no matter how big the track is.
 
-        return input_track
+        :param privacy_zones: a list (or an index) of privacy zones
+        :param path: the path to a track
+        :return: whether the file was modified
+        """
+        return PrivacyZone.apply_many_on_track_file(privacy_zones, path, path)
 
     @staticmethod
-    def apply_many_on_processed_track(privacy_zones: Iterable['PrivacyZone'], path: str) -> bool:
-        track = Track(path)
-        track.is_read_only = False
+    def apply_many_on_track_file(
+        privacy_zones: Union[PrivacyZoneIndex, Iterable['PrivacyZone']],
+        input_path: str,
+        output_path: str,
+        link_strategy: str = LINK_STRATEGY_AUTO,
+    ) -> bool:
+        """
+        Same as `apply_many_on_processed_track`, but reads the original track and writes the
+        processed one somewhere else (eg: the website folder), in a single pass.
 
-        for privacy_zone in privacy_zones:
-            track = privacy_zone.process_track(track)
+        :param link_strategy: how the original is put on the output path, if no point is
+        removed (see `link_file`)
+        :return: whether any point was removed
+        """
+        index = PrivacyZoneIndex.of(privacy_zones)
 
-        return track.persist_data()
+        return index.filter_track_file(input_path, output_path, link_strategy) > 0
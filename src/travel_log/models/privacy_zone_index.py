@@ -0,0 +1,242 @@
+import logging
+import math
+import os
+from collections import defaultdict
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+import numpy as np
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.tracks.gpx_stream import filter_track_points
+from travel_log.assets.tracks.track import Track
+from travel_log.models.coordinates import Coordinates
+from travel_log.utils.file_links import LINK_STRATEGY_AUTO, link_file
+from travel_log.utils.geospatial_utils import bounding_box_deltas
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from travel_log.models.privacy_zone import PrivacyZone
+
+# In degrees. Around 11 km (north-south), which is a few times the usual privacy zone radius
+GRID_CELL_SIZE = 0.1
+
+# Zones that would be spread over more cells than this (huge or close to a pole) are not put on
+# the grid, but always checked
+MAX_CELLS_PER_ZONE = 10_000
+
+
+class PrivacyZoneIndex:
+    """
+    A spatial index over many privacy zones: a uniform grid (in degrees) where each cell lists
+    the zones whose bounding box overlaps it.
+
+    Finding the zones a point might be in is a single dictionary lookup, no matter how many
+    zones there are. Only those candidate zones are then checked with the exact distance.
+    """
+
+    def __init__(self, privacy_zones: Iterable['PrivacyZone'], cell_size: float = GRID_CELL_SIZE):
+        self.privacy_zones = list(privacy_zones)
+        self.cell_size = cell_size
+
+        self._longitude_cells = math.ceil(360 / cell_size)
+        self._cells: dict[int, list[int]] = defaultdict(list)
+        self._unindexed: list[int] = []
+
+        for zone_index, privacy_zone in enumerate(self.privacy_zones):
+            self._add_to_grid(zone_index, privacy_zone)
+
+    @classmethod
+    def of(
+        cls, privacy_zones: Union['PrivacyZoneIndex', Iterable['PrivacyZone']]
+    ) -> 'PrivacyZoneIndex':
+        """
+        :return: the given index, or a new index for the given privacy zones
+        """
+        if isinstance(privacy_zones, PrivacyZoneIndex):
+            return privacy_zones
+
+        return cls(privacy_zones)
+
+    def __len__(self) -> int:
+        return len(self.privacy_zones)
+
+    def _add_to_grid(self, zone_index: int, privacy_zone: 'PrivacyZone') -> None:
+        delta_latitude, delta_longitude = bounding_box_deltas(privacy_zone.lat, privacy_zone.radius)
+
+        if delta_longitude is None:
+            self._unindexed.append(zone_index)
+            return
+
+        first_latitude_cell = self._latitude_cell(privacy_zone.lat - delta_latitude)
+        last_latitude_cell = self._latitude_cell(privacy_zone.lat + delta_latitude)
+        first_longitude_cell = math.floor((privacy_zone.lng - delta_longitude) / self.cell_size)
+        last_longitude_cell = math.floor((privacy_zone.lng + delta_longitude) / self.cell_size)
+
+        cells_count = (last_latitude_cell - first_latitude_cell + 1) * (
+            last_longitude_cell - first_longitude_cell + 1
+        )
+
+        if cells_count > MAX_CELLS_PER_ZONE:
+            self._unindexed.append(zone_index)
+            return
+
+        for latitude_cell in range(first_latitude_cell, last_latitude_cell + 1):
+            for longitude_cell in range(first_longitude_cell, last_longitude_cell + 1):
+                # The modulo wraps the cells around the antimeridian
+                key = latitude_cell * self._longitude_cells + longitude_cell % self._longitude_cells
+                self._cells[key].append(zone_index)
+
+    def _latitude_cell(self, latitude: float) -> int:
+        return math.floor((min(max(latitude, -90.0), 90.0) + 90) / self.cell_size)
+
+    def _cell_key(self, latitude: float, longitude: float) -> int:
+        longitude_cell = math.floor(longitude / self.cell_size) % self._longitude_cells
+        return self._latitude_cell(latitude) * self._longitude_cells + longitude_cell
+
+    def _cell_keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        latitude_cells = np.floor((np.clip(latitudes, -90, 90) + 90) / self.cell_size)
+        longitude_cells = np.floor(longitudes / self.cell_size) % self._longitude_cells
+
+        return (latitude_cells * self._longitude_cells + longitude_cells).astype(np.int64)
+
+    def candidates(self, coordinates: Coordinates) -> list['PrivacyZone']:
+        """
+        :return: the privacy zones that might contain the given point (to be checked with the
+        exact distance)
+        """
+        key = self._cell_key(coordinates.latitude, coordinates.longitude)
+        zone_indexes = self._cells.get(key, []) + self._unindexed
+
+        return [self.privacy_zones[zone_index] for zone_index in sorted(zone_indexes)]
+
+    def zone_containing(self, coordinates: Coordinates) -> Optional['PrivacyZone']:
+        for privacy_zone in self.candidates(coordinates):
+            if privacy_zone._is_point_inside(coordinates):
+                return privacy_zone
+
+        return None
+
+    def zone_containing_picture(self, picture: Picture) -> Optional['PrivacyZone']:
+        """
+        Checks where the picture was taken (from its EXIF metadata), even if its coordinates are
+        already ignored.
+        """
+        if not picture.exif_coordinates:
+            return None
+
+        return self.zone_containing(picture.exif_coordinates)
+
+    def points_inside_mask(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Checks many points at once against all the privacy zones. Each zone is only checked
+        against the points on the grid cells it overlaps.
+
+        :return: boolean array, True for the points inside any privacy zone
+        """
+        mask = np.zeros(len(latitudes), dtype=bool)
+
+        if not self.privacy_zones or len(latitudes) == 0:
+            return mask
+
+        keys = self._cell_keys(latitudes, longitudes)
+        cells_by_zone: dict[int, list[int]] = defaultdict(list)
+
+        for key in np.unique(keys).tolist():
+            for zone_index in self._cells.get(key, []):
+                cells_by_zone[zone_index].append(key)
+
+        for zone_index, zone_keys in cells_by_zone.items():
+            selected = np.flatnonzero(np.isin(keys, zone_keys))
+            mask[selected] |= self.privacy_zones[zone_index].points_inside_mask(
+                latitudes[selected], longitudes[selected]
+            )
+
+        for zone_index in self._unindexed:
+            mask |= self.privacy_zones[zone_index].points_inside_mask(latitudes, longitudes)
+
+        return mask
+
+    def filter_track_file(
+        self, input_path: str, output_path: str, link_strategy: str = LINK_STRATEGY_AUTO
+    ) -> int:
+        """
+        Writes a copy of the GPX file without the points inside any of the privacy zones. The
+        file is streamed (never fully loaded in memory), so it works for very large tracks.
+
+        If no point is removed, the output is an exact copy of the input (materialized
+        according to the `link_strategy`, see `link_file`). Input and output can be the same
+        path (the file is then replaced atomically). The output is always replaced, never
+        written through, so an output hardlinked to the input never modifies it.
+
+        :return: the number of points removed
+        """
+        temporary_path = f'{output_path}.tmp'
+
+        try:
+            points_removed = filter_track_points(
+                input_path, temporary_path, self.points_inside_mask
+            )
+
+            if points_removed > 0:
+                os.replace(temporary_path, output_path)
+            elif os.path.realpath(input_path) != os.path.realpath(output_path):
+                link_file(input_path, output_path, link_strategy)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        if points_removed > 0:
+            logger.info(
+                'Removed %d points of %s inside privacy zones',
+                points_removed,
+                os.path.basename(input_path),
+                extra={'track': input_path, 'points_removed': points_removed},
+            )
+
+        return points_removed
+
+    def process_track(self, input_track: Track) -> Track:
+        """
+        Removes the points of the track inside any of the privacy zones.
+
+        :param input_track:
+        :return: the track (either original or modified)
+        """
+        track_data = input_track.data
+
+        points_removed = 0
+
+        for track in track_data.tracks:
+            for segment in track.segments:
+                if not segment.points:
+                    continue
+
+                latitudes = np.fromiter(
+                    (point.latitude for point in segment.points), float, len(segment.points)
+                )
+                longitudes = np.fromiter(
+                    (point.longitude for point in segment.points), float, len(segment.points)
+                )
+
+                inside = self.points_inside_mask(latitudes, longitudes)
+
+                if inside.any():
+                    # Rebuilds the segment in a single pass (instead of removing point by point)
+                    segment.points = [
+                        point
+                        for point, is_inside in zip(segment.points, inside.tolist())
+                        if not is_inside
+                    ]
+                    points_removed += int(inside.sum())
+
+        if points_removed > 0:
+            logger.info(
+                'Removed %d points of %s inside privacy zones',
+                points_removed,
+                input_track.filename,
+                extra={'track': input_track.path, 'points_removed': points_removed},
+            )
+
+            input_track.data = track_data
+
+        return input_track
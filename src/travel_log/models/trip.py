@@ -1,9 +1,13 @@
 import datetime
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import cached_property
+from typing import Iterator, Optional
 
+from travel_log.assets.tracks.track_stats import TrackStats
 from travel_log.models.highlight import Highlight
+from travel_log.models.highlight_index import HighlightIndex
 from travel_log.models.privacy_zone import PrivacyZone
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
 from travel_log.models.trip_day import TripDay
 
 
@@ -21,7 +25,93 @@ class Trip:
 
     summary: Optional[str] = None
 
+    @cached_property
+    def privacy_zone_index(self) -> PrivacyZoneIndex:
+        """
+        Built once (and not on every picture and track), so it can be shared by all of them.
+        """
+        return PrivacyZoneIndex(self.privacy_zones)
+
+    @cached_property
+    def stats(self) -> TrackStats:
+        """
+        The stats of all the tracks of the trip, combined (from the stats of each day).
+        """
+        return TrackStats.combine(trip_day.stats for trip_day in self.trip_days)
+
+    @cached_property
+    def highlight_index(self) -> HighlightIndex:
+        """
+        Built once (and not on every day rendered).
+        """
+        return HighlightIndex(self.highlights)
+
+    def add_highlights(self, highlights: list[Highlight]) -> None:
+        """
+        Adds highlights (eg: of the days parsed so far, on a streaming build). The highlight
+        index is built again, if there are new ones.
+        """
+        if highlights:
+            self.highlights.extend(highlights)
+            vars(self).pop('highlight_index', None)
+
     def highlights_on_date(self, date: datetime.date) -> list[Highlight]:
-        # TODO: add support to a highlight with a date range
+        """
+        :return: the highlights happening on the date, including the multiple day ones
+        """
+        return self.highlight_index.on_date(date)
+
+    def highlights_between(
+        self, from_date: datetime.date, to_date: datetime.date
+    ) -> list[Highlight]:
+        """
+        :return: the highlights happening on any day of the range (inclusive)
+        """
+        return self.highlight_index.overlapping(from_date, to_date)
+
+
+@dataclass
+class TripStream:
+    """
+    A trip whose days are parsed (and should be processed) one at a time, in order, so a single
+    day is in memory at once (see `TripParser.stream_folder`). Only what the trip-level pages
+    need is kept: the dates, the stats of each day, and the highlights.
+    """
+
+    title: str
+
+    """
+    The dates of all the days, known before they are parsed (eg: to link them on every page)
+    """
+    dates: list[datetime.date]
+
+    """
+    The days, parsed as they are consumed (once)
+    """
+    trip_days: Iterator[TripDay]
+
+    privacy_zones: list[PrivacyZone] = field(default_factory=list)
+
+    """
+    The highlights of the days consumed so far (highlights start on their first day, so they
+    are known by the time that day is processed)
+    """
+    highlights: list[Highlight] = field(default_factory=list)
+
+    summary: Optional[str] = None
+
+    def trip(self, trip_days: list) -> Trip:
+        """
+        Should be called once for each purpose (and its days swapped or updated, see
+        `Trip.add_highlights`), so the indexes of the trip are only built once.
 
-        return list(highlight for highlight in self.highlights if highlight.from_date == date)
+        :param trip_days: the days (or their summaries) of the trip
+        :return: a trip with the days, and the highlights known so far
+        """
+        return Trip(
+            title=self.title,
+            trip_days=trip_days,
+            highlights=list(self.highlights),
+            privacy_zones=self.privacy_zones,
+            summary=self.summary,
+        )
@@ -1,10 +1,12 @@
 # Represents a day. Will hold all assets, metadata, etc
 import datetime
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional, Mapping
 
 from travel_log.assets.pictures.picture import Picture
 from travel_log.assets.tracks.track import Track
+from travel_log.assets.tracks.track_stats import TrackStats
 
 
 @dataclass
@@ -25,5 +27,31 @@ class TripDay:
     def date_iso(self):
         return self.date.isoformat()
 
+    @cached_property
+    def stats(self) -> TrackStats:
+        """
+        The stats of all the tracks of the day, combined.
+        """
+        return TrackStats.combine(track.stats for track in self.tracks)
+
     def find_picture_by_filename(self, filename):
         return next(picture for picture in self.pictures if picture.filename == filename)
+
+
+@dataclass
+class TripDaySummary:
+    """
+    What the pages of the other days (and of the trip) need to know about a day, on streaming
+    builds (see `TripStream`): the day itself is not kept in memory once processed.
+    """
+
+    date: datetime.date
+
+    """
+    The stats of the tracks of the day. Unknown (None) until the day is processed
+    """
+    stats: Optional[TrackStats] = None
+
+    @property
+    def date_iso(self):
+        return self.date.isoformat()
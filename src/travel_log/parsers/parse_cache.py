@@ -0,0 +1,119 @@
+import os
+import pickle
+import threading
+from typing import Any, Callable, Optional, TypeVar
+
+import yaml
+from travel_log.assets.abstract_asset import FileStat
+
+T = TypeVar('T')
+
+PARSE_CACHE_VERSION = 1
+
+
+class ParseCache:
+    """
+    A snapshot of what was read from the trip folder by the parsers (YAML content, folder
+    listings, EXIF coordinates, etc), persisted between runs.
+
+    Each entry is keyed by a path and a kind (what was read from it), and is only valid while the
+    size and modification time of the path are the same. A run on an unchanged trip only needs
+    to `stat` the files, instead of opening and parsing them.
+
+    Entries not used during a run (eg: the file was removed) are not saved again.
+
+    Without a `path`, nothing is loaded nor saved: everything is read from the files (and kept in
+    memory only during the run).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+
+        self.entries: dict[tuple[str, str], tuple[int, int, Any]] = {}
+        self.used: set[tuple[str, str]] = set()
+
+        self.hits = 0
+        self.misses = 0
+
+        # Folders might be parsed in parallel (threads)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'ParseCache':
+        cache = cls(path)
+
+        try:
+            with open(path, 'rb') as file:
+                content = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return cache
+
+        if isinstance(content, dict) and content.get('version') == PARSE_CACHE_VERSION:
+            cache.entries = content['entries']
+
+        return cache
+
+    def save(self) -> None:
+        if not self.path:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        entries = {key: value for key, value in self.entries.items() if key in self.used}
+
+        with open(f'{self.path}.tmp', 'wb') as file:
+            pickle.dump({'version': PARSE_CACHE_VERSION, 'entries': entries}, file)
+
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def get(
+        self, path: str, kind: str, read: Callable[[], T], file_stat: Optional[FileStat] = None
+    ) -> T:
+        """
+        :param path: the file (or folder) the value is read from
+        :param kind: what is read from it (eg: 'yaml', 'listing', 'gps')
+        :param read: reads the value, if not in the cache (or outdated)
+        :param file_stat: the stat of the file, if already known (eg: from the AssetScanner)
+        :return: the value, from the cache if the file did not change
+        """
+        stat = file_stat or FileStat.of(os.stat(path))
+        key = (path, kind)
+
+        with self._lock:
+            self.used.add(key)
+            entry = self.entries.get(key)
+
+            if entry and entry[0] == stat.size and entry[1] == stat.mtime_ns:
+                self.hits += 1
+                return entry[2]
+
+            self.misses += 1
+
+        value = read()
+
+        with self._lock:
+            self.entries[key] = (stat.size, stat.mtime_ns, value)
+
+        return value
+
+    def listing(self, folder_path: str) -> list[tuple[str, bool]]:
+        """
+        :return: the entries of a folder, as (name, is folder) tuples sorted by name. A folder
+        changes its modification time when entries are added, removed or renamed.
+        """
+
+        def read_listing():
+            with os.scandir(folder_path) as entries:
+                return sorted((entry.name, entry.is_dir()) for entry in entries)
+
+        return self.get(folder_path, 'listing', read_listing)
+
+    def yaml_content(self, path: str) -> Any:
+        """
+        :return: the parsed content of a YAML file
+        """
+
+        def read_yaml():
+            with open(path) as file:
+                return yaml.full_load(file)
+
+        return self.get(path, 'yaml', read_yaml)
@@ -1,36 +1,63 @@
 import datetime
 import operator
 import os
+from collections import Counter
+from typing import Optional
 
-import yaml
-
+from travel_log.assets.asset_scanner import AssetScanner
 from travel_log.assets.pictures.picture import Picture
 from travel_log.assets.tracks.track import Track
 from travel_log.models.trip_day import TripDay
+from travel_log.parsers.parse_cache import ParseCache
+
+ASSET_SCANNER = AssetScanner([Picture, Track])
 
 
 class TripDayParser:
     @staticmethod
-    def parse_folder(folder_path) -> TripDay:
+    def parse_folder(folder_path, cache: Optional[ParseCache] = None) -> TripDay:
+        """
+        :param folder_path: the folder of the day (named after its date). Assets can be in sub
+        folders (eg: one per camera), as long as their filenames are unique within the day.
+        :param cache: what was read in previous runs (see ParseCache). Without it, everything is
+        read from the files.
+        """
+        cache = cache or ParseCache()
+
         folder_name = os.path.basename(folder_path)
         date = datetime.date.fromisoformat(folder_name)
         trip_day = TripDay(date)
 
+        assets = ASSET_SCANNER.scan(folder_path)
+
         trip_day.pictures = sorted(
-            Picture.from_folder_path(folder_path), key=operator.attrgetter('filename')
+            (asset for asset in assets if isinstance(asset, Picture)),
+            key=operator.attrgetter('filename'),
         )
         trip_day.tracks = sorted(
-            Track.from_folder_path(folder_path), key=operator.attrgetter('filename')
+            (asset for asset in assets if isinstance(asset, Track)),
+            key=operator.attrgetter('filename'),
         )
 
+        # The website has a folder per day, so assets in different sub folders would overwrite
+        # each other
+        filenames = Counter(asset.filename for asset in assets)
+        duplicates = sorted(filename for filename, count in filenames.items() if count > 1)
+
+        if duplicates:
+            raise RuntimeError(f'Duplicate filenames in {folder_path}: {", ".join(duplicates)}')
+
+        for picture in trip_day.pictures:
+            picture.gps = cache.get(picture.path, 'gps', lambda: picture.gps, picture.file_stat)
+            picture.dimensions = cache.get(
+                picture.path, 'dimensions', lambda: picture.dimensions, picture.file_stat
+            )
+
         try:
-            with open(os.path.join(folder_path, 'day.yaml')) as file:
-                trip_day.metadata = yaml.full_load(file)
+            trip_day.metadata = cache.yaml_content(os.path.join(folder_path, 'day.yaml'))
 
             trip_day.summary = trip_day.metadata.get('summary')
         except FileNotFoundError:
             pass
 
-        print(trip_day)
-
         return trip_day
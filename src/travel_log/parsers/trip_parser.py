@@ -1,67 +1,243 @@
+import datetime
+import logging
 import operator
 import os
-
-import yaml
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Mapping, Optional, Union
 
 from travel_log.models.highlight import Highlight
 from travel_log.models.privacy_zone import PrivacyZone
-from travel_log.models.trip import Trip
+from travel_log.models.trip import Trip, TripStream
 from travel_log.models.trip_day import TripDay
+from travel_log.parsers.parse_cache import ParseCache
 from travel_log.parsers.trip_day_parser import TripDayParser
+from travel_log.utils.build_profiler import BuildProfiler
+
+logger = logging.getLogger(__name__)
+
+# Parsing a day is mostly waiting on the file system (listing folders, reading the beginning of
+# the pictures), so threads are enough, and more of them than CPUs help on network mounts
+DEFAULT_PARSE_WORKERS = 8
+
+
+class TripParsingError(RuntimeError):
+    """
+    Raised after all the days were parsed if at least one of them failed.
+    """
+
+    def __init__(self, errors: Mapping[str, BaseException]):
+        """
+        :param errors: the folder of each day that failed -> the error
+        """
+        self.errors = errors
+
+        details = '\n'.join(f'* {folder}: {error!r}' for folder, error in errors.items())
+        super().__init__(f'{len(errors)} day folder(s) could not be parsed:\n{details}')
 
 
 class TripParser:
     @classmethod
-    def parse_folder(cls, folder_path: str) -> Trip:
-        trip_metadata = cls.parse_trip_metadata(folder_path)
+    def parse_folder(
+        cls,
+        folder_path: str,
+        cache: Optional[ParseCache] = None,
+        *,
+        max_workers: int = DEFAULT_PARSE_WORKERS,
+        profiler: Optional[BuildProfiler] = None,
+    ) -> Trip:
+        """
+        :param folder_path: the folder of the trip
+        :param cache: what was read in previous runs (see ParseCache). Without it, everything is
+        read from the files.
+        :param max_workers: number of day folders parsed at the same time (threads)
+        :param profiler: records the time spent on each day folder
+        """
+        cache = cache or ParseCache()
+        trip_metadata = cls.parse_trip_metadata(folder_path, cache)
+        trip_days = cls.parse_day_folders(
+            cls.list_day_folders(folder_path, cache),
+            cache,
+            max_workers=max_workers,
+            profiler=profiler,
+        )
+
+        return cls.build_trip(trip_metadata, trip_days)
+
+    @classmethod
+    def stream_folder(
+        cls,
+        folder_path: str,
+        cache: Optional[ParseCache] = None,
+        *,
+        profiler: Optional[BuildProfiler] = None,
+    ) -> TripStream:
+        """
+        Same as `parse_folder`, but the days are only parsed as they are consumed (in order),
+        while the previous one is processed: at most two days are in memory at once.
+
+        :raise TripParsingError: if a day folder is not named after a date or, otherwise, when
+        the day that could not be parsed is reached
+        """
+        cache = cache or ParseCache()
+        profiler = profiler or BuildProfiler(enabled=False)
+        trip_metadata = cls.parse_trip_metadata(folder_path, cache)
+        # Sorted by name, which is the date
+        day_folders = sorted(cls.list_day_folders(folder_path, cache))
+
+        def parse_day_folder(day_folder: str) -> TripDay:
+            with profiler.asset('parse', day_folder):
+                return TripDayParser.parse_folder(day_folder, cache)
+
+        def trip_days() -> Iterator[TripDay]:
+            if not day_folders:
+                return
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(parse_day_folder, day_folders[0])
+
+                for index, day_folder in enumerate(day_folders):
+                    try:
+                        trip_day = future.result()
+                    except Exception as error:
+                        raise TripParsingError({day_folder: error}) from error
 
-        trip_days: list[TripDay] = []
-        highlights: list[Highlight] = []
-        privacy_zones: list[PrivacyZone] = []
+                    # The next day is parsed while this one is processed
+                    if index + 1 < len(day_folders):
+                        future = executor.submit(parse_day_folder, day_folders[index + 1])
 
-        for sub_folder in os.listdir(folder_path):
+                    trip_stream.highlights.extend(cls.parse_highlights(trip_day))
+
+                    yield trip_day
+
+        dates, errors = [], {}
+
+        for day_folder in day_folders:
+            try:
+                dates.append(datetime.date.fromisoformat(os.path.basename(day_folder)))
+            except ValueError as error:
+                errors[day_folder] = error
+
+        # Known before anything is built
+        if errors:
+            raise TripParsingError(errors)
+
+        trip_stream = TripStream(
+            title=trip_metadata['title'],
+            dates=dates,
+            trip_days=trip_days(),
+            privacy_zones=cls.parse_privacy_zones(trip_metadata),
+            summary=trip_metadata['summary'],
+        )
+
+        return trip_stream
+
+    @staticmethod
+    def list_day_folders(folder_path: str, cache: ParseCache) -> list[str]:
+        """
+        :return: the paths of the day folders of the trip
+        """
+        day_folders: list[str] = []
+
+        for sub_folder, is_dir in cache.listing(folder_path):
             # we only want folders, not files
-            if not os.path.isdir(os.path.join(folder_path, sub_folder)):
-                print(f'Skipping not dir {sub_folder}')
+            if not is_dir:
+                logger.debug('Skipping %s (not a folder)', sub_folder)
                 continue
 
             # also skip hidden folders
             if sub_folder.startswith('.'):
-                print(f'Skipping hidden {sub_folder}')
+                logger.debug('Skipping %s (hidden)', sub_folder)
                 continue
 
             # make absolute path (sub_folder is only the name of the folder)
-            sub_folder_full_path = os.path.join(folder_path, sub_folder)
-
-            trip_day = TripDayParser.parse_folder(sub_folder_full_path)
-            trip_days.append(trip_day)
-
-            # check if there are highlights described
-            if trip_day.metadata.get('highlights'):
-                for highlight in trip_day.metadata['highlights']:
-                    if highlight.get('picture'):
-                        picture = trip_day.find_picture_by_filename(
-                            highlight['picture'].split('/')[-1]
-                        )
-                    else:
-                        picture = None
-
-                    highlights.append(
-                        Highlight(
-                            from_date=trip_day.date,
-                            name=highlight['name'],
-                            summary=highlight['summary'],
-                            picture=picture,
-                        )
-                    )
+            day_folders.append(os.path.join(folder_path, sub_folder))
+
+        return day_folders
+
+    @classmethod
+    def update(
+        cls,
+        trip: Trip,
+        folder_path: str,
+        changed_paths: Iterable[str],
+        cache: Optional[ParseCache] = None,
+        *,
+        max_workers: int = DEFAULT_PARSE_WORKERS,
+        profiler: Optional[BuildProfiler] = None,
+    ) -> Trip:
+        """
+        Parses again only the days affected by the changes (eg: reported by a file watcher).
+        The other days are reused as they are, unless trip.yaml changed (the privacy zones
+        might be different, which affects the pictures of every day) or the trip folder itself
+        is reported (eg: the watcher lost events): everything is parsed again.
+
+        :param trip: the trip, as parsed before the changes
+        :param folder_path: the folder of the trip
+        :param changed_paths: the files (or folders) created, modified or deleted
+        :return: a new trip
+        """
+        cache = cache or ParseCache()
+        trip_days = {trip_day.date_iso: trip_day for trip_day in trip.trip_days}
+        changed_day_folders = set()
 
+        for path in changed_paths:
+            relative_path = os.path.relpath(path, folder_path)
+            sub_folder = relative_path.split(os.sep)[0]
+
+            if relative_path in (os.curdir, 'trip.yaml'):
+                return cls.parse_folder(
+                    folder_path, cache, max_workers=max_workers, profiler=profiler
+                )
+
+            if sub_folder == os.pardir or sub_folder.startswith('.'):
+                continue
+
+            # Files on the trip folder itself are not days
+            if sub_folder == relative_path and not (os.path.isdir(path) or sub_folder in trip_days):
+                continue
+
+            changed_day_folders.add(sub_folder)
+
+        for sub_folder in changed_day_folders:
+            # Deleted (or renamed) days are gone
+            trip_days.pop(sub_folder, None)
+
+        day_folders = [
+            os.path.join(folder_path, sub_folder)
+            for sub_folder in sorted(changed_day_folders)
+            if os.path.isdir(os.path.join(folder_path, sub_folder))
+        ]
+        parsed_days = cls.parse_day_folders(
+            day_folders, cache, max_workers=max_workers, profiler=profiler
+        )
+
+        return cls.build_trip(
+            cls.parse_trip_metadata(folder_path, cache), [*trip_days.values(), *parsed_days]
+        )
+
+    @classmethod
+    def build_trip(cls, trip_metadata: dict, trip_days: list[TripDay]) -> Trip:
+        """
+        :param trip_metadata: the content of trip.yaml
+        :param trip_days: the days, in any order
+        """
         trip_days = sorted(trip_days, key=operator.attrgetter('date'))
-        highlights = sorted(highlights, key=operator.attrgetter('from_date'))
+        highlights = [
+            highlight for trip_day in trip_days for highlight in cls.parse_highlights(trip_day)
+        ]
+        privacy_zones = cls.parse_privacy_zones(trip_metadata)
 
-        for privacy_zone in trip_metadata.get('privacy_zones', []):
-            privacy_zones.append(PrivacyZone(**privacy_zone))
+        pictures = sum(len(trip_day.pictures) for trip_day in trip_days)
+        tracks = sum(len(trip_day.tracks) for trip_day in trip_days)
+        logger.info(
+            'Parsed %d days: %d pictures, %d tracks',
+            len(trip_days),
+            pictures,
+            tracks,
+            extra={'days': len(trip_days), 'pictures': pictures, 'tracks': tracks},
+        )
 
-        trip = Trip(
+        return Trip(
             title=trip_metadata['title'],
             trip_days=trip_days,
             summary=trip_metadata['summary'],
@@ -69,9 +245,91 @@ class TripParser:
             privacy_zones=privacy_zones,
         )
 
-        return trip
+    @staticmethod
+    def parse_day_folders(
+        day_folders: list[str],
+        cache: ParseCache,
+        *,
+        max_workers: int = DEFAULT_PARSE_WORKERS,
+        profiler: Optional[BuildProfiler] = None,
+    ) -> list[TripDay]:
+        """
+        Parses the day folders concurrently. A failing folder does not stop the others: all the
+        errors are raised together at the end (see TripParsingError).
+
+        :return: the days, in the same order as the folders
+        """
+        profiler = profiler or BuildProfiler(enabled=False)
+
+        def parse_day_folder(day_folder: str) -> Union[TripDay, Exception]:
+            try:
+                with profiler.asset('parse', day_folder):
+                    return TripDayParser.parse_folder(day_folder, cache)
+            except Exception as error:
+                return error
+
+        if max_workers <= 1 or len(day_folders) <= 1:
+            results = [parse_day_folder(day_folder) for day_folder in day_folders]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Executor.map yields the results in the order of the folders
+                results = list(executor.map(parse_day_folder, day_folders))
+
+        errors = {
+            day_folder: result
+            for day_folder, result in zip(day_folders, results)
+            if isinstance(result, Exception)
+        }
+
+        if errors:
+            raise TripParsingError(errors)
+
+        return [result for result in results if isinstance(result, TripDay)]
+
+    @staticmethod
+    def parse_privacy_zones(trip_metadata: dict) -> list[PrivacyZone]:
+        return [
+            PrivacyZone(**privacy_zone) for privacy_zone in trip_metadata.get('privacy_zones', [])
+        ]
+
+    @staticmethod
+    def parse_highlights(trip_day: TripDay) -> list[Highlight]:
+        """
+        :return: the highlights described in the metadata of the day. Highlights of multiple
+        days start on this day, and end on their `to_date`.
+        """
+        highlights = []
+
+        for highlight in trip_day.metadata.get('highlights') or []:
+            if highlight.get('picture'):
+                picture = trip_day.find_picture_by_filename(highlight['picture'].split('/')[-1])
+            else:
+                picture = None
+
+            to_date = highlight.get('to_date')
+
+            # YAML parses unquoted dates, but quoted ones are strings
+            if isinstance(to_date, str):
+                to_date = datetime.date.fromisoformat(to_date)
+
+            if to_date and to_date < trip_day.date:
+                raise RuntimeError(
+                    f'Highlight {highlight["name"]} ends ({to_date}) before it starts '
+                    f'({trip_day.date})'
+                )
+
+            highlights.append(
+                Highlight(
+                    from_date=trip_day.date,
+                    to_date=to_date,
+                    name=highlight['name'],
+                    summary=highlight['summary'],
+                    picture=picture,
+                )
+            )
+
+        return highlights
 
     @staticmethod
-    def parse_trip_metadata(folder_path):
-        with open(os.path.join(folder_path, 'trip.yaml')) as file:
-            return yaml.full_load(file)
+    def parse_trip_metadata(folder_path, cache: Optional[ParseCache] = None):
+        return (cache or ParseCache()).yaml_content(os.path.join(folder_path, 'trip.yaml'))
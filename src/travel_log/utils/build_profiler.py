@@ -0,0 +1,256 @@
+"""
+Records where the time of a build goes: the wall and CPU time of each stage (parsing, pictures,
+tracks, map payloads, rendering, etc) and of each asset processed on it (eg: a picture, a
+page), plus counters (bytes written, cache hits and misses, etc).
+
+Saved as a JSON report and, optionally, as a trace that can be opened on chrome://tracing (or
+https://ui.perfetto.dev): one row per process and thread, so the parallel stages (eg: the
+pictures, processed by worker processes) show where the workers were idle.
+
+A disabled profiler (the default everywhere) records nothing.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+REPORT_VERSION = 1
+
+
+@dataclass
+class Timing:
+    wall_time: float = 0.0
+
+    """
+    CPU time (in seconds) of the process, for stages, or of the thread (or worker process), for
+    assets
+    """
+    cpu_time: float = 0.0
+
+    calls: int = 0
+
+    def add(self, wall_time: float, cpu_time: float) -> None:
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.calls += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'wall_time': round(self.wall_time, 6),
+            'cpu_time': round(self.cpu_time, 6),
+            'calls': self.calls,
+        }
+
+
+@dataclass
+class StageProfile:
+    timing: Timing = field(default_factory=Timing)
+    counters: dict[str, int] = field(default_factory=dict)
+    assets: dict[str, Timing] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            **self.timing.to_dict(),
+            'counters': dict(sorted(self.counters.items())),
+            'assets': {asset: timing.to_dict() for asset, timing in self.assets.items()},
+        }
+
+
+class BuildProfiler:
+    """
+    Stages, assets and counters can be recorded from multiple threads. Timings measured
+    elsewhere (eg: by a worker process) are added with `record_asset`.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: dict[str, StageProfile] = {}
+        self.trace_events: list[dict] = []
+
+        self._lock = threading.Lock()
+        # Wall clock (and not perf_counter): comparable between processes, for the trace
+        self._started_at = time.time()
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def _stage(self, name: str) -> StageProfile:
+        # Called with the lock held
+        if name not in self.stages:
+            self.stages[name] = StageProfile()
+
+        return self.stages[name]
+
+    def _trace(
+        self,
+        name: str,
+        category: str,
+        started_at: float,
+        wall_time: float,
+        pid: int,
+        tid: int,
+        args: Optional[dict] = None,
+    ) -> None:
+        # Called with the lock held
+        self.trace_events.append(
+            {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                # In microseconds
+                'ts': round((started_at - self._started_at) * 1e6),
+                'dur': round(wall_time * 1e6),
+                'pid': pid,
+                'tid': tid,
+                'args': args or {},
+            }
+        )
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures a stage of the build (can be called multiple times for the same stage: the
+        timings are added up).
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started_at = time.time()
+        start, cpu_start = time.perf_counter(), time.process_time()
+
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            cpu_time = time.process_time() - cpu_start
+
+            with self._lock:
+                self._stage(name).timing.add(wall_time, cpu_time)
+                self._trace(
+                    name, 'stage', started_at, wall_time, os.getpid(), threading.get_ident()
+                )
+
+    @contextmanager
+    def asset(self, stage: str, asset: str):
+        """
+        Measures the processing of an asset (eg: a track, a page) on a stage, on the current
+        thread.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started_at = time.time()
+        start, cpu_start = time.perf_counter(), time.thread_time()
+
+        try:
+            yield
+        finally:
+            self.record_asset(
+                stage,
+                asset,
+                started_at=started_at,
+                wall_time=time.perf_counter() - start,
+                cpu_time=time.thread_time() - cpu_start,
+            )
+
+    def record_asset(
+        self,
+        stage: str,
+        asset: str,
+        *,
+        started_at: float,
+        wall_time: float,
+        cpu_time: float,
+        pid: Optional[int] = None,
+    ) -> None:
+        """
+        :param started_at: when the processing started (as returned by time.time())
+        :param pid: the process the asset was processed on (the current one, by default)
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._stage(stage).assets.setdefault(asset, Timing()).add(wall_time, cpu_time)
+            self._trace(
+                os.path.basename(asset),
+                stage,
+                started_at,
+                wall_time,
+                pid or os.getpid(),
+                # Worker processes run one asset at a time
+                threading.get_ident() if pid in (None, os.getpid()) else 0,
+                {'asset': asset},
+            )
+
+    def count(self, stage: str, counter: str, value: int = 1) -> None:
+        """
+        Adds to a counter of the stage (eg: 'bytes', 'cache_hits').
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            counters = self._stage(stage).counters
+            counters[counter] = counters.get(counter, 0) + value
+
+    def count_file(self, stage: str, path: str) -> None:
+        """
+        Counts a file written (and its size, as 'bytes') on the stage.
+        """
+        if not self.enabled:
+            return
+
+        self.count(stage, 'files')
+        self.count(stage, 'bytes', os.path.getsize(path))
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                'version': REPORT_VERSION,
+                'wall_time': round(time.perf_counter() - self._start, 6),
+                'cpu_time': round(time.process_time() - self._cpu_start, 6),
+                'stages': {name: stage.to_dict() for name, stage in self.stages.items()},
+            }
+
+    def summary(self) -> str:
+        """
+        :return: the time of each stage, in a line (eg: 'parse 1.20s, pictures 30.51s, ...')
+        """
+        with self._lock:
+            return ', '.join(
+                f'{name} {stage.timing.wall_time:.2f}s' for name, stage in self.stages.items()
+            )
+
+    def save_report(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def save_trace(self, path: str) -> None:
+        """
+        Saves the stages and the assets in the Trace Event Format (of chrome://tracing).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with self._lock:
+            events = sorted(self.trace_events, key=lambda event: event['ts'])
+
+        metadata = [
+            {
+                'name': 'process_name',
+                'ph': 'M',
+                'pid': pid,
+                'args': {'name': 'build' if pid == os.getpid() else f'worker {pid}'},
+            }
+            for pid in sorted({event['pid'] for event in events})
+        ]
+
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, file)
@@ -0,0 +1,60 @@
+from dataclasses import MISSING, fields
+from functools import wraps
+from typing import TypeVar
+
+T = TypeVar('T', bound=type)
+
+
+def add_slots(cls: T) -> T:
+    """
+    Class decorator (to be applied on top of @dataclass) that rebuilds a dataclass with
+    `__slots__` for its fields, so the instances have no `__dict__` (much smaller, when many are
+    alive at once). The same as `@dataclass(slots=True)`, which is only available from Python
+    3.10 onwards.
+
+    Fields already in the `__slots__` of a base class are not repeated. For the instances to
+    really have no `__dict__`, every class in the hierarchy must define `__slots__`.
+
+    Adapted from https://github.com/ericvsmith/dataclasses/blob/master/dataclass_tools.py
+    """
+    if '__slots__' in cls.__dict__:
+        raise TypeError(f'{cls.__name__} already specifies __slots__')
+
+    inherited_slots = {slot for base in cls.__mro__[1:] for slot in getattr(base, '__slots__', ())}
+
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(field.name for field in fields(cls) if field.name not in inherited_slots)
+
+    cls_dict['__slots__'] = field_names
+
+    for field_name in field_names:
+        # The defaults are already in __init__, and class attributes would conflict with the slots
+        cls_dict.pop(field_name, None)
+
+    # Fields not in __init__ (init=False) get their default from the class attribute, which is
+    # gone, so they are set explicitly
+    non_init_defaults = {
+        field.name: field.default
+        for field in fields(cls)
+        if not field.init and field.default is not MISSING
+    }
+
+    if non_init_defaults:
+        dataclass_init = cls_dict['__init__']
+
+        @wraps(dataclass_init)
+        def __init__(self, *args, **kwargs):
+            for name, default in non_init_defaults.items():
+                object.__setattr__(self, name, default)
+
+            dataclass_init(self, *args, **kwargs)
+
+        cls_dict['__init__'] = __init__
+
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+
+    return slotted_cls
@@ -0,0 +1,180 @@
+"""
+Puts files (eg: cached renditions, published tracks) in the website folder without copying
+their content, when the file system allows it:
+
+* hardlink: the output is another name for the same file (same inode). Nothing is written,
+but the output and the source are the same file: modifying one modifies the other.
+* reflink: the output is a new file sharing the data blocks of the source (copy on write,
+eg: Btrfs, XFS). Nothing is written until one of them is modified, and modifying one does
+not modify the other.
+* copy: the content is copied (by the kernel, when possible).
+
+Strategies that are not supported (eg: a different file system, or no reflinks) fall back to
+a copy, so the output is always materialized.
+"""
+
+import errno
+import os
+import shutil
+from types import ModuleType
+from typing import Optional
+
+fcntl: Optional[ModuleType]
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows
+    fcntl = None
+
+LINK_STRATEGY_COPY = 'copy'
+LINK_STRATEGY_HARDLINK = 'hardlink'
+LINK_STRATEGY_REFLINK = 'reflink'
+# Reflink, then hardlink, then copy
+LINK_STRATEGY_AUTO = 'auto'
+
+LINK_STRATEGIES = (
+    LINK_STRATEGY_AUTO,
+    LINK_STRATEGY_REFLINK,
+    LINK_STRATEGY_HARDLINK,
+    LINK_STRATEGY_COPY,
+)
+
+# ioctl from linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# The file system (or the pair of paths) does not support the operation
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EACCES,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.ENOSYS,
+    errno.EMLINK,
+}
+
+
+def link_file(source: str, destination: str, strategy: str = LINK_STRATEGY_AUTO) -> str:
+    """
+    Materializes the source file on the destination path, replacing it if it exists. An
+    existing destination is always unlinked first (and never written to), so a destination
+    that was hardlinked to another file (eg: by a previous build) never modifies it.
+
+    :param strategy: one of LINK_STRATEGIES
+    :return: the strategy actually used (never LINK_STRATEGY_AUTO)
+    """
+    if strategy not in LINK_STRATEGIES:
+        raise RuntimeError(f'Unknown link strategy: {strategy}')
+
+    # Raises FileNotFoundError before the destination is removed
+    os.stat(source)
+    remove_file(destination)
+
+    if strategy in (LINK_STRATEGY_AUTO, LINK_STRATEGY_REFLINK) and _reflink(source, destination):
+        return LINK_STRATEGY_REFLINK
+
+    if strategy in (LINK_STRATEGY_AUTO, LINK_STRATEGY_HARDLINK) and _hardlink(source, destination):
+        return LINK_STRATEGY_HARDLINK
+
+    _copy(source, destination)
+
+    return LINK_STRATEGY_COPY
+
+
+def break_hardlink(path: str) -> bool:
+    """
+    Makes the file the only name of its content (with a private copy), if it is hardlinked
+    somewhere else. Must be called before modifying a file in place, if it might have been
+    materialized with `link_file`.
+
+    :return: whether the file was hardlinked (and was copied)
+    """
+    try:
+        if os.stat(path).st_nlink <= 1:
+            return False
+    except FileNotFoundError:
+        return False
+
+    temporary_path = f'{path}.unlinked'
+    _copy(path, temporary_path)
+    os.replace(temporary_path, path)
+
+    return True
+
+
+def remove_file(path: str) -> None:
+    """
+    Removes the file, if it exists. Files that might be hardlinked should be removed (or
+    replaced) instead of overwritten.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _is_unsupported(error: OSError) -> bool:
+    return error.errno in _UNSUPPORTED_ERRNOS
+
+
+def _hardlink(source: str, destination: str) -> bool:
+    try:
+        os.link(source, destination)
+    except OSError as error:
+        if not _is_unsupported(error):
+            raise
+        return False
+
+    return True
+
+
+def _reflink(source: str, destination: str) -> bool:
+    if fcntl is None:
+        return False
+
+    try:
+        with open(source, 'rb') as source_file, open(destination, 'xb') as destination_file:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    except OSError as error:
+        remove_file(destination)
+
+        if not _is_unsupported(error):
+            raise
+        return False
+
+    return True
+
+
+def _copy(source: str, destination: str) -> None:
+    """
+    Copies with copy_file_range where available: the data does not go through user space, and
+    some file systems (eg: NFS, or Btrfs and XFS on recent kernels) share the blocks instead of
+    writing them.
+    """
+    if not hasattr(os, 'copy_file_range'):
+        shutil.copyfile(source, destination)
+        return
+
+    with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+        remaining = os.fstat(source_file.fileno()).st_size
+
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(
+                    source_file.fileno(), destination_file.fileno(), remaining
+                )
+
+                if copied == 0:
+                    break
+
+                remaining -= copied
+        except OSError as error:
+            if not _is_unsupported(error):
+                raise
+
+            source_file.seek(0)
+            destination_file.seek(0)
+            destination_file.truncate()
+            shutil.copyfileobj(source_file, destination_file)
@@ -0,0 +1,246 @@
+"""
+Watches folders (recursively) for changes, to rebuild the website as soon as a file is saved.
+
+On Linux, inotify is used (through ctypes, no extra dependency): the kernel tells which files
+changed, so nothing needs to be walked. Elsewhere (or if inotify is not available), the folders
+are polled: their files are stat'ed periodically and compared with the previous snapshot.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# How long (in seconds) to wait for more events after the first one. Saving a file (or copying
+# a batch of pictures) triggers many events in a row, which should result in a single rebuild.
+DEFAULT_DEBOUNCE = 0.1
+
+DEFAULT_POLLING_INTERVAL = 0.5
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+
+# struct inotify_event: wd, mask, cookie, len (followed by a null padded name of len bytes)
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+def walk_folders(folder_path: str) -> Iterable[str]:
+    """
+    :return: the folder and all its sub folders (hidden ones excluded)
+    """
+    for root, folders, _ in os.walk(folder_path):
+        folders[:] = [folder for folder in folders if not folder.startswith('.')]
+        yield root
+
+
+class PollingWatcher:
+    """
+    Portable watcher: compares snapshots (size and modification time of every file) of the
+    folders.
+    """
+
+    def __init__(self, folder_paths: Iterable[str], *, interval: float = DEFAULT_POLLING_INTERVAL):
+        self.folder_paths = list(folder_paths)
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+
+        for folder_path in self.folder_paths:
+            for folder in walk_folders(folder_path):
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.') or entry.is_dir():
+                            continue
+
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+        return snapshot
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> set[str]:
+        """
+        :param timeout: maximum time (in seconds) to wait. None to wait until something changes
+        :return: the paths of the files that were created, modified or deleted (empty if
+        nothing changed before the timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot = self.take_snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+
+            if changed:
+                return changed
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux watcher. inotify is not recursive: every folder has its own watch, and the folders
+    created later are watched as they appear.
+    """
+
+    def __init__(self, folder_paths: Iterable[str], *, debounce: float = DEFAULT_DEBOUNCE):
+        self.folder_paths = list(folder_paths)
+        self.debounce = debounce
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        # watch descriptor -> folder
+        self.watches: dict[int, str] = {}
+
+        for folder_path in self.folder_paths:
+            self.add_watches(folder_path)
+
+    def add_watches(self, folder_path: str) -> set[str]:
+        """
+        Watches the folder and its sub folders.
+
+        :return: the files already inside them (created before the watches were added)
+        """
+        files: set[str] = set()
+
+        for folder in walk_folders(folder_path):
+            watch = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), INOTIFY_MASK)
+
+            if watch < 0:
+                # Gone in the meantime, or not readable
+                continue
+
+            self.watches[watch] = folder
+
+            with os.scandir(folder) as entries:
+                files.update(
+                    entry.path
+                    for entry in entries
+                    if not entry.name.startswith('.') and not entry.is_dir()
+                )
+
+        return files
+
+    def read_events(self) -> set[str]:
+        changed: set[str] = set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+
+        while offset < len(data):
+            watch, mask, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            name_offset = offset + INOTIFY_EVENT.size
+            name_end = name_offset + name_length
+            name = os.fsdecode(data[name_offset:name_end].rstrip(b'\0'))
+            offset = name_end
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: consider everything changed
+                changed.update(self.folder_paths)
+                continue
+
+            folder = self.watches.get(watch)
+
+            if folder is None or name.startswith('.'):
+                continue
+
+            if mask & IN_DELETE_SELF:
+                self.watches.pop(watch)
+                changed.add(folder)
+                continue
+
+            path = os.path.join(folder, name) if name else folder
+
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self.add_watches(path))
+
+            changed.add(path)
+
+        return changed
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> set[str]:
+        """
+        Same as `PollingWatcher.wait_for_changes`. Folders might be part of the paths (eg: a
+        folder was deleted).
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+
+        if not readable:
+            return set()
+
+        changed = self.read_events()
+
+        # More events are likely to follow (eg: the rest of a copy)
+        while select.select([self.fd], [], [], self.debounce)[0]:
+            changed |= self.read_events()
+
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def create_watcher(folder_paths: Iterable[str]):
+    """
+    :return: an InotifyWatcher on Linux, or a PollingWatcher if inotify is not available
+    """
+    folder_paths = list(folder_paths)
+
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folder_paths)
+        except (OSError, AttributeError) as error:
+            logger.warning('inotify not available (%s), polling for changes instead', error)
+
+    return PollingWatcher(folder_paths)
@@ -0,0 +1,14 @@
+def format_duration(seconds: float) -> str:
+    """
+    Human friendly representation of a duration, such as "4h 06min" or "35min".
+
+    :param seconds: the duration in seconds
+    :return: the formatted duration (hours and minutes)
+    """
+    minutes = int(round(seconds / 60))
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f'{hours}h {minutes:02d}min'
+
+    return f'{minutes}min'
@@ -1,3 +1,19 @@
+from typing import Optional, Union
+
+import numpy as np
+
+# Mean radius of the Earth (IUGG), in km
+EARTH_RADIUS_KM = 6371.0088
+
+# Length of one degree of latitude is between 110.574 km (equator) and 111.694 km (poles)
+MIN_KM_PER_DEGREE_OF_LATITUDE = 110.574
+KM_PER_DEGREE_OF_LONGITUDE_AT_EQUATOR = 111.320
+
+# Haversine (on a sphere) differs from the geodesic distance (on the WGS-84 ellipsoid) by at most
+# ~0.56% (north-south distances at the equator), so 0.6% is a safe upper bound anywhere on Earth
+HAVERSINE_MAX_RELATIVE_ERROR = 0.006
+
+
 def convert_degrees_to_decimal(dms: tuple[float, float, float], reference: str) -> float:
     """
     Convert coordinates from (degrees, minutes, seconds) to a decimal representation.
@@ -20,3 +36,80 @@ def convert_degrees_to_decimal(dms: tuple[float, float, float], reference: str)
         seconds = -seconds
 
     return round(degrees + minutes + seconds, 6)
+
+
+def haversine_distances(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    latitude: Union[float, np.ndarray],
+    longitude: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Great-circle distances (in km) between many points and a single point (or, given arrays,
+    the points at the same positions), computed at once.
+
+    See HAVERSINE_MAX_RELATIVE_ERROR for the error compared to geopy's geodesic distance.
+
+    :param latitudes: array with the latitudes (in decimal degrees) of the points
+    :param longitudes: array with the longitudes (in decimal degrees) of the points
+    :param latitude: latitude of the single point (or array with the latitudes of the others)
+    :param longitude: longitude of the single point (or array with the longitudes of the others)
+    :return: array with the distances, in km
+    """
+    latitudes_radians = np.radians(latitudes)
+    latitude_radians = np.radians(latitude)
+
+    delta_latitudes = latitudes_radians - latitude_radians
+    delta_longitudes = np.radians(longitudes - longitude)
+
+    a = (
+        np.sin(delta_latitudes / 2) ** 2
+        + np.cos(latitudes_radians) * np.cos(latitude_radians) * np.sin(delta_longitudes / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def bounding_box_deltas(latitude: float, radius: float) -> tuple[float, Optional[float]]:
+    """
+    Half the height and half the width (in degrees) of a (slightly conservative) bounding box
+    around a circle of `radius` km centered at the given latitude.
+
+    :return: a tuple with (delta latitude, delta longitude). The delta longitude is None when
+    the circle is so close to a pole that any longitude can be inside it.
+    """
+    # A small margin to be on the safe side of all the approximations below
+    radius = radius * (1 + 2 * HAVERSINE_MAX_RELATIVE_ERROR)
+
+    delta_latitude = radius / MIN_KM_PER_DEGREE_OF_LATITUDE
+    max_absolute_latitude = min(abs(latitude) + delta_latitude, 90.0)
+    cos_latitude = np.cos(np.radians(max_absolute_latitude))
+
+    if cos_latitude <= 1e-6:
+        return delta_latitude, None
+
+    delta_longitude = radius / (KM_PER_DEGREE_OF_LONGITUDE_AT_EQUATOR * cos_latitude)
+
+    return delta_latitude, delta_longitude if delta_longitude < 180 else None
+
+
+def bounding_box_mask(
+    latitudes: np.ndarray, longitudes: np.ndarray, latitude: float, longitude: float, radius: float
+) -> np.ndarray:
+    """
+    Cheap check of which points might be within `radius` km of a point: a (slightly
+    conservative) bounding box around the circle. Points outside of it are for sure outside of
+    the circle, points inside of it still need to be checked with a proper distance.
+
+    :return: boolean array, True for the points inside the bounding box
+    """
+    delta_latitude, delta_longitude = bounding_box_deltas(latitude, radius)
+
+    mask = np.abs(latitudes - latitude) <= delta_latitude
+
+    if delta_longitude is not None:
+        # Wraps the difference to [-180, 180), so the antimeridian is handled as well
+        longitude_differences = (longitudes - longitude + 180) % 360 - 180
+        mask &= np.abs(longitude_differences) <= delta_longitude
+
+    return mask
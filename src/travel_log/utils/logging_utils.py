@@ -0,0 +1,49 @@
+"""
+Logging of the build. Every module logs to its own logger (`logging.getLogger(__name__)`),
+with the details of the message (eg: the picture, the number of points) also passed as `extra`
+fields, so they can be filtered (or parsed, with the JSON format) without parsing the messages.
+"""
+
+import json
+import logging
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# Attributes of every log record (the others were passed as `extra`)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the `extra` fields of the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **{
+                key: value
+                for key, value in vars(record).items()
+                if key not in _RECORD_ATTRIBUTES and not key.startswith('_')
+            },
+        }
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = 'info', json_format: bool = False) -> None:
+    """
+    :param level: one of LOG_LEVELS
+    :param json_format: whether to log JSON objects (one per line) instead of text
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    logging.basicConfig(level=level.upper(), handlers=[handler], force=True)
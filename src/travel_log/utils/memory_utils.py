@@ -0,0 +1,85 @@
+"""
+Measures the memory of the build process, to keep streaming builds under a ceiling (see
+`MemoryCeiling`).
+"""
+
+import gc
+import sys
+from types import ModuleType
+from typing import Optional
+
+resource: Optional[ModuleType]
+
+try:
+    import resource
+except ImportError:
+    # Not on Windows
+    resource = None
+
+# Linux only: the current resident memory is VmRSS
+STATUS_PATH = '/proc/self/status'
+
+
+def current_rss() -> Optional[int]:
+    """
+    :return: the resident memory (in bytes) of the process, if known. Where it is not available
+    (eg: not on Linux), the peak resident memory is returned instead (an upper bound)
+    """
+    try:
+        with open(STATUS_PATH) as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    # In kB
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # In bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryLimitExceeded(RuntimeError):
+    pass
+
+
+class MemoryCeiling:
+    """
+    The maximum resident memory of the build process (the worker processes processing the
+    pictures are not included: their memory is bounded by the size of the pictures).
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        :param limit: in bytes. Without it, nothing is enforced
+        """
+        self.limit = limit
+        self.peak = 0
+
+    def check(self, context: str) -> Optional[int]:
+        """
+        :param context: what was just done (eg: the day processed), for the error message
+        :raise MemoryLimitExceeded: if the process uses more memory than the limit, even after
+        collecting the garbage
+        :return: the resident memory (in bytes) of the process, if known
+        """
+        rss = current_rss()
+
+        if rss is not None and self.limit is not None and rss > self.limit:
+            # Objects in reference cycles (eg: parsed GPX files) might be waiting to be freed
+            gc.collect()
+            rss = current_rss()
+
+            if rss is not None and rss > self.limit:
+                raise MemoryLimitExceeded(
+                    f'The build uses {rss / 1024 / 1024:.0f} MB after {context}, more than the '
+                    f'limit of {self.limit / 1024 / 1024:.0f} MB'
+                )
+
+        self.peak = max(self.peak, rss or 0)
+
+        return rss
@@ -0,0 +1,37 @@
+import numpy as np
+
+# Number of decimal digits kept from the coordinates (5 = ~1 meter, same as Google's default)
+DEFAULT_POLYLINE_PRECISION = 5
+
+
+def encode_polyline(
+    latitudes: np.ndarray, longitudes: np.ndarray, precision: int = DEFAULT_POLYLINE_PRECISION
+) -> str:
+    """
+    Encodes the points with the "Encoded Polyline Algorithm Format" (from Google Maps): the
+    coordinates are quantized and delta encoded, and each delta is written with as few
+    printable characters as possible. Usually ~5 bytes per point, instead of ~100 in a GPX file.
+
+    See https://developers.google.com/maps/documentation/utilities/polylinealgorithm
+
+    :param latitudes: array with the latitudes, in decimal degrees
+    :param longitudes: array with the longitudes, in decimal degrees
+    :param precision: number of decimal digits kept
+    :return: the encoded polyline
+    """
+    coordinates = np.round(np.column_stack([latitudes, longitudes]) * 10**precision)
+    deltas = np.diff(coordinates.astype(np.int64), axis=0, prepend=[[0, 0]]).ravel()
+
+    # Zig-zag encoding: the sign goes to the least significant bit
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    characters = []
+
+    for value in values.tolist():
+        while value >= 0x20:
+            characters.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+
+        characters.append(chr(value + 63))
+
+    return ''.join(characters)
@@ -0,0 +1,332 @@
+"""
+Publishes the static files of the website (css, js and images) with the hash of their content
+in the name (eg: css/styles.3f1c0a9be2.css), so they can be cached forever by browsers and
+CDNs: a changed file gets a new name. CSS and JS files are minified, and the references
+between the static files (eg: images used by scripts.js) are rewritten to the new names. The
+templates link them with `asset_url` (eg: {{ asset_url('css/styles.css') }}).
+
+Also writes precompressed versions of the text outputs (see `precompress_outputs`), for the
+static hosts that serve them directly.
+"""
+
+import gzip
+import os
+import re
+import shutil
+from typing import Mapping, Optional
+
+from travel_log.website.build_manifest import BuildManifest, content_fingerprint, fingerprint
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        # Optional: without it, only the .gz versions are written
+        brotli = None
+
+CURRENT_FOLDER = os.path.dirname(os.path.realpath(__file__))
+STATIC_FOLDER = os.path.join(CURRENT_FOLDER, 'static')
+
+# Images first: the CSS and JS files reference them
+STATIC_SUB_FOLDERS = ('images', 'css', 'js')
+
+# Bump when the minifiers change, so the assets are generated (and named) again
+ASSET_PIPELINE_VERSION = 2
+
+# Length of the hash in the names
+HASH_LENGTH = 10
+
+# Extensions of the outputs worth compressing
+TEXT_EXTENSIONS = ('.html', '.css', '.js', '.json', '.gpx', '.svg', '.txt', '.xml')
+
+GZIP_EXTENSION = '.gz'
+BROTLI_EXTENSION = '.br'
+
+# A regular expression literal (and not a division) starts after one of these characters, or
+# after one of these keywords (eg: `return /a/.test(text)`)
+JS_REGEX_PRECEDING_CHARACTERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_PRECEDING_KEYWORDS = {
+    'await',
+    'case',
+    'delete',
+    'do',
+    'else',
+    'in',
+    'instanceof',
+    'new',
+    'return',
+    'throw',
+    'typeof',
+    'void',
+    'yield',
+}
+
+
+def fingerprinted_name(path: str, value: str) -> str:
+    """
+    :return: the path with the (beginning of the) hash before the extension (eg:
+    css/styles.css -> css/styles.<hash>.css)
+    """
+    root, extension = os.path.splitext(path)
+    return f'{root}.{value[:HASH_LENGTH]}{extension}'
+
+
+def _string_end(text: str, start: int, quote: str) -> int:
+    position = start + 1
+
+    while position < len(text):
+        if text[position] == '\\':
+            position += 2
+        elif text[position] == quote:
+            return position + 1
+        else:
+            position += 1
+
+    return len(text)
+
+
+def _regex_end(text: str, start: int) -> int:
+    position = start + 1
+    in_class = False
+
+    while position < len(text) and text[position] != '\n':
+        character = text[position]
+
+        if character == '\\':
+            position += 1
+        elif character == '[':
+            in_class = True
+        elif character == ']':
+            in_class = False
+        elif character == '/' and not in_class:
+            return position + 1
+
+        position += 1
+
+    return position
+
+
+def _starts_regex(text: str, position: int) -> bool:
+    """
+    :return: whether the `/` at the position starts a regular expression literal (and is not a
+    division), judging by what comes before it
+    """
+    position -= 1
+
+    while position >= 0 and text[position].isspace():
+        position -= 1
+
+    if position < 0 or text[position] in JS_REGEX_PRECEDING_CHARACTERS:
+        return True
+
+    end = start = position + 1
+
+    while start > 0 and (text[start - 1].isalnum() or text[start - 1] in '_$'):
+        start -= 1
+
+    # Not a property with the name of a keyword (eg: `options.in / 2`)
+    return text[start:end] in JS_REGEX_PRECEDING_KEYWORDS and (start == 0 or text[start - 1] != '.')
+
+
+def split_source(text: str, quotes: str, *, javascript: bool = False) -> list[tuple[str, str]]:
+    """
+    Splits CSS or JS source code, so it can be minified without touching what must be kept as
+    it is.
+
+    :param quotes: the characters that delimit strings
+    :param javascript: whether to also recognize line comments and regular expressions
+    :return: (kind, text) pairs, kind being 'code', 'string' (or regular expression) or
+    'comment'
+    """
+    segments = []
+    code_start = position = 0
+
+    while position < len(text):
+        character = text[position]
+
+        if character in quotes:
+            kind, end = 'string', _string_end(text, position, character)
+        elif text.startswith('/*', position):
+            end = text.find('*/', position + 2)
+            kind, end = 'comment', len(text) if end < 0 else end + 2
+        elif javascript and text.startswith('//', position):
+            end = text.find('\n', position)
+            kind, end = 'comment', len(text) if end < 0 else end
+        elif javascript and character == '/' and _starts_regex(text, position):
+            kind, end = 'string', _regex_end(text, position)
+        else:
+            position += 1
+            continue
+
+        segments.append(('code', text[code_start:position]))
+        segments.append((kind, text[position:end]))
+        code_start = position = end
+
+    segments.append(('code', text[code_start:]))
+
+    return segments
+
+
+def _minify(segments: list[tuple[str, str]], minify_code) -> str:
+    minified = []
+    code: list[str] = []
+
+    def flush_code():
+        minified.append(minify_code(''.join(code)))
+        code.clear()
+
+    for kind, value in segments:
+        if kind == 'code':
+            code.append(value)
+        elif kind == 'comment' and not value.startswith('/*!'):
+            # Might be separating two tokens (and the newlines might end statements)
+            code.append('\n' if '\n' in value else ' ')
+        else:
+            # Strings, and comments to be kept (eg: /*! license */)
+            flush_code()
+            minified.append(value)
+
+    flush_code()
+
+    return ''.join(minified).strip()
+
+
+def minify_css(text: str) -> str:
+    """
+    Removes the comments (except /*! ... */) and the whitespace not needed.
+    """
+
+    def minify_code(code: str) -> str:
+        code = re.sub(r'\s+', ' ', code)
+        # Not before ':', which could be a pseudo class (eg: `a :hover` is not `a:hover`)
+        code = re.sub(r' ?([{};,>]) ?', r'\1', code)
+        return code.replace(': ', ':').replace(';}', '}')
+
+    return _minify(split_source(text, '"\''), minify_code)
+
+
+def minify_js(text: str) -> str:
+    """
+    Removes the comments (except /*! ... */), the indentation and the blank lines. Conservative
+    on purpose: the line breaks are kept (they might end statements), and nothing is renamed.
+    """
+
+    def minify_code(code: str) -> str:
+        return re.sub(r'\s+', lambda match: '\n' if '\n' in match.group() else ' ', code)
+
+    return _minify(split_source(text, '"\'`', javascript=True), minify_code)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build_static_assets(manifest: BuildManifest, static_folder: str = STATIC_FOLDER) -> dict:
+    """
+    Publishes the static files with fingerprinted names. Files whose content (and references)
+    did not change since the previous build are not processed again: their names are derived
+    from the fingerprint of their inputs, so they are known without generating them.
+
+    :return: the URL (relative to the website folder) of each static file (eg:
+    'css/styles.css' -> 'css/styles.<hash>.css')
+    """
+    asset_urls: dict[str, str] = {}
+
+    for sub_folder in STATIC_SUB_FOLDERS:
+        for root, _, filenames in os.walk(os.path.join(static_folder, sub_folder)):
+            for filename in sorted(filenames):
+                input_path = os.path.join(root, filename)
+                path = os.path.relpath(input_path, static_folder).replace(os.sep, '/')
+                minifier = MINIFIERS.get(os.path.splitext(filename)[1].lower())
+                content: Optional[str] = None
+                references: Optional[dict[str, str]] = None
+
+                if minifier:
+                    with open(input_path, encoding='utf-8') as file:
+                        content = file.read()
+
+                    # The names of the files referenced are part of the output
+                    references = {
+                        reference: url
+                        for reference, url in asset_urls.items()
+                        if reference in content
+                    }
+
+                output_fingerprint = fingerprint(
+                    ASSET_PIPELINE_VERSION, content_fingerprint(input_path), references
+                )
+                output = fingerprinted_name(path, output_fingerprint)
+                asset_urls[path] = output
+
+                if manifest.is_fresh(output, output_fingerprint):
+                    continue
+
+                output_path = manifest.output_path(output)
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+                if minifier:
+                    assert content is not None and references is not None
+
+                    with open(output_path, 'w', encoding='utf-8') as file:
+                        file.write(minifier(rewrite_references(content, references)))
+                else:
+                    shutil.copyfile(input_path, output_path)
+
+                manifest.record(output, output_fingerprint)
+
+    return asset_urls
+
+
+def rewrite_references(content: str, asset_urls: Mapping[str, str]) -> str:
+    """
+    Replaces the paths of the static files (eg: images/pin-shadow.png) by their URLs.
+    """
+    # Longest first, in case a path is part of another one
+    for path in sorted(asset_urls, key=len, reverse=True):
+        content = content.replace(path, asset_urls[path])
+
+    return content
+
+
+def precompress_outputs(manifest: BuildManifest) -> list[str]:
+    """
+    Writes a gzip (and, if brotli is installed, a brotli) version of every text output of the
+    build, next to it (eg: index.html.gz), unless it is fresh. They are outputs of the build
+    themselves, so they are removed with the outputs they were compressed from.
+
+    :return: the compressed outputs written
+    """
+    written = []
+    compressors = {GZIP_EXTENSION: lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+
+    if brotli:
+        compressors[BROTLI_EXTENSION] = brotli.compress
+
+    for output, details in list(manifest.outputs.items()):
+        if not output.lower().endswith(TEXT_EXTENSIONS):
+            continue
+
+        data = None
+
+        for extension, compress in compressors.items():
+            compressed_output = f'{output}{extension}'
+            output_fingerprint = fingerprint(details['fingerprint'], extension)
+
+            if manifest.is_fresh(compressed_output, output_fingerprint):
+                continue
+
+            if data is None:
+                with open(manifest.output_path(output), 'rb') as file:
+                    data = file.read()
+
+            temporary_path = f'{manifest.output_path(compressed_output)}.tmp'
+
+            with open(temporary_path, 'wb') as file:
+                file.write(compress(data))
+
+            os.replace(temporary_path, manifest.output_path(compressed_output))
+            manifest.record(compressed_output, output_fingerprint)
+            written.append(compressed_output)
+
+    return written
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+from hashlib import md5
+from typing import Optional
+
+MANIFEST_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*inputs) -> str:
+    """
+    Hashes any JSON serializable description of the inputs of an output (eg: paths, sizes,
+    modification times, privacy zones, rendition parameters, etc).
+    """
+    return md5(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def content_fingerprint(path: str) -> str:
+    """
+    Hashes the content of a (small) file.
+    """
+    with open(path, 'rb') as file:
+        return md5(file.read()).hexdigest()
+
+
+class BuildManifest:
+    """
+    Keeps track of the outputs of a website build: for each output file (path relative to the
+    website folder), a fingerprint of the inputs used to generate it plus some metadata that
+    later builds might need without regenerating the output.
+
+    It is persisted between builds, so an incremental build can:
+        * skip the outputs whose inputs did not change (`is_fresh`)
+        * delete the outputs that were generated by the previous build but not by the current
+          one, because their inputs are gone (`remove_stale_outputs`)
+    """
+
+    def __init__(self, folder_path: str, manifest_path: str):
+        self.folder_path = folder_path
+        self.manifest_path = manifest_path
+
+        self.previous_outputs: dict[str, dict] = {}
+        self.outputs: dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, folder_path: str, manifest_path: str) -> 'BuildManifest':
+        manifest = cls(folder_path, manifest_path)
+
+        try:
+            with open(manifest_path) as file:
+                content = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return manifest
+
+        if content.get('version') == MANIFEST_VERSION:
+            manifest.previous_outputs = content['outputs']
+
+        return manifest
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+
+        with open(f'{self.manifest_path}.tmp', 'w') as file:
+            json.dump({'version': MANIFEST_VERSION, 'outputs': self.outputs}, file)
+
+        os.replace(f'{self.manifest_path}.tmp', self.manifest_path)
+
+    def output_path(self, output: str) -> str:
+        return os.path.join(self.folder_path, output)
+
+    def is_fresh(self, output: str, output_fingerprint: str) -> bool:
+        """
+        Checks if the output was generated by the previous build from the same inputs (and still
+        exists). Fresh outputs are kept (recorded) as they are for the current build.
+        """
+        previous = self.previous_outputs.get(output)
+
+        if not previous or previous['fingerprint'] != output_fingerprint:
+            return False
+
+        if not os.path.exists(self.output_path(output)):
+            return False
+
+        self.outputs[output] = previous
+        return True
+
+    def record(self, output: str, output_fingerprint: str, metadata: Optional[dict] = None):
+        self.outputs[output] = {'fingerprint': output_fingerprint, 'metadata': metadata or {}}
+
+    def metadata(self, output: str) -> dict:
+        return self.outputs[output]['metadata']
+
+    def remove_stale_outputs(self) -> list[str]:
+        """
+        Deletes the outputs generated by the previous build but not by the current one (and the
+        folders left empty by that).
+
+        :return: the outputs deleted
+        """
+        stale_outputs = sorted(set(self.previous_outputs) - set(self.outputs))
+
+        for output in stale_outputs:
+            path = self.output_path(output)
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            folder = os.path.dirname(path)
+
+            while os.path.realpath(folder) != os.path.realpath(self.folder_path):
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    # Not empty (or already gone)
+                    break
+
+                folder = os.path.dirname(folder)
+
+            logger.info('Removed stale output %s', output, extra={'output': output})
+
+        return stale_outputs
@@ -0,0 +1,155 @@
+import functools
+import logging
+import os
+import threading
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LIVE_RELOAD_PATH = '/__live_reload'
+
+# Injected (at serve time, the generated files are not modified) into every page
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = () => location.reload()</script>'
+)
+
+
+class LiveReload:
+    """
+    Lets the requests waiting for a reload (one per open page) know that the website was
+    rebuilt.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.is_closed = False
+        self.condition = threading.Condition()
+
+    def notify(self) -> None:
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def close(self) -> None:
+        """
+        Releases the waiting requests (the server is stopping).
+        """
+        with self.condition:
+            self.is_closed = True
+            self.condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        """
+        :return: the current version, after it changed from `version` (or the timeout expired)
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version or self.is_closed, timeout)
+            return self.version
+
+
+class DevHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address: tuple[str, int], handler):
+        super().__init__(server_address, handler)
+
+        # Shared by the requests (see DevRequestHandler)
+        self.live_reload = LiveReload()
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    server: DevHTTPServer
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            return self.send_live_reload_events()
+
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+
+        if path.endswith('.html') and os.path.isfile(path):
+            return self.send_page(path)
+
+        return super().do_GET()
+
+    def send_page(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            content = file.read()
+
+        content = content.replace(b'</body>', f'{LIVE_RELOAD_SCRIPT}</body>'.encode(), 1)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_live_reload_events(self) -> None:
+        """
+        Server-sent events: the connection is kept open, and a message is sent whenever the
+        website is rebuilt.
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+
+        live_reload = self.server.live_reload
+        version = live_reload.version
+
+        try:
+            while not live_reload.is_closed:
+                new_version = live_reload.wait(version, timeout=15)
+
+                if new_version == version:
+                    # Keeps the connection alive (and detects closed pages)
+                    self.wfile.write(b': ping\n\n')
+                else:
+                    self.wfile.write(b'data: reload\n\n')
+                    version = new_version
+
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_error(self, format, *args):
+        logger.warning(format, *args, extra={'client': self.address_string()})
+
+    def log_message(self, format, *args):
+        # Every request: only when debugging
+        logger.debug(format, *args, extra={'client': self.address_string()})
+
+
+class DevServer:
+    """
+    Serves the generated website locally (for development purposes only), reloading the open
+    pages when `reload` is called (eg: after a rebuild).
+    """
+
+    def __init__(self, folder_path: str, *, host: str = 'localhost', port: int = 8000):
+        handler = functools.partial(DevRequestHandler, directory=folder_path)
+
+        self.server = DevHTTPServer((host, port), handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        # Bytes for some address families
+        host = host.decode() if isinstance(host, bytes) else str(host)
+
+        return f'http://{host}:{port}/'
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reload(self) -> None:
+        self.server.live_reload.notify()
+
+    def stop(self) -> None:
+        self.server.live_reload.close()
+        self.server.shutdown()
+        self.server.server_close()
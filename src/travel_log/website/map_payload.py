@@ -0,0 +1,100 @@
+import json
+from typing import Iterable
+
+from travel_log.assets.tracks.track_stats import Bounds
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
+from travel_log.models.trip_day import TripDay
+from travel_log.website.track_export import track_payload
+
+# Decimal digits of the coordinates of the pictures (6 = ~10 centimeters)
+COORDINATES_PRECISION = 6
+
+# Bump when the payloads change, so they are generated again
+MAP_PAYLOAD_VERSION = 1
+
+
+def trip_day_payload(
+    trip_day: TripDay,
+    privacy_zone_index: PrivacyZoneIndex,
+    *,
+    tolerance: float,
+    thumbnail_folder: str = 'thumbnail',
+    full_folder: str = 'full',
+) -> dict:
+    """
+    Everything the map of a day needs, so it can be set up from a single request: its bounds,
+    a marker for each picture (with coordinates) and the (simplified) geometry of each track.
+
+    Pictures whose coordinates are ignored (inside privacy zones) have no marker.
+
+    :param trip_day: the day
+    :param privacy_zone_index: the privacy zones of the trip (applied on the tracks)
+    :param tolerance: the tolerance (in meters) used to simplify the tracks
+    :param thumbnail_folder: the rendition (folder) used on the markers
+    :param full_folder: the rendition (folder) opened when a marker is clicked
+    :return: a JSON serializable dictionary
+    """
+    pictures = []
+
+    for picture in trip_day.pictures:
+        coordinates = picture.coordinates
+
+        if not coordinates:
+            continue
+
+        pictures.append(
+            {
+                'lat': round(coordinates.latitude, COORDINATES_PRECISION),
+                'lng': round(coordinates.longitude, COORDINATES_PRECISION),
+                'thumbnail': f'pictures/{trip_day.date_iso}/{thumbnail_folder}/{picture.filename}',
+                'full': f'pictures/{trip_day.date_iso}/{full_folder}/{picture.filename}',
+            }
+        )
+
+    tracks = [
+        track_payload(track, privacy_zone_index, tolerance=tolerance) for track in trip_day.tracks
+    ]
+
+    pictures_bounds = [
+        Bounds(picture['lat'], picture['lng'], picture['lat'], picture['lng'])
+        for picture in pictures
+    ]
+    tracks_bounds = [Bounds.from_list(track['bounds']) for track in tracks if track['bounds']]
+    bounds = Bounds.union_of(pictures_bounds + tracks_bounds)
+
+    return {
+        'date': trip_day.date_iso,
+        'bounds': bounds.to_list() if bounds else None,
+        'pictures': pictures,
+        'tracks': tracks,
+    }
+
+
+def trip_payload(trip_day_payloads: Iterable[dict]) -> dict:
+    """
+    Everything the map of the whole trip needs: the tracks of all the days (but no pictures),
+    built from the payloads of each day.
+    """
+    days = [
+        {'date': payload['date'], 'bounds': payload['bounds'], 'tracks': payload['tracks']}
+        for payload in trip_day_payloads
+    ]
+
+    bounds = Bounds.union_of(
+        Bounds.from_list(track['bounds'])
+        for day in days
+        for track in day['tracks']
+        if track['bounds']
+    )
+
+    return {'bounds': bounds.to_list() if bounds else None, 'days': days}
+
+
+def write_payload(payload: dict, output_path: str) -> None:
+    with open(output_path, 'w') as file:
+        json.dump(payload, file, separators=(',', ':'))
+
+
+def read_payload(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+from hashlib import md5
+from typing import Iterable, Optional
+
+import markdown
+
+MARKDOWN_CACHE_VERSION = 1
+
+
+class MarkdownRenderer:
+    """
+    Converts Markdown (summaries, journal entries, etc) to HTML with a single configured
+    `Markdown` instance, and memoizes the output by the hash of the text.
+
+    With a `path`, the memoized outputs are persisted between runs (as JSON), so unchanged
+    texts are not converted again on the next builds. Outputs not used during a run are not
+    saved again. The cache is discarded if the Markdown version or extensions change.
+    """
+
+    def __init__(self, path: Optional[str] = None, *, extensions: Iterable[str] = ()):
+        self.path = path
+        self.extensions = list(extensions)
+
+        self.markdown = markdown.Markdown(extensions=self.extensions)
+
+        # hash of the text -> HTML
+        self.entries: dict[str, str] = {}
+        self.used: set[str] = set()
+
+        self.hits = 0
+        self.misses = 0
+
+        # Pages might be rendered in parallel (threads), and a Markdown instance keeps state
+        # while converting
+        self._lock = threading.Lock()
+
+    @property
+    def configuration(self) -> dict:
+        return {
+            'version': MARKDOWN_CACHE_VERSION,
+            'markdown_version': markdown.__version__,
+            'extensions': self.extensions,
+        }
+
+    @classmethod
+    def load(cls, path: str, *, extensions: Iterable[str] = ()) -> 'MarkdownRenderer':
+        renderer = cls(path, extensions=extensions)
+
+        try:
+            with open(path) as file:
+                content = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return renderer
+
+        if content.get('configuration') == renderer.configuration:
+            renderer.entries = content['entries']
+
+        return renderer
+
+    def save(self) -> None:
+        if not self.path:
+            return
+
+        entries = {key: value for key, value in self.entries.items() if key in self.used}
+
+        # Nothing new (nor gone) since it was loaded
+        if not self.misses and len(entries) == len(self.entries):
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with open(f'{self.path}.tmp', 'w') as file:
+            json.dump({'configuration': self.configuration, 'entries': entries}, file)
+
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def render(self, text: str) -> str:
+        """
+        :return: the HTML of the Markdown text
+        """
+        key = md5(text.encode()).hexdigest()
+
+        with self._lock:
+            self.used.add(key)
+            html = self.entries.get(key)
+
+            if html is not None:
+                self.hits += 1
+                return html
+
+            self.misses += 1
+            html = self.markdown.reset().convert(text)
+            self.entries[key] = html
+
+        return html
@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import md5
+from typing import Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
+from travel_log.utils.build_profiler import BuildProfiler
+from travel_log.utils.format_utils import format_duration
+from travel_log.website.build_manifest import BuildManifest
+from travel_log.website.markdown_renderer import MarkdownRenderer
+
+CURRENT_FOLDER = os.path.dirname(os.path.realpath(__file__))
+TEMPLATES_FOLDER = os.path.join(CURRENT_FOLDER, 'templates')
+
+
+@dataclass
+class Page:
+    """
+    A page of the website: the template rendered (with the context), and where to.
+    """
+
+    """
+    Path of the page, relative to the website folder (eg: index.html)
+    """
+    output: str
+    template_name: str
+    context: dict = field(default_factory=dict)
+
+
+class PageRenderer:
+    """
+    Renders the pages of the website. Holds a single Jinja environment, so the templates are
+    loaded and compiled only once per process (eg: on watch mode, not on every rebuild), and a
+    bytecode cache, so they are not compiled again on the next runs either (unless changed).
+    """
+
+    def __init__(
+        self,
+        templates_folder: str = TEMPLATES_FOLDER,
+        bytecode_cache_folder: Optional[str] = None,
+        markdown_renderer: Optional[MarkdownRenderer] = None,
+    ):
+        """
+        :param templates_folder: the folder with the templates
+        :param bytecode_cache_folder: a folder where the compiled templates are cached
+        :param markdown_renderer: used by the `markdown` filter
+        """
+        self.markdown_renderer = markdown_renderer or MarkdownRenderer()
+        bytecode_cache = None
+
+        if bytecode_cache_folder:
+            os.makedirs(bytecode_cache_folder, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_folder)
+
+        self.env = Environment(
+            loader=FileSystemLoader(templates_folder),
+            bytecode_cache=bytecode_cache,
+            # Templates changed (eg: on watch mode) are loaded again
+            auto_reload=True,
+        )
+        self.env.filters['markdown'] = lambda text: Markup(self.markdown_renderer.render(text))
+        self.env.filters['duration'] = format_duration
+
+    def render_to_file(self, page: Page, output_path: str) -> str:
+        """
+        Streams the rendered page to the file, without building the whole page in memory.
+
+        :return: the hash of the content of the page
+        """
+        template = self.env.get_template(page.template_name)
+        digest = md5()
+
+        with open(output_path, 'w', encoding='utf-8') as file:
+            for chunk in template.generate(**page.context):
+                file.write(chunk)
+                digest.update(chunk.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def render_pages(
+        self,
+        pages: list[Page],
+        manifest: BuildManifest,
+        *,
+        max_workers: int = 1,
+        profiler: Optional[BuildProfiler] = None,
+    ) -> list[str]:
+        """
+        Renders the pages (on a pool of threads, if max_workers > 1). Pages depend on (almost)
+        everything, so they are always rendered, but only replaced if they actually changed.
+
+        :param profiler: records the time spent on each page (on the 'render' stage)
+        :return: the outputs written (changed since the previous build)
+        """
+        profiler = profiler or BuildProfiler(enabled=False)
+        markdown_hits, markdown_misses = self.markdown_renderer.hits, self.markdown_renderer.misses
+
+        def render_page(page: Page) -> Optional[str]:
+            output_path = manifest.output_path(page.output)
+            temporary_path = f'{output_path}.tmp'
+
+            with profiler.asset('render', page.output):
+                output_fingerprint = self.render_to_file(page, temporary_path)
+
+            if manifest.is_fresh(page.output, output_fingerprint):
+                os.remove(temporary_path)
+                profiler.count('render', 'unchanged')
+                return None
+
+            os.replace(temporary_path, output_path)
+            manifest.record(page.output, output_fingerprint)
+            profiler.count_file('render', output_path)
+
+            return page.output
+
+        if max_workers <= 1 or len(pages) <= 1:
+            results = [render_page(page) for page in pages]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(render_page, pages))
+
+        self.markdown_renderer.save()
+        profiler.count('render', 'markdown_hits', self.markdown_renderer.hits - markdown_hits)
+        profiler.count('render', 'markdown_misses', self.markdown_renderer.misses - markdown_misses)
+
+        return [output for output in results if output]
+
+
+@lru_cache(maxsize=None)
+def get_page_renderer(cache_path: Optional[str] = None) -> PageRenderer:
+    """
+    :param cache_path: a folder where the compiled templates and the Markdown outputs are cached
+    (between runs). Without it, they are only kept in memory.
+    :return: the renderer (shared by all the builds of the process)
+    """
+    if not cache_path:
+        return PageRenderer()
+
+    return PageRenderer(
+        bytecode_cache_folder=os.path.join(cache_path, 'templates'),
+        markdown_renderer=MarkdownRenderer.load(os.path.join(cache_path, 'markdown.json')),
+    )
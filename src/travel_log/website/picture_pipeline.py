@@ -0,0 +1,182 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import (
+    DEFAULT_RENDITIONS,
+    PictureResizer,
+    Rendition,
+)
+from travel_log.assets.pictures.rendition_cache import EXIF_POLICY_KEEP, RenditionCache
+from travel_log.utils.file_links import LINK_STRATEGY_AUTO
+
+
+@dataclass(frozen=True)
+class PictureContext:
+    """
+    State shared by all picture jobs of a build. Sent once per chunk of jobs to the workers,
+    so it should stay small and picklable.
+    """
+
+    renditions: tuple[Rendition, ...] = DEFAULT_RENDITIONS
+
+    """
+    How the cached renditions are put on the output folder (see `link_file`)
+    """
+    link_strategy: str = LINK_STRATEGY_AUTO
+
+
+@dataclass(frozen=True)
+class PictureJob:
+    """
+    A single picture to be processed. Only paths are sent to the workers (and not the Picture
+    objects from the Trip), so the parent process stays the owner of the Trip model.
+    """
+
+    picture_path: str
+
+    """
+    The folder where the renditions are saved, each one on a subfolder named after the
+    rendition (eg: <output_folder>/thumbnail/<filename>).
+    """
+    output_folder: str
+
+    """
+    What is kept from the EXIF metadata of the original. Decided by the main process, which
+    knows whether the picture is inside a privacy zone.
+    """
+    exif_policy: str = EXIF_POLICY_KEEP
+
+    """
+    A view of the rendition cache for this picture (see `RenditionCache.view_for`).
+    """
+    cache: Optional[RenditionCache] = None
+
+    def output_path(self, rendition: Rendition) -> str:
+        return os.path.join(
+            self.output_folder,
+            rendition.name,
+            rendition.output_filename(os.path.basename(self.picture_path)),
+        )
+
+
+@dataclass(frozen=True)
+class PictureJobResult:
+    picture_path: str
+
+    """
+    The traceback of the exception that made the job fail, and the repr of the exception
+    """
+    error: Optional[str] = None
+    error_repr: Optional[str] = None
+
+    """
+    The cache view of the job, updated with the renditions generated or used by the job. Should
+    be merged back into the cache by the main process.
+    """
+    cache: Optional[RenditionCache] = None
+
+    """
+    Number of renditions generated (the others were found in the cache)
+    """
+    renditions_generated: int = 0
+
+    """
+    When (as returned by time.time()) and where (process id) the job ran, and its wall and CPU
+    time (in seconds), measured by the worker (see `BuildProfiler.record_asset`)
+    """
+    started_at: float = 0.0
+    pid: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+
+
+class PictureProcessingError(RuntimeError):
+    """
+    Raised after all pictures were processed if at least one of them failed.
+    """
+
+    def __init__(self, failed_results: list[PictureJobResult]):
+        self.failed_results = failed_results
+
+        details = '\n'.join(
+            f'* {result.picture_path}: {self.summary(result)}' for result in failed_results
+        )
+        super().__init__(f'{len(failed_results)} picture(s) could not be processed:\n{details}')
+
+    @staticmethod
+    def summary(result: PictureJobResult) -> str:
+        """
+        :return: the last line of the traceback (the exception), or the repr of the exception
+        when there is no traceback
+        """
+        lines = (result.error or '').strip().splitlines()
+
+        return lines[-1] if lines else str(result.error_repr)
+
+
+def process_picture(context: PictureContext, job: PictureJob) -> PictureJobResult:
+    """
+    Generates all the renditions of a picture (already without the EXIF metadata left out by
+    the job's policy). Runs inside a worker process.
+
+    Exceptions are not raised but returned as part of the result, so one broken picture does
+    not abort the processing of all the others.
+    """
+    started_at = time.time()
+    start, cpu_start = time.perf_counter(), time.thread_time()
+
+    def result(**kwargs) -> PictureJobResult:
+        return PictureJobResult(
+            job.picture_path,
+            cache=job.cache,
+            started_at=started_at,
+            pid=os.getpid(),
+            wall_time=time.perf_counter() - start,
+            cpu_time=time.thread_time() - cpu_start,
+            **kwargs,
+        )
+
+    picture = Picture(job.picture_path)
+    output_paths = {rendition: job.output_path(rendition) for rendition in context.renditions}
+
+    try:
+        renditions_generated = PictureResizer.generate_renditions(
+            picture,
+            output_paths,
+            cache=job.cache,
+            exif_policy=job.exif_policy,
+            link_strategy=context.link_strategy,
+        )
+    except Exception as error:
+        return result(error=traceback.format_exc(), error_repr=repr(error))
+
+    return result(renditions_generated=renditions_generated)
+
+
+def run_picture_jobs(
+    context: PictureContext, jobs: list[PictureJob], *, max_workers: int = 1
+) -> list[PictureJobResult]:
+    """
+    Processes all the jobs, either in the current process (max_workers=1) or in a pool of
+    worker processes.
+
+    :param context: state shared by all jobs
+    :param jobs: the pictures to be processed
+    :param max_workers: the number of worker processes
+    :return: one result per job, in the same order as the jobs
+    """
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [process_picture(context, job) for job in jobs]
+
+    # Big enough chunks to amortize the IPC, small enough to keep all workers busy until the end
+    chunk_size = max(1, len(jobs) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Executor.map (unlike as_completed) yields the results in the order of the jobs
+        return list(executor.map(partial(process_picture, context), jobs, chunksize=chunk_size))
@@ -0,0 +1,50 @@
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import THUMBNAIL, Rendition
+from travel_log.assets.pictures.rendition_cache import FORMAT_JPEG, FORMAT_WEBP
+
+
+class PictureSources:
+    """
+    Used by the templates to link the renditions of the pictures: their URLs, their sizes and
+    the `srcset` of each format, so the browsers download the smallest rendition good enough
+    for the screen (and WebP, if supported).
+    """
+
+    def __init__(self, renditions: tuple[Rendition, ...]):
+        self.renditions = {rendition.name: rendition for rendition in renditions}
+
+    def url(self, picture: Picture, date_iso: str, name: str = THUMBNAIL.name) -> str:
+        rendition = self.renditions[name]
+        return f'pictures/{date_iso}/{name}/{rendition.output_filename(picture.filename)}'
+
+    def size(self, picture: Picture, name: str = THUMBNAIL.name) -> tuple[int, int]:
+        """
+        :return: the (width, height) of the rendition of the picture
+        """
+        return self.renditions[name].output_size(picture.dimensions)
+
+    def srcset(self, picture: Picture, date_iso: str, image_format: str = FORMAT_WEBP) -> str:
+        """
+        :return: the renditions of the picture in the format, by width (eg: 'a.webp 320w, ...').
+        Renditions that end up with the same width (the picture is smaller than some of them)
+        are listed once.
+        """
+        candidates: dict[int, str] = {}
+
+        for rendition in sorted(self.renditions.values(), key=lambda rendition: rendition.size):
+            if rendition.image_format != image_format:
+                continue
+
+            width, _ = rendition.output_size(picture.dimensions)
+            candidates.setdefault(width, self.url(picture, date_iso, rendition.name))
+
+        return ', '.join(f'{url} {width}w' for width, url in sorted(candidates.items()))
+
+    @property
+    def formats(self) -> list[str]:
+        """
+        :return: the formats of the renditions, other than JPEG (the fallback), eg: ['WEBP']
+        """
+        return sorted(
+            {rendition.image_format for rendition in self.renditions.values()} - {FORMAT_JPEG}
+        )
@@ -1,4 +1,4 @@
-/*
+/*!
     From: https://github.com/turban/Leaflet.Photo
 
     Modified in this project to:
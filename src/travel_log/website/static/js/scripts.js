@@ -9,8 +9,6 @@ const loadMap = id => {
 }
 
 const addPicturesToMap = (pictures, map) => {
-    let formattedPictures = []
-
     let photoLayer = L.photo.cluster({
         spiderfyDistanceMultiplier: 1.2,
         icon: { iconSize: [60, 60] },
@@ -25,104 +23,102 @@ const addPicturesToMap = (pictures, map) => {
         evt.layer.photo.openOnLightbox()
     })
 
-    pictures.forEach(picture => {
-        let longitude = parseFloat(picture.getAttribute('data-longitude'))
-        let latitude = parseFloat(picture.getAttribute('data-latitude'))
-        // let marker = L.marker({ lng: longitude, lat: latitude }).addTo(map)
-
-        if (!(longitude && latitude)) return
-
-        formattedPictures.push({
-            lng: longitude,
-            lat: latitude,
-            caption: 'Photo',
-            thumbnail: picture.getAttribute('src'),
-            openOnLightbox: () => picture.click(),
-        })
-    })
+    let formattedPictures = pictures.map(picture => ({
+        lng: picture.lng,
+        lat: picture.lat,
+        caption: 'Photo',
+        thumbnail: picture.thumbnail,
+        // Opens the lightbox gallery (of the day) on this picture
+        openOnLightbox: () => document.querySelector(`a[href="${picture.full}"]`).click(),
+    }))
 
     photoLayer.add(formattedPictures).addTo(map)
 }
 
-const fitBoundsMultipleTracks = (tracksLoaded, map) => {
-    let bounds = L.latLngBounds(tracksLoaded[0].getBounds())
+// Decodes a polyline encoded by the website generator ("Encoded Polyline Algorithm Format")
+const decodePolyline = (encoded, precision) => {
+    const factor = Math.pow(10, precision)
+    let points = []
+    let index = 0
+    let latitude = 0
+    let longitude = 0
+
+    const decodeValue = () => {
+        let result = 0
+        let shift = 0
+        let byte
+
+        do {
+            byte = encoded.charCodeAt(index++) - 63
+            result |= (byte & 0x1f) << shift
+            shift += 5
+        } while (byte >= 0x20)
+
+        return result & 1 ? ~(result >> 1) : result >> 1
+    }
+
+    while (index < encoded.length) {
+        latitude += decodeValue()
+        longitude += decodeValue()
+        points.push([latitude / factor, longitude / factor])
+    }
+
+    return points
+}
 
-    tracksLoaded.forEach(trackLoaded => {
-        if (!trackLoaded) return
+const pinIcon = iconUrl => L.icon({
+    iconUrl: iconUrl,
+    shadowUrl: 'images/pin-shadow.png',
+    iconSize: [33, 45],
+    iconAnchor: [16, 45],
+    shadowSize: [50, 50],
+    shadowAnchor: [16, 47],
+})
 
-        bounds.extend(trackLoaded.getBounds())
-    })
+const addTracksToMap = (tracks, map, withMarkers, tooltip) => {
+    tracks.forEach(track => {
+        let layer = L.featureGroup()
 
-    map.fitBounds(bounds)
-}
+        track.segments.forEach(encoded => {
+            let points = decodePolyline(encoded, track.precision)
 
-const addTracksToMapTripDay = (tracks, map) => {
-    /*
-     Tracks are added asynchronously to the map, which makes calling "fitBounds" a bit trickier.
-     */
-    let tracksLoadedOnMap = []
+            L.polyline(points).addTo(layer)
 
-    tracks.forEach(track => {
-        let gpx = track.getAttribute('data-gpx-url') // URL to your GPX file or the GPX itself
-
-        new L.GPX(gpx, {
-            async: true,
-            marker_options: {
-                startIconUrl: 'images/pin-icon-start.png',
-                endIconUrl: 'images/pin-icon-end.png',
-                shadowUrl: 'images/pin-shadow.png',
-            },
-        }).on('loaded', e => {
-            tracksLoadedOnMap.push(e.target)
-
-            if (tracksLoadedOnMap.length === tracks.length)
-                fitBoundsMultipleTracks(tracksLoadedOnMap, map)
-        }).on('error', _ => {
-            tracksLoadedOnMap.push(null)
-
-            if (tracksLoadedOnMap.length === tracks.length)
-                fitBoundsMultipleTracks(tracksLoadedOnMap, map)
-        }).addTo(map)
+            if (withMarkers && points.length) {
+                L.marker(points[0], { icon: pinIcon('images/pin-icon-start.png') }).addTo(layer)
+                L.marker(points[points.length - 1], { icon: pinIcon('images/pin-icon-end.png') }).addTo(layer)
+            }
+        })
+
+        if (tooltip) layer.bindTooltip(tooltip)
+
+        layer.addTo(map)
     })
 }
 
-const addTracksToMapTrip = (tracks, map) => {
-    let tracksLoadedOnMap = []
+// Each map has a payload (generated with the website) with everything it needs
+const loadMapPayload = (element, map) =>
+    fetch(element.getAttribute('data-map-url'))
+        .then(response => response.json())
+        .then(payload => {
+            if (payload.bounds) map.fitBounds(payload.bounds, { maxZoom: 15 })
+            else map.fitWorld()
 
-    tracks.forEach(track => {
-        let gpx = track.getAttribute('data-gpx-url') // URL to your GPX file or the GPX itself
-
-        new L.GPX(gpx, {
-            async: true,
-            marker_options: {
-                startIconUrl: undefined,
-                endIconUrl: undefined,
-                shadowUrl: undefined,
-            },
-        }).on('loaded', e => {
-            tracksLoadedOnMap.push(e.target)
-
-            if (tracksLoadedOnMap.length === tracks.length)
-                fitBoundsMultipleTracks(tracksLoadedOnMap, map)
-
-            // e.target.bindTooltip(track.getAttribute('data-trip-date'), {
-            //     permanent: true,
-            // }).openTooltip()
-            e.target.bindTooltip(track.getAttribute('data-trip-date'))
-        }).on('error', _ => {
-            tracksLoadedOnMap.push(null)
-
-            if (tracksLoadedOnMap.length === tracks.length)
-                fitBoundsMultipleTracks(tracksLoadedOnMap, map)
-        }).addTo(map)
+            return payload
+        })
+
+// The map for the entire trip. All routes should be added to this one. Only on the summary page
+// (when each day has its own page)
+const mapTripElement = document.getElementById('map_trip')
+
+if (mapTripElement) {
+    const mapTrip = loadMap('map_trip')
+
+    loadMapPayload(mapTripElement, mapTrip).then(payload => {
+        payload.days.forEach(day => addTracksToMap(day.tracks, mapTrip, false, day.date))
     })
 }
 
-// The map for the entire trip. All routes should be added to this one
-let allTracks = document.querySelectorAll('.track')
-const mapTrip = loadMap('map_trip')
-addTracksToMapTrip(allTracks, mapTrip)
-
 
 // Maps for each individual TripDay
 let maps = document.querySelectorAll('.map-trip-day')
@@ -138,11 +134,8 @@ maps.forEach(element => {
         mapTripDay.panTo(mapTripDay.unproject(px), { animate: true }) // pan to new center
     })
 
-    let tripDate = element.getAttribute('data-trip-date')
-
-    let tracks = document.querySelectorAll((`.track[data-trip-date*="${tripDate}"]`))
-    addTracksToMapTripDay(tracks, mapTripDay)
-
-    let pictures = document.querySelectorAll((`.picture[data-trip-date*="${tripDate}"]`))
-    addPicturesToMap(pictures, mapTripDay)
-})
\ No newline at end of file
+    loadMapPayload(element, mapTripDay).then(payload => {
+        addTracksToMap(payload.tracks, mapTripDay, true)
+        addPicturesToMap(payload.pictures, mapTripDay)
+    })
+})
@@ -0,0 +1,56 @@
+import logging
+
+from travel_log.assets.tracks.track import Track
+from travel_log.assets.tracks.track_simplifier import simplify_segment
+from travel_log.assets.tracks.track_stats import TrackStats
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
+from travel_log.utils.polyline_utils import DEFAULT_POLYLINE_PRECISION, encode_polyline
+
+logger = logging.getLogger(__name__)
+
+
+def track_payload(track: Track, privacy_zone_index: PrivacyZoneIndex, *, tolerance: float) -> dict:
+    """
+    The compact representation of a track loaded by the website (instead of the GPX file):
+        1) the points inside privacy zones are removed (always before simplifying), and the
+           segments are split where they were: joining the points around a privacy zone would
+           draw a line through it
+        2) each segment is simplified (see `simplify_segment`)
+        3) each segment is encoded as a polyline (see `encode_polyline`)
+
+    :param track: the (original) track
+    :param privacy_zone_index: the privacy zones of the trip
+    :param tolerance: the tolerance (in meters) of the simplification
+    :return: a JSON serializable dictionary
+    """
+    segments = []
+    points_count = 0
+
+    for segment in track.segments:
+        points_count += len(segment)
+        outside = ~privacy_zone_index.points_inside_mask(segment.latitudes, segment.longitudes)
+        segments += [simplify_segment(part, tolerance) for part in segment.split(outside)]
+
+    bounds = TrackStats.of_segments(segments).bounds
+
+    simplified_points_count = sum(len(segment) for segment in segments)
+    logger.debug(
+        'Simplified %s from %d to %d points',
+        track.filename,
+        points_count,
+        simplified_points_count,
+        extra={
+            'track': track.path,
+            'points': points_count,
+            'simplified_points': simplified_points_count,
+        },
+    )
+
+    return {
+        'name': track.filename,
+        'precision': DEFAULT_POLYLINE_PRECISION,
+        'segments': [
+            encode_polyline(segment.latitudes, segment.longitudes) for segment in segments
+        ],
+        'bounds': bounds.to_list() if bounds else None,
+    }
@@ -1,120 +1,630 @@
+import datetime
+import logging
 import os
 import shutil
+from dataclasses import asdict
+from hashlib import md5
+from typing import Optional
 
-import markdown
-from jinja2 import FileSystemLoader, Environment, Markup
-from travel_log.assets.pictures.picture_resizer import PictureResizer
+from travel_log.assets.pictures.picture_resizer import DEFAULT_RENDITIONS, Rendition
+from travel_log.assets.pictures.rendition_cache import (
+    EXIF_POLICY_KEEP,
+    EXIF_POLICY_STRIP_GPS,
+    RenditionCache,
+)
+from travel_log.assets.tracks.track_simplifier import DEFAULT_SIMPLIFY_TOLERANCE
 from travel_log.models.privacy_zone import PrivacyZone
-from travel_log.models.trip import Trip
+from travel_log.models.trip import Trip, TripStream
+from travel_log.models.trip_day import TripDay, TripDaySummary
+from travel_log.utils.build_profiler import BuildProfiler
+from travel_log.utils.file_links import LINK_STRATEGY_AUTO
+from travel_log.utils.memory_utils import MemoryCeiling
+from travel_log.website.asset_pipeline import (
+    STATIC_FOLDER,
+    build_static_assets,
+    precompress_outputs,
+)
+from travel_log.website.build_manifest import BuildManifest, fingerprint
+from travel_log.website.picture_sources import PictureSources
+from travel_log.website.picture_pipeline import (
+    PictureContext,
+    PictureJob,
+    PictureProcessingError,
+    run_picture_jobs,
+)
+from travel_log.website.map_payload import (
+    MAP_PAYLOAD_VERSION,
+    read_payload,
+    trip_day_payload,
+    trip_payload,
+    write_payload,
+)
+from travel_log.website.page_renderer import TEMPLATES_FOLDER, Page, get_page_renderer
 
-CURRENT_FOLDER = os.path.dirname(os.path.realpath(__file__))
+# The folders the website is generated from (besides the trip)
+TEMPLATES_FOLDERS = (TEMPLATES_FOLDER, STATIC_FOLDER)
 
+logger = logging.getLogger(__name__)
 
-def render_pages_to_files(folder_path, trip: Trip):
-    template_file_name = 'index.html'
 
-    file_loader = FileSystemLoader(os.path.join(CURRENT_FOLDER, 'templates'))
-    env = Environment(loader=file_loader)
-    env.filters['markdown'] = lambda text: Markup(markdown.markdown(text))
+def render_pages_to_files(
+    folder_path,
+    trip: Trip,
+    manifest: BuildManifest,
+    *,
+    publish_gpx: bool = False,
+    page_per_day: bool = False,
+    cache_path: Optional[str] = None,
+    jobs: int = 1,
+    asset_urls: Optional[dict[str, str]] = None,
+    renditions: tuple[Rendition, ...] = DEFAULT_RENDITIONS,
+    profiler: Optional[BuildProfiler] = None,
+    index: bool = True,
+    day_pages: Optional[list[TripDay]] = None,
+):
+    """
+    Renders index.html (the summary of the trip) and, if `page_per_day`, one page per day
+    (<date>.html). Otherwise, all the days are on index.html.
+
+    :param index: whether to render index.html
+    :param day_pages: the days whose pages are rendered, if `page_per_day` (all the days of the
+    trip, by default). Streaming builds render them one at a time
 
-    template = env.get_template(template_file_name)
-    rendered = template.render(trip=trip)
+    :param asset_urls: the URL of each static file (see `build_static_assets`). Without them,
+    the static files are linked by their original paths
+    :param renditions: the renditions generated for each picture (see `PictureSources`)
+    :param cache_path: a folder where the compiled templates and the Markdown outputs are cached
+    :param jobs: number of threads used to render the pages
+    :param profiler: records the time spent on each page
+    """
 
-    with open(os.path.join(folder_path, template_file_name), 'w') as file:
-        file.write(rendered)
+    def day_url(date: datetime.date) -> str:
+        return f'{date.isoformat()}.html' if page_per_day else f'#day-{date}'
 
+    def asset_url(path: str) -> str:
+        if asset_urls is None:
+            return path
 
-def copy_static_files(folder_path):
-    shutil.copytree(os.path.join(CURRENT_FOLDER, 'static', 'css'), os.path.join(folder_path, 'css'))
-    shutil.copytree(os.path.join(CURRENT_FOLDER, 'static', 'js'), os.path.join(folder_path, 'js'))
-    shutil.copytree(
-        os.path.join(CURRENT_FOLDER, 'static', 'images'), os.path.join(folder_path, 'images')
-    )
+        if path not in asset_urls:
+            raise RuntimeError(f'Unknown static file: {path}')
 
+        return asset_urls[path]
 
-def copy_pictures(folder_path, cache_path, trip: Trip):
-    pictures_folder_path = os.path.join(folder_path, 'pictures')
+    context = {
+        'trip': trip,
+        'publish_gpx': publish_gpx,
+        'page_per_day': page_per_day,
+        'day_url': day_url,
+        'asset_url': asset_url,
+        'pictures': PictureSources(renditions),
+        'summary_url': 'index.html#summary' if page_per_day else '#summary',
+    }
+    pages = [Page('index.html', 'index.html', context)] if index else []
 
-    os.makedirs(pictures_folder_path)
+    if page_per_day:
+        pages += [
+            Page(f'{trip_day.date_iso}.html', 'trip_day.html', {**context, 'trip_day': trip_day})
+            for trip_day in (trip.trip_days if day_pages is None else day_pages)
+        ]
+
+    get_page_renderer(cache_path).render_pages(pages, manifest, max_workers=jobs, profiler=profiler)
+
+
+def copy_pictures(
+    cache_path,
+    trip: Trip,
+    manifest: BuildManifest,
+    *,
+    jobs: int = 1,
+    renditions: tuple[Rendition, ...] = DEFAULT_RENDITIONS,
+    cache_max_size: Optional[int] = None,
+    link_strategy: str = LINK_STRATEGY_AUTO,
+    profiler: Optional[BuildProfiler] = None,
+    rendition_cache: Optional[RenditionCache] = None,
+):
+    """
+    :param rendition_cache: the pictures cache, if already loaded (eg: by a streaming build,
+    which processes the pictures one day at a time). It is then saved by the caller
+    """
+    profiler = profiler or BuildProfiler(enabled=False)
+
+    if rendition_cache is None:
+        cache = RenditionCache.load(os.path.join(cache_path, 'renditions'), max_size=cache_max_size)
+    else:
+        cache = rendition_cache
+
+    privacy_zones_fingerprint = fingerprint([asdict(zone) for zone in trip.privacy_zones])
+
+    picture_jobs: list[PictureJob] = []
+    outputs_fingerprints: list[dict[str, str]] = []
 
     for trip_day in trip.trip_days:
-        trip_day_pictures_folder_path = os.path.join(pictures_folder_path, trip_day.date_iso)
-        os.makedirs(trip_day_pictures_folder_path)
-        os.makedirs(os.path.join(trip_day_pictures_folder_path, 'full'))
-        os.makedirs(os.path.join(trip_day_pictures_folder_path, 'thumbnail'))
+        trip_day_pictures_folder = os.path.join('pictures', trip_day.date_iso)
 
-        for picture in trip_day.pictures:
-            full_output_path = os.path.join(trip_day_pictures_folder_path, 'full', picture.filename)
-            PictureResizer.generate_full_size(picture, full_output_path, cache_folder=cache_path)
-            inside_zone = PrivacyZone.apply_many_on_processed_picture(
-                trip.privacy_zones, full_output_path
+        for rendition in renditions:
+            os.makedirs(
+                manifest.output_path(os.path.join(trip_day_pictures_folder, rendition.name)),
+                exist_ok=True,
             )
-            if inside_zone:
+
+        for picture in trip_day.pictures:
+            # Decided from the original (its coordinates are already in memory), so the
+            # renditions are encoded without the GPS information straight away
+            privacy_zone = trip.privacy_zone_index.zone_containing_picture(picture)
+
+            if privacy_zone:
+                logger.info(
+                    'Picture %s inside %s',
+                    picture.filename,
+                    privacy_zone.name,
+                    extra={'picture': picture.path, 'privacy_zone': privacy_zone.name},
+                )
                 picture.ignore_exif_coordinates()
+                profiler.count('pictures', 'inside_privacy_zones')
 
-            thumbnail_output_path = os.path.join(
-                trip_day_pictures_folder_path, 'thumbnail', picture.filename
-            )
-            PictureResizer.generate_thumbnail(
-                picture, thumbnail_output_path, cache_folder=cache_path
+            exif_policy = EXIF_POLICY_STRIP_GPS if privacy_zone else EXIF_POLICY_KEEP
+            inputs_fingerprint = fingerprint(
+                picture.path, picture.file_stat, privacy_zones_fingerprint, exif_policy
             )
-            inside_zone = PrivacyZone.apply_many_on_processed_picture(
-                trip.privacy_zones, thumbnail_output_path
+            outputs = {}
+
+            for rendition in renditions:
+                output = os.path.join(
+                    trip_day_pictures_folder,
+                    rendition.name,
+                    rendition.output_filename(picture.filename),
+                )
+                outputs[output] = fingerprint(inputs_fingerprint, asdict(rendition))
+
+            if all(manifest.is_fresh(output, value) for output, value in outputs.items()):
+                profiler.count('pictures', 'fresh')
+                continue
+
+            outputs_fingerprints.append(outputs)
+            picture_jobs.append(
+                PictureJob(
+                    picture.path,
+                    manifest.output_path(trip_day_pictures_folder),
+                    exif_policy=exif_policy,
+                    cache=cache.view_for(picture.path),
+                )
             )
-            if inside_zone:
-                picture.ignore_exif_coordinates()
 
-            '''
-            The behavior above with pictures is a bit tricky to follow.
+    context = PictureContext(renditions=renditions, link_strategy=link_strategy)
+    results = run_picture_jobs(context, picture_jobs, max_workers=jobs)
+
+    for outputs, result in zip(outputs_fingerprints, results):
+        if result.cache:
+            cache.merge(result.cache)
+
+        profiler.record_asset(
+            'pictures',
+            result.picture_path,
+            started_at=result.started_at,
+            wall_time=result.wall_time,
+            cpu_time=result.cpu_time,
+            pid=result.pid,
+        )
+
+        if result.error:
+            profiler.count('pictures', 'errors')
+            continue
+
+        profiler.count('pictures', 'renditions_generated', result.renditions_generated)
+        profiler.count(
+            'pictures', 'renditions_from_cache', len(outputs) - result.renditions_generated
+        )
+
+        for output, output_fingerprint in outputs.items():
+            manifest.record(output, output_fingerprint)
+            profiler.count_file('pictures', manifest.output_path(output))
 
-            We need to do 2 things:
-            1) Remove the EXIF coordinates from the processed files (thumbnail and full)
-            that are moved to the output folder. This is done with the
-            PrivacyZone.apply_many_on_processed_picture) method.
+    '''
+    The behavior above with pictures is a bit tricky to follow.
 
-            2) The Trip object (or to be more precise, TripDays), has reference to Picture
-            objects that are actually referencing the original pictures (not copied to the output
-            folder). Those Picture objects are the ones used in the templates, and from those we
-            need to "hide" the EXIF coordinates from the object, but we don't want to modify
-            the original files. This is done with the picture.ignore_exif_coordinates().
-            '''
+    We need to do 2 things for the pictures inside privacy zones:
+    1) Leave the GPS information out of the processed files (all the renditions) that are
+    moved to the output folder. The decision is taken here, from the coordinates of the
+    original picture, and passed to the (possibly parallel) picture jobs as an EXIF policy.
+    The renditions are encoded without the GPS information (and cached that way), so they
+    are never rewritten afterwards.
 
+    2) The Trip object (or to be more precise, TripDays), has reference to Picture
+    objects that are actually referencing the original pictures (not copied to the output
+    folder). Those Picture objects are the ones used in the templates, and from those we
+    need to "hide" the EXIF coordinates from the object, but we don't want to modify
+    the original files. This is done with the picture.ignore_exif_coordinates().
+    '''
 
-def copy_tracks(folder_path, trip: Trip):
-    tracks_folder_path = os.path.join(folder_path, 'tracks')
+    if rendition_cache is None:
+        cache.save()
 
-    os.makedirs(tracks_folder_path)
+    failed_results = [result for result in results if result.error]
+
+    if failed_results:
+        raise PictureProcessingError(failed_results)
+
+
+def copy_tracks(
+    trip: Trip,
+    manifest: BuildManifest,
+    *,
+    link_strategy: str = LINK_STRATEGY_AUTO,
+    profiler: Optional[BuildProfiler] = None,
+):
+    """
+    Publishes the GPX files (without the points inside privacy zones), so they can be
+    downloaded. The maps do not use them (see `write_map_payloads`).
+
+    Tracks without points inside privacy zones are linked (see `link_file`) instead of copied.
+    """
+    profiler = profiler or BuildProfiler(enabled=False)
+    privacy_zones_fingerprint = fingerprint([asdict(zone) for zone in trip.privacy_zones])
 
     for trip_day in trip.trip_days:
-        trip_day_tracks_folder_path = os.path.join(tracks_folder_path, trip_day.date_iso)
-        os.makedirs(trip_day_tracks_folder_path)
+        trip_day_tracks_folder = os.path.join('tracks', trip_day.date_iso)
+        os.makedirs(manifest.output_path(trip_day_tracks_folder), exist_ok=True)
+
+        for track in trip_day.tracks:
+            output = os.path.join(trip_day_tracks_folder, track.filename)
+            output_fingerprint = fingerprint(track.path, track.file_stat, privacy_zones_fingerprint)
 
-        for picture in trip_day.tracks:
-            track_output_path = os.path.join(trip_day_tracks_folder_path, picture.filename)
-            shutil.copyfile(picture.path, track_output_path)
+            if manifest.is_fresh(output, output_fingerprint):
+                profiler.count('tracks', 'fresh')
+                continue
 
-            PrivacyZone.apply_many_on_processed_track(trip.privacy_zones, track_output_path)
+            with profiler.asset('tracks', track.path):
+                filtered = PrivacyZone.apply_many_on_track_file(
+                    trip.privacy_zone_index,
+                    track.path,
+                    manifest.output_path(output),
+                    link_strategy=link_strategy,
+                )
 
+            manifest.record(output, output_fingerprint)
+            profiler.count('tracks', 'filtered', int(filtered))
+            profiler.count_file('tracks', manifest.output_path(output))
+
+
+def write_map_payloads(
+    trip: Trip,
+    manifest: BuildManifest,
+    *,
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    profiler: Optional[BuildProfiler] = None,
+    include_trip: bool = True,
+) -> list[tuple[str, str]]:
+    """
+    Writes the data loaded by the maps: one payload per day (`data/<date>.json`, see
+    `trip_day_payload`) and one for the map of the whole trip (`data/trip.json`).
+
+    Must be called after the pictures are processed, since the pictures inside privacy zones
+    have no markers.
+
+    :param include_trip: whether to also write the payload of the whole trip. Streaming builds
+    write it at the end (see `write_trip_payload`), from the payloads of all the days
+    :return: the output (and its fingerprint) of the payload of each day
+    """
+    profiler = profiler or BuildProfiler(enabled=False)
+    privacy_zones_fingerprint = fingerprint([asdict(zone) for zone in trip.privacy_zones])
+    os.makedirs(manifest.output_path('data'), exist_ok=True)
+
+    trip_day_outputs = []
+
+    for trip_day in trip.trip_days:
+        output = os.path.join('data', f'{trip_day.date_iso}.json')
+        output_fingerprint = fingerprint(
+            MAP_PAYLOAD_VERSION,
+            privacy_zones_fingerprint,
+            simplify_tolerance,
+            [(track.path, track.file_stat) for track in trip_day.tracks],
+            [(picture.path, picture.coordinates) for picture in trip_day.pictures],
+        )
+        trip_day_outputs.append((output, output_fingerprint))
+
+        if manifest.is_fresh(output, output_fingerprint):
+            profiler.count('map_payloads', 'fresh')
+            continue
+
+        with profiler.asset('map_payloads', output):
+            payload = trip_day_payload(
+                trip_day, trip.privacy_zone_index, tolerance=simplify_tolerance
+            )
+            write_payload(payload, manifest.output_path(output))
+
+        manifest.record(output, output_fingerprint)
+        profiler.count_file('map_payloads', manifest.output_path(output))
+
+    if include_trip:
+        write_trip_payload(trip_day_outputs, manifest, profiler=profiler)
+
+    return trip_day_outputs
+
+
+def write_trip_payload(
+    trip_day_outputs: list[tuple[str, str]],
+    manifest: BuildManifest,
+    *,
+    profiler: Optional[BuildProfiler] = None,
+):
+    """
+    Writes the payload of the map of the whole trip (`data/trip.json`), from the payloads of
+    the days (just written, or still fresh from a previous build).
 
-def generate_website(trip: Trip, folder_path, cache_path):
+    :param trip_day_outputs: the payload (and its fingerprint) of each day
+    """
+    profiler = profiler or BuildProfiler(enabled=False)
+    output = os.path.join('data', 'trip.json')
+    output_fingerprint = fingerprint(trip_day_outputs)
+
+    if manifest.is_fresh(output, output_fingerprint):
+        profiler.count('map_payloads', 'fresh')
+        return
+
+    with profiler.asset('map_payloads', output):
+        payload = trip_payload(
+            read_payload(manifest.output_path(trip_day_output))
+            for trip_day_output, _ in trip_day_outputs
+        )
+        write_payload(payload, manifest.output_path(output))
+
+    manifest.record(output, output_fingerprint)
+    profiler.count_file('map_payloads', manifest.output_path(output))
+
+
+def open_manifest(folder_path, cache_path, incremental: bool) -> BuildManifest:
+    """
+    :return: the manifest of the previous build, on incremental builds. Otherwise, the website
+    folder is emptied, and the manifest is empty
+    """
+    manifest_path = os.path.join(
+        cache_path, 'builds', f'{md5(os.path.realpath(folder_path).encode()).hexdigest()}.json'
+    )
+
+    if incremental:
+        manifest = BuildManifest.load(folder_path, manifest_path)
+    else:
+        # remove existing folder
+        shutil.rmtree(folder_path, ignore_errors=True)
+        manifest = BuildManifest(folder_path, manifest_path)
+
+    os.makedirs(folder_path, exist_ok=True)
+
+    return manifest
+
+
+def finish_build(manifest: BuildManifest, *, precompress: bool, profiler: BuildProfiler):
+    """
+    Compresses the text outputs (if `precompress`), removes the outputs of the previous build
+    that were not generated again, and saves the manifest.
+    """
+    if precompress:
+        with profiler.stage('precompress'):
+            for output in precompress_outputs(manifest):
+                profiler.count_file('precompress', manifest.output_path(output))
+
+    with profiler.stage('cleanup'):
+        profiler.count('cleanup', 'stale_outputs', len(manifest.remove_stale_outputs()))
+        manifest.save()
+
+
+def generate_website(
+    trip: Trip,
+    folder_path,
+    cache_path,
+    *,
+    jobs: int = 1,
+    renditions: tuple[Rendition, ...] = DEFAULT_RENDITIONS,
+    cache_max_size: Optional[int] = None,
+    incremental: bool = False,
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    publish_gpx: bool = False,
+    page_per_day: bool = False,
+    link_strategy: str = LINK_STRATEGY_AUTO,
+    precompress: bool = True,
+    profiler: Optional[BuildProfiler] = None,
+):
     """
     The entry point to generate the website.
-    It will copy static files related to the website per se, copy the user assets and
-    use the website templates to render the final output.
+    It will publish the static files related to the website per se (minified, with
+    fingerprinted names), copy the user assets and use the website templates to render the
+    final output.
+
+    On incremental builds, the existing folder is kept, and only the outputs whose inputs
+    changed since the previous build (according to the build manifest, stored in the cache) are
+    generated again. Outputs whose inputs are gone are deleted.
 
     :param folder_path: a folder path where the website will be generated
     :param cache_path: a folder path that can be used as a storage cache for some operations
     :param trip: the trip
+    :param jobs: number of worker processes used to process the pictures (and of threads used to
+    render the pages)
+    :param renditions: the resized versions generated for each picture
+    :param cache_max_size: the maximum size (in bytes) of the pictures cache
+    :param incremental: whether to reuse the outputs of the previous build
+    :param simplify_tolerance: the tolerance (in meters) used to simplify the tracks on the maps
+    :param publish_gpx: whether to also publish the GPX files (for download)
+    :param page_per_day: whether to render one page per day, instead of a single page with all
+    the days
+    :param link_strategy: how the pictures (from the cache) and the tracks are put on the
+    website folder (see LINK_STRATEGIES). Hardlinks and reflinks avoid writing them again
+    :param precompress: whether to also write compressed versions (.gz, and .br if brotli is
+    installed) of the text outputs (pages, scripts, styles, payloads and tracks)
+    :param profiler: records the time spent on each stage (and asset) of the build
     :return:
     """
-    # remove existing folder
-    shutil.rmtree(folder_path, ignore_errors=True)
-
-    # create a new empty folder
-    os.makedirs(folder_path)
+    profiler = profiler or BuildProfiler(enabled=False)
+    manifest = open_manifest(folder_path, cache_path, incremental)
 
     # create or copy files
-    copy_static_files(folder_path)
-    copy_pictures(folder_path, cache_path, trip)
-    copy_tracks(folder_path, trip)
-    render_pages_to_files(folder_path, trip)
+    with profiler.stage('static_assets'):
+        asset_urls = build_static_assets(manifest)
+
+    with profiler.stage('pictures'):
+        copy_pictures(
+            cache_path,
+            trip,
+            manifest,
+            jobs=jobs,
+            renditions=renditions,
+            cache_max_size=cache_max_size,
+            link_strategy=link_strategy,
+            profiler=profiler,
+        )
+
+    if publish_gpx:
+        with profiler.stage('tracks'):
+            copy_tracks(trip, manifest, link_strategy=link_strategy, profiler=profiler)
+
+    with profiler.stage('map_payloads'):
+        write_map_payloads(
+            trip,
+            manifest,
+            simplify_tolerance=simplify_tolerance,
+            profiler=profiler,
+        )
+
+    with profiler.stage('render'):
+        render_pages_to_files(
+            folder_path,
+            trip,
+            manifest,
+            publish_gpx=publish_gpx,
+            page_per_day=page_per_day,
+            cache_path=cache_path,
+            jobs=jobs,
+            asset_urls=asset_urls,
+            renditions=renditions,
+            profiler=profiler,
+        )
+
+    finish_build(manifest, precompress=precompress, profiler=profiler)
+
+
+def generate_website_streaming(
+    trip_stream: TripStream,
+    folder_path,
+    cache_path,
+    *,
+    jobs: int = 1,
+    renditions: tuple[Rendition, ...] = DEFAULT_RENDITIONS,
+    cache_max_size: Optional[int] = None,
+    incremental: bool = False,
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    publish_gpx: bool = False,
+    link_strategy: str = LINK_STRATEGY_AUTO,
+    precompress: bool = True,
+    memory_limit: Optional[int] = None,
+    profiler: Optional[BuildProfiler] = None,
+):
+    """
+    Same as `generate_website`, for trips too big to be kept in memory: each day is parsed,
+    processed (pictures, tracks and map payload) and rendered (on its own page) before the next
+    one, and is then released. Only the summary of each day (its date and stats) and the
+    highlights are kept, for the summary page (rendered at the end) and the map of the trip.
+
+    The website always has one page per day.
+
+    :param trip_stream: the trip (see `TripParser.stream_folder`)
+    :param memory_limit: the maximum resident memory (in bytes) of the build process, checked
+    after each day (see `MemoryCeiling`)
+
+    See `generate_website` for the other parameters.
+    """
+    profiler = profiler or BuildProfiler(enabled=False)
+    memory_ceiling = MemoryCeiling(memory_limit)
+    manifest = open_manifest(folder_path, cache_path, incremental)
+
+    with profiler.stage('static_assets'):
+        asset_urls = build_static_assets(manifest)
+
+    render_options = {
+        'publish_gpx': publish_gpx,
+        'page_per_day': True,
+        'cache_path': cache_path,
+        'jobs': jobs,
+        'asset_urls': asset_urls,
+        'renditions': renditions,
+        'profiler': profiler,
+    }
+    # Linked from every page (the days not processed yet have no stats)
+    summaries = [TripDaySummary(date) for date in trip_stream.dates]
+    summaries_by_date = {summary.date: summary for summary in summaries}
+    trip_day_outputs = []
+
+    # Loaded once, and saved at the end
+    rendition_cache = RenditionCache.load(
+        os.path.join(cache_path, 'renditions'), max_size=cache_max_size
+    )
+
+    # Built once, so are their indexes (eg: of the privacy zones, of the highlights): the
+    # assets of the day being processed, and the pages, linking all the days. The stats of the
+    # trip are only used by the summary page, rendered once all the days were processed
+    day_trip = trip_stream.trip([])
+    trip = trip_stream.trip(summaries)
+
+    try:
+        for trip_day in trip_stream.trip_days:
+            day_trip.trip_days = [trip_day]
+
+            with profiler.stage('pictures'):
+                copy_pictures(
+                    cache_path,
+                    day_trip,
+                    manifest,
+                    jobs=jobs,
+                    renditions=renditions,
+                    link_strategy=link_strategy,
+                    profiler=profiler,
+                    rendition_cache=rendition_cache,
+                )
+
+            if publish_gpx:
+                with profiler.stage('tracks'):
+                    copy_tracks(day_trip, manifest, link_strategy=link_strategy, profiler=profiler)
+
+            with profiler.stage('map_payloads'):
+                trip_day_outputs += write_map_payloads(
+                    day_trip,
+                    manifest,
+                    simplify_tolerance=simplify_tolerance,
+                    profiler=profiler,
+                    include_trip=False,
+                )
+
+            summaries_by_date[trip_day.date].stats = trip_day.stats
+            # The highlights starting on this day
+            known_highlights = len(trip.highlights)
+            trip.add_highlights(trip_stream.highlights[known_highlights:])
+
+            with profiler.stage('render'):
+                render_pages_to_files(
+                    folder_path,
+                    trip,
+                    manifest,
+                    index=False,
+                    day_pages=[trip_day],
+                    **render_options,
+                )
+
+            rss = memory_ceiling.check(f'processing {trip_day.date_iso}')
+            logger.debug(
+                'Processed %s', trip_day.date_iso, extra={'date': trip_day.date_iso, 'rss': rss}
+            )
+    finally:
+        rendition_cache.save()
+
+    with profiler.stage('map_payloads'):
+        write_trip_payload(trip_day_outputs, manifest, profiler=profiler)
+
+    with profiler.stage('render'):
+        render_pages_to_files(folder_path, trip, manifest, day_pages=[], **render_options)
+
+    finish_build(manifest, precompress=precompress, profiler=profiler)
+    memory_ceiling.check('rendering the summary')
+    logger.info(
+        'Streamed %d days (at most %.0f MB of memory between days)',
+        len(summaries),
+        memory_ceiling.peak / 1024 / 1024,
+        extra={'days': len(summaries), 'peak_rss': memory_ceiling.peak},
+    )
@@ -0,0 +1,58 @@
+import os
+import shutil
+
+from pytest import raises
+from travel_log.assets.abstract_asset import FileStat
+from travel_log.assets.asset_scanner import AssetScanner
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.tracks.track import Track
+from travel_log.parsers.trip_day_parser import TripDayParser
+
+from test.conftest import path_on_sample_project
+
+
+def test_scan_is_case_insensitive_and_recursive(tmp_path):
+    day_folder = tmp_path / '2021-05-03'
+    (day_folder / 'phone').mkdir(parents=True)
+
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p1.jpeg'), day_folder / 'A.JPG')
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p1.jpeg'), day_folder / 'phone/b.jpeg')
+    shutil.copy(path_on_sample_project('2021-05-03/car.gpx'), day_folder / 'car.GPX')
+    (day_folder / '.DS_Store').write_bytes(b'')
+    (day_folder / '._A.JPG').write_bytes(b'')
+    (day_folder / 'notes.txt').write_text('')
+
+    assets = AssetScanner([Picture, Track]).scan(str(day_folder))
+
+    assert [(type(asset), os.path.relpath(asset.path, day_folder)) for asset in assets] == [
+        (Picture, 'A.JPG'),
+        (Track, 'car.GPX'),
+        (Picture, os.path.join('phone', 'b.jpeg')),
+    ]
+    assert assets[0].file_stat == FileStat.of(os.stat(day_folder / 'A.JPG'))
+
+    assert AssetScanner([Picture]).scan(str(day_folder), recursive=False) == [assets[0]]
+
+
+class JpegTrack(Track):
+    @classmethod
+    def allowed_extensions(cls) -> list[str]:
+        return ['JPG']
+
+
+def test_extensions_are_registered_once():
+    scanner = AssetScanner([Picture])
+
+    with raises(RuntimeError, match='jpg'):
+        scanner.register(JpegTrack)
+
+
+def test_duplicate_filenames_in_a_day_are_rejected(tmp_path):
+    day_folder = tmp_path / '2021-05-03'
+    (day_folder / 'phone').mkdir(parents=True)
+
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p1.jpeg'), day_folder / 'a.jpg')
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p1.jpeg'), day_folder / 'phone/a.jpg')
+
+    with raises(RuntimeError, match='a.jpg'):
+        TripDayParser.parse_folder(str(day_folder))
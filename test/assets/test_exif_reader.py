@@ -0,0 +1,59 @@
+import glob
+
+from PIL import Image
+from pytest import fixture, raises
+from travel_log.assets.pictures.exif_reader import GPS_TAGS, ExifReaderError, read_gps
+from travel_log.assets.pictures.picture import Picture
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def picture_south_west(tmp_path):
+    exif = Image.Exif()
+    exif[0x8825] = {1: 'S', 2: (10.0, 30.0, 0.0), 3: 'W', 4: (20.0, 15.0, 0.0)}
+
+    path = str(tmp_path / 'south_west.jpeg')
+    Image.new('RGB', (10, 10)).save(path, exif=exif)
+
+    return path
+
+
+def test_same_gps_tags_as_exif_library():
+    for path in glob.glob(path_on_sample_project('*/*.jpeg')):
+        picture = Picture(path)
+        expected = {
+            tag: picture.exif[tag] for tag in GPS_TAGS.values() if picture.exif.get(tag) is not None
+        }
+
+        assert picture.gps == expected
+
+
+def test_coordinates_use_the_reference_of_each_axis(picture_south_west):
+    picture = Picture(picture_south_west)
+
+    assert picture.coordinates.latitude == -10.5
+    assert picture.coordinates.longitude == -20.25
+
+
+def test_picture_without_exif(tmp_path):
+    path = str(tmp_path / 'no_exif.jpeg')
+    Image.new('RGB', (10, 10)).save(path)
+
+    with open(path, 'rb') as file:
+        assert read_gps(file) == {}
+
+    assert Picture(path).coordinates is None
+
+
+def test_not_a_jpeg():
+    with open(path_on_sample_project('trip.yaml'), 'rb') as file:
+        with raises(ExifReaderError):
+            read_gps(file)
+
+
+def test_pictures_are_slotted():
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+
+    assert not hasattr(picture, '__dict__')
+    assert picture.coordinates
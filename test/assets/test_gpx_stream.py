@@ -0,0 +1,104 @@
+import os
+from tempfile import TemporaryDirectory
+
+import gpxpy
+import numpy
+from pytest import fixture
+from travel_log.assets.tracks.gpx_stream import filter_track_points, iter_track_points
+from travel_log.assets.tracks.track import Track
+from travel_log.models.privacy_zone import PrivacyZone
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def track_path():
+    return path_on_sample_project('2021-05-07/hike2.gpx')
+
+
+@fixture
+def output_folder():
+    with TemporaryDirectory() as folder:
+        yield folder
+
+
+def gpxpy_points(path):
+    with open(path) as file:
+        data = gpxpy.parse(file)
+
+    return [
+        (point.latitude, point.longitude, point.elevation)
+        for track in data.tracks
+        for segment in track.segments
+        for point in segment.points
+    ]
+
+
+def test_track_is_parsed_once(track_path):
+    track = Track(track_path)
+
+    assert track.data is track.data
+
+
+def test_iter_track_points_matches_gpxpy(track_path):
+    points = [
+        (point.latitude, point.longitude, float(point.elevation))
+        for point in iter_track_points(track_path)
+    ]
+
+    assert points == gpxpy_points(track_path)
+
+
+def test_filter_keeps_everything_else(track_path, output_folder):
+    output_path = os.path.join(output_folder, 'filtered.gpx')
+
+    all_points = gpxpy_points(track_path)
+    median_latitude = numpy.median([latitude for latitude, _, _ in all_points])
+
+    # Removes the northern half of the points, in small batches to exercise the flushes
+    removed = filter_track_points(
+        track_path,
+        output_path,
+        lambda latitudes, longitudes: latitudes > median_latitude,
+        batch_size=7,
+    )
+
+    expected_points = [point for point in all_points if point[0] <= median_latitude]
+
+    assert removed == len(all_points) - len(expected_points)
+    assert gpxpy_points(output_path) == expected_points
+
+    with open(track_path) as original, open(output_path) as filtered:
+        original_data, filtered_data = gpxpy.parse(original), gpxpy.parse(filtered)
+
+    assert filtered_data.name == original_data.name
+    assert filtered_data.tracks[0].name == original_data.tracks[0].name
+    assert filtered_data.tracks[0].description == original_data.tracks[0].description
+
+
+def test_streaming_privacy_filter_matches_gpxpy(track_path, output_folder):
+    privacy_zone = PrivacyZone('Ristafallet waterfall', 63.3123834, 13.3511221, 3)
+    output_path = os.path.join(output_folder, 'hike2.gpx')
+
+    applied = PrivacyZone.apply_many_on_track_file([privacy_zone], track_path, output_path)
+    expected = privacy_zone.process_track(Track(track_path))
+
+    assert applied
+    assert gpxpy_points(output_path) == [
+        (point.latitude, point.longitude, point.elevation)
+        for track in expected.data.tracks
+        for segment in track.segments
+        for point in segment.points
+    ]
+
+
+def test_file_is_copied_as_is_if_no_point_is_removed(track_path, output_folder):
+    privacy_zone = PrivacyZone('Far away', 0, 0, 1)
+    output_path = os.path.join(output_folder, 'hike2.gpx')
+
+    applied = PrivacyZone.apply_many_on_track_file([privacy_zone], track_path, output_path)
+
+    assert not applied
+
+    with open(track_path, 'rb') as original, open(output_path, 'rb') as copy:
+        assert original.read() == copy.read()
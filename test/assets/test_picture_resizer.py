@@ -0,0 +1,99 @@
+import os
+
+from PIL import Image
+from pytest import raises
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import PictureResizer, Rendition
+from travel_log.assets.pictures.rendition_cache import RenditionCache
+
+from test.conftest import path_on_sample_project
+
+
+def test_all_renditions_are_generated_from_one_call(tmp_path):
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+    renditions = {
+        Rendition('small', (100, 100)): str(tmp_path / 'small.jpeg'),
+        Rendition('medium', (400, 400)): str(tmp_path / 'medium.jpeg'),
+        Rendition('large', (800, 800), quality=90): str(tmp_path / 'large.jpeg'),
+    }
+
+    PictureResizer.generate_renditions(picture, renditions)
+
+    for rendition, output_path in renditions.items():
+        with Image.open(output_path) as image:
+            assert max(image.size) == rendition.size[0]
+            assert image.info.get('exif')
+
+
+def test_renditions_are_replaced_atomically(tmp_path, monkeypatch):
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+    rendition = Rendition('small', (100, 100))
+    output_path = tmp_path / 'small.jpeg'
+    output_path.write_bytes(b'previous')
+    # Eg: an output of a previous build, linked to the rendition
+    os.link(output_path, tmp_path / 'linked.jpeg')
+
+    def interrupted_save(image, path, **kwargs):
+        with open(path, 'wb') as file:
+            file.write(b'half')
+
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(Image.Image, 'save', interrupted_save)
+
+    with raises(KeyboardInterrupt):
+        PictureResizer.generate_renditions(picture, {rendition: str(output_path)})
+
+    assert output_path.read_bytes() == b'previous'
+
+    monkeypatch.undo()
+    PictureResizer.generate_renditions(picture, {rendition: str(output_path)})
+
+    assert (tmp_path / 'linked.jpeg').read_bytes() == b'previous'
+    assert output_path.read_bytes() != b'previous'
+    assert sorted(os.listdir(tmp_path)) == ['linked.jpeg', 'small.jpeg']
+
+
+def test_cached_renditions_are_reused(tmp_path):
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+    rendition = Rendition('small', (100, 100))
+    cache = RenditionCache(str(tmp_path / 'cache'))
+
+    PictureResizer.generate_renditions(
+        picture, {rendition: str(tmp_path / 'first.jpeg')}, cache=cache
+    )
+    PictureResizer.generate_renditions(
+        picture, {rendition: str(tmp_path / 'second.jpeg')}, cache=cache
+    )
+
+    assert (tmp_path / 'first.jpeg').read_bytes() == (tmp_path / 'second.jpeg').read_bytes()
+    assert cache.rendition_count == 1
+
+
+def test_webp_renditions(tmp_path):
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+    rendition = Rendition('small', (100, 100), image_format='WEBP')
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    output_path = str(tmp_path / rendition.output_filename(picture.filename))
+
+    PictureResizer.generate_renditions(picture, {rendition: output_path}, cache=cache)
+
+    with Image.open(output_path) as image:
+        assert image.format == 'WEBP'
+        assert image.size == rendition.output_size(picture.dimensions)
+
+    assert output_path.endswith('day5-p1.jpeg.webp')
+    assert cache.path_for(cache.source_digest(picture.path), rendition.cache_key()).endswith(
+        '-webp.webp'
+    )
+
+
+def test_output_size():
+    rendition = Rendition('small', (100, 100))
+
+    assert rendition.output_size((1024, 576)) == (100, 56)
+    assert rendition.output_size((576, 1024)) == (56, 100)
+    # Never enlarged
+    assert rendition.output_size((50, 20)) == (50, 20)
+    # Unknown dimensions
+    assert rendition.output_size((0, 0)) == (100, 100)
@@ -0,0 +1,132 @@
+import os
+import shutil
+
+from pytest import fixture
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import PictureResizer, Rendition
+from travel_log.assets.pictures.rendition_cache import (
+    EXIF_POLICY_KEEP,
+    EXIF_POLICY_STRIP_GPS,
+    RenditionCache,
+)
+
+from test.conftest import path_on_sample_project
+
+SMALL = Rendition('small', (100, 100))
+MEDIUM = Rendition('medium', (300, 300))
+
+
+@fixture
+def picture_path(tmp_path):
+    path = tmp_path / 'trip' / 'picture.jpeg'
+    os.makedirs(path.parent)
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p1.jpeg'), path)
+
+    return str(path)
+
+
+def generate(cache, picture_path, output_path, rendition=SMALL):
+    PictureResizer.generate_renditions(
+        Picture(picture_path), {rendition: str(output_path)}, cache=cache
+    )
+
+
+def test_cache_survives_moving_the_original(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    generate(cache, picture_path, tmp_path / 'output.jpeg')
+
+    moved_path = str(tmp_path / 'moved.jpeg')
+    shutil.move(picture_path, moved_path)
+
+    reloaded_cache = RenditionCache(cache.folder)
+    generate(reloaded_cache, moved_path, tmp_path / 'output.jpeg')
+
+    assert reloaded_cache.rendition_count == 1
+    assert os.listdir(os.path.join(cache.folder)) == [reloaded_cache.sources[moved_path][2][:2]]
+
+
+def test_editing_the_original_invalidates_the_cache(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    generate(cache, picture_path, tmp_path / 'output.jpeg')
+
+    shutil.copy(path_on_sample_project('2021-05-07/day5-p2.jpeg'), picture_path)
+    generate(cache, picture_path, tmp_path / 'output.jpeg')
+
+    assert len(cache.renditions) == 2
+
+
+def test_index_is_persisted(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    generate(cache, picture_path, tmp_path / 'output.jpeg')
+    cache.save()
+
+    reloaded_cache = RenditionCache.load(cache.folder)
+
+    assert reloaded_cache.sources == cache.sources
+    assert reloaded_cache.renditions == cache.renditions
+
+
+def test_least_recently_used_renditions_are_evicted(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    generate(cache, picture_path, tmp_path / 'medium.jpeg', MEDIUM)
+    generate(cache, picture_path, tmp_path / 'small.jpeg', SMALL)
+
+    digest = cache.sources[picture_path][2]
+    small_size = cache.renditions[digest][SMALL.cache_key()][0]
+
+    removed, _ = cache.evict(small_size)
+
+    assert removed == 1
+    assert list(cache.renditions[digest]) == [SMALL.cache_key()]
+    assert not os.path.exists(cache.path_for(digest, MEDIUM.cache_key()))
+
+
+def test_prune_removes_untracked_files(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    generate(cache, picture_path, tmp_path / 'output.jpeg')
+
+    os.makedirs(tmp_path / 'cache' / 'legacy')
+    (tmp_path / 'cache' / 'legacy' / 'picture.jpeg').write_bytes(b'old')
+
+    removed, freed = cache.prune()
+
+    assert (removed, freed) == (1, 3)
+    assert cache.rendition_count == 1
+
+
+def test_exif_policies_are_cached_separately(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+
+    for exif_policy in (EXIF_POLICY_KEEP, EXIF_POLICY_STRIP_GPS, EXIF_POLICY_KEEP):
+        output_path = str(tmp_path / f'{exif_policy}.jpeg')
+        PictureResizer.generate_renditions(
+            Picture(picture_path), {SMALL: output_path}, cache=cache, exif_policy=exif_policy
+        )
+
+    assert cache.rendition_count == 2
+    assert Picture(str(tmp_path / f'{EXIF_POLICY_KEEP}.jpeg')).coordinates
+    assert not Picture(str(tmp_path / f'{EXIF_POLICY_STRIP_GPS}.jpeg')).coordinates
+
+
+def test_outputs_linked_to_the_cache_are_never_written_through(tmp_path, picture_path):
+    cache = RenditionCache(str(tmp_path / 'cache'))
+    output_path = str(tmp_path / 'output.jpeg')
+    PictureResizer.generate_renditions(
+        Picture(picture_path), {SMALL: output_path}, cache=cache, link_strategy='hardlink'
+    )
+
+    digest = cache.source_digest(picture_path)
+    cached_path = cache.path_for(digest, SMALL.cache_key())
+    assert os.path.samefile(cached_path, output_path)
+
+    # Edited in place (eg: by the previous privacy zones implementation)
+    output = Picture(output_path)
+    output.is_read_only = False
+    output.remove_exif_coordinates()
+
+    # Generated again without the cache, on the same path
+    PictureResizer.generate_renditions(Picture(picture_path), {MEDIUM: output_path})
+
+    assert not os.path.samefile(cached_path, output_path)
+    assert Picture(cached_path).coordinates
+    assert os.stat(cached_path).st_nlink == 1
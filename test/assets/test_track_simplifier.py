@@ -0,0 +1,55 @@
+import numpy
+from travel_log.assets.tracks.track import Track
+from travel_log.assets.tracks.track_arrays import SegmentArrays
+from travel_log.assets.tracks.track_simplifier import (
+    douglas_peucker_mask,
+    project_to_meters,
+    simplify_segment,
+)
+
+from test.conftest import path_on_sample_project
+
+
+def distances_to_polyline(x, y, line_x, line_y):
+    distances = numpy.full(len(x), numpy.inf)
+
+    for index in range(len(line_x) - 1):
+        chord_x, chord_y = line_x[index + 1] - line_x[index], line_y[index + 1] - line_y[index]
+        points_x, points_y = x - line_x[index], y - line_y[index]
+        t = numpy.clip(
+            (points_x * chord_x + points_y * chord_y) / (chord_x**2 + chord_y**2 or 1), 0, 1
+        )
+        distances = numpy.minimum(
+            distances, numpy.hypot(points_x - t * chord_x, points_y - t * chord_y)
+        )
+
+    return distances
+
+
+def test_straight_line_is_reduced_to_its_ends():
+    x = numpy.linspace(0, 1000, 101)
+    y = x * 0.5
+
+    keep = douglas_peucker_mask(x, y, tolerance=0.1)
+
+    assert keep.tolist() == [True] + [False] * 99 + [True]
+
+
+def test_simplified_track_stays_within_tolerance():
+    segment = Track(path_on_sample_project('2021-05-03/car.gpx')).segments[0]
+    x, y = project_to_meters(segment.latitudes, segment.longitudes)
+
+    keep = douglas_peucker_mask(x, y, tolerance=50)
+
+    assert 2 <= keep.sum() < len(segment)
+    assert keep[0] and keep[-1]
+    assert distances_to_polyline(x, y, x[keep], y[keep]).max() <= 50
+    assert len(simplify_segment(segment, tolerance=50)) == keep.sum()
+
+
+def test_short_segments_are_not_simplified():
+    segment = SegmentArrays(
+        numpy.array([1.0, 2.0]), numpy.array([1.0, 2.0]), numpy.zeros(2), numpy.zeros(2)
+    )
+
+    assert simplify_segment(segment, tolerance=1000) is segment
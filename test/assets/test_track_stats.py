@@ -0,0 +1,69 @@
+import numpy
+from pytest import approx, fixture
+from travel_log.assets.tracks.track import Track
+from travel_log.assets.tracks.track_arrays import SegmentArrays
+from travel_log.assets.tracks.track_stats import TrackStats
+from travel_log.models.trip_day import TripDay
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def track():
+    return Track(path_on_sample_project('2021-05-03/hike1.gpx'))
+
+
+def test_segments_have_one_row_per_point(track):
+    gpxpy_segments = [segment for gpx_track in track.data.tracks for segment in gpx_track.segments]
+
+    assert [len(segment) for segment in track.segments] == [
+        len(segment.points) for segment in gpxpy_segments
+    ]
+    assert track.segments[0].latitudes[0] == gpxpy_segments[0].points[0].latitude
+    assert track.segments[0].times[0] == gpxpy_segments[0].points[0].time.timestamp()
+
+
+def test_stats_match_gpxpy(track):
+    uphill, downhill = track.data.get_uphill_downhill()
+    bounds = track.data.get_bounds()
+
+    assert track.stats.points_count == track.data.get_points_no()
+    assert track.stats.distance == approx(track.data.length_2d() / 1000, rel=0.01)
+    assert track.stats.elevation_gain == approx(uphill)
+    assert track.stats.elevation_loss == approx(downhill)
+    assert track.stats.total_time == approx(track.data.get_duration())
+    assert track.stats.bounds.min_latitude == bounds.min_latitude
+    assert track.stats.bounds.max_longitude == bounds.max_longitude
+
+
+def test_moving_time_ignores_stops():
+    # 1 km north, a 10 minutes stop, then 1 km north again (each km in 6 minutes)
+    one_km_in_degrees = 1 / 111.195
+    segment = SegmentArrays(
+        latitudes=numpy.array([0, one_km_in_degrees, one_km_in_degrees, 2 * one_km_in_degrees]),
+        longitudes=numpy.zeros(4),
+        elevations=numpy.array([10, 20, 20, numpy.nan]),
+        times=numpy.array([0, 360, 960, 1320], dtype=float),
+    )
+
+    stats = TrackStats.of_segment(segment)
+
+    assert stats.distance == approx(2, rel=0.001)
+    assert stats.total_time == 1320
+    assert stats.moving_time == 720
+    assert stats.average_speed == approx(10, rel=0.001)
+    assert stats.max_speed == approx(10, rel=0.001)
+    assert stats.elevation_gain == approx(10)
+
+
+def test_stats_are_combined_per_day():
+    tracks = [
+        Track(path_on_sample_project('2021-05-03/hike1.gpx')),
+        Track(path_on_sample_project('2021-05-03/car.gpx')),
+    ]
+    trip_day = TripDay(date=None, tracks=tracks)
+
+    assert trip_day.stats.distance == approx(sum(track.stats.distance for track in tracks))
+    assert trip_day.stats.max_speed == max(track.stats.max_speed for track in tracks)
+    assert trip_day.stats.bounds == tracks[0].stats.bounds.union(tracks[1].stats.bounds)
+    assert TripDay(date=None).stats == TrackStats()
@@ -0,0 +1,62 @@
+from dataclasses import replace
+
+from travel_log.benchmarks.suite import (
+    BenchmarkResult,
+    find_regressions,
+    load_results,
+    run_suite,
+    save_results,
+)
+from travel_log.benchmarks.synthetic_trip import SyntheticTripParameters, generate_synthetic_trip
+
+PARAMETERS = SyntheticTripParameters(
+    days=2, pictures_per_day=1, points_per_track=100, picture_size=(64, 48)
+)
+
+RESULT = BenchmarkResult('build', 'pictures', 10, 2.0, 100 * 1024 * 1024, 10 * 1024 * 1024)
+
+
+def test_benchmarks_report_throughput_and_memory(tmp_path):
+    trip_folder = str(tmp_path / 'trip')
+    work_folder = tmp_path / 'work'
+    generate_synthetic_trip(trip_folder, PARAMETERS)
+
+    results = run_suite(
+        trip_folder,
+        str(work_folder),
+        ['parse', 'privacy_zones', 'render'],
+        repeat=1,
+        isolated=False,
+    )
+
+    assert [(result.name, result.items) for result in results] == [
+        # 1 picture and 1 track per day
+        ('parse', 4),
+        ('privacy_zones', 200),
+        # The summary and 2 days
+        ('render', 3),
+    ]
+    assert all(result.seconds > 0 and result.peak_traced > 0 for result in results)
+    assert not work_folder.exists()
+
+
+def test_results_can_be_saved_and_loaded(tmp_path):
+    path = str(tmp_path / 'results.json')
+    save_results(path, PARAMETERS, [RESULT])
+
+    details, results = load_results(path)
+
+    assert details['parameters'] == PARAMETERS
+    assert results == [RESULT]
+
+
+def test_slower_or_bigger_results_are_regressions():
+    assert find_regressions([replace(RESULT, seconds=2.1)], [RESULT]) == []
+    assert find_regressions([replace(RESULT, seconds=2.5)], [RESULT]) == [
+        'build: 4.0 pictures/s (was 5.0)'
+    ]
+    assert find_regressions([replace(RESULT, peak_traced=20 * 1024 * 1024)], [RESULT]) == [
+        'build: 20.0 MB allocated (was 10.0)'
+    ]
+    # Not on the baseline
+    assert find_regressions([replace(RESULT, name='parse', seconds=9.0)], [RESULT]) == []
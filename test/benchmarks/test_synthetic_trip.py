@@ -0,0 +1,52 @@
+from travel_log.benchmarks.synthetic_trip import SyntheticTripParameters, generate_synthetic_trip
+from travel_log.parsers.trip_parser import TripParser
+
+PARAMETERS = SyntheticTripParameters(
+    days=4,
+    pictures_per_day=2,
+    tracks_per_day=2,
+    points_per_track=50,
+    privacy_zones=3,
+    picture_size=(64, 48),
+)
+
+
+def test_generated_trip_can_be_parsed(tmp_path):
+    assert generate_synthetic_trip(str(tmp_path), PARAMETERS)
+
+    trip = TripParser.parse_folder(str(tmp_path))
+
+    assert len(trip.trip_days) == 4
+    assert len(trip.privacy_zones) == 3
+    # Every 3 days
+    assert len(trip.highlights) == 2
+
+    for trip_day in trip.trip_days:
+        assert len(trip_day.pictures) == 2
+        assert len(trip_day.tracks) == 2
+        assert all(picture.gps for picture in trip_day.pictures)
+        assert all(track.data.get_points_no() == 50 for track in trip_day.tracks)
+
+
+def test_generated_trip_is_reproducible(tmp_path):
+    def contents(folder):
+        return {
+            path.relative_to(folder): path.read_bytes()
+            for path in sorted(folder.rglob('*'))
+            if path.is_file()
+        }
+
+    generate_synthetic_trip(str(tmp_path / 'first'), PARAMETERS)
+    generate_synthetic_trip(str(tmp_path / 'second'), PARAMETERS)
+
+    assert contents(tmp_path / 'first') == contents(tmp_path / 'second')
+
+
+def test_trip_is_generated_again_only_when_the_parameters_change(tmp_path):
+    assert generate_synthetic_trip(str(tmp_path), PARAMETERS)
+    assert not generate_synthetic_trip(str(tmp_path), PARAMETERS)
+
+    other_parameters = SyntheticTripParameters(days=1, pictures_per_day=1, picture_size=(64, 48))
+
+    assert generate_synthetic_trip(str(tmp_path), other_parameters)
+    assert len(TripParser.parse_folder(str(tmp_path)).trip_days) == 1
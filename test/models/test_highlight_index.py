@@ -0,0 +1,56 @@
+import datetime
+import random
+
+from travel_log.models.highlight import Highlight
+from travel_log.models.highlight_index import HighlightIndex
+from travel_log.models.trip import Trip
+
+START = datetime.date(2021, 5, 1)
+
+
+def day(offset):
+    return START + datetime.timedelta(days=offset)
+
+
+def test_multiple_day_highlights_are_found_on_every_day():
+    hike = Highlight('Hike', day(2), to_date=day(4))
+    waterfall = Highlight('Waterfall', day(3))
+    trip = Trip('Trip', [], highlights=[waterfall, hike])
+
+    assert trip.highlights_on_date(day(1)) == []
+    assert trip.highlights_on_date(day(2)) == [hike]
+    assert trip.highlights_on_date(day(3)) == [hike, waterfall]
+    assert trip.highlights_on_date(day(4)) == [hike]
+    assert trip.highlights_between(day(0), day(2)) == [hike]
+    assert trip.highlights_between(day(4), day(9)) == [hike]
+
+
+def test_same_results_as_checking_every_highlight():
+    generator = random.Random(42)
+    highlights = []
+
+    for index in range(300):
+        from_date = day(generator.randrange(100))
+        to_date = from_date + datetime.timedelta(days=generator.choice([0, 0, 1, 5, 30]))
+        highlights.append(Highlight(str(index), from_date, to_date=to_date))
+
+    index = HighlightIndex(highlights)
+
+    for _ in range(200):
+        from_date = day(generator.randrange(-10, 140))
+        to_date = from_date + datetime.timedelta(days=generator.randrange(5))
+
+        expected = sorted(
+            (
+                highlight
+                for highlight in highlights
+                if highlight.from_date <= to_date and highlight.to_date >= from_date
+            ),
+            key=lambda highlight: highlight.from_date,
+        )
+
+        assert index.overlapping(from_date, to_date) == expected
+
+
+def test_empty_index():
+    assert HighlightIndex([]).on_date(START) == []
@@ -1,7 +1,11 @@
 import shutil
 from tempfile import NamedTemporaryFile
 
+import geopy.distance
+import numpy
 from pytest import fixture
+from travel_log.assets.tracks.track import Track
+from travel_log.models.coordinates import Coordinates
 from travel_log.models.privacy_zone import PrivacyZone
 
 from test.conftest import path_on_sample_project
@@ -95,3 +99,56 @@ class TestPrivacyFilterOnTrack:
         )
 
         assert not applied
+
+
+class TestVectorizedPrivacyFilter:
+    def test_same_results_as_geodesic_around_the_border(self, privacy_zone_ristafallet):
+        random = numpy.random.default_rng(42)
+
+        # Points between 0.9x and 1.1x the radius away, in every direction
+        distances = random.uniform(0.9, 1.1, 5000) * privacy_zone_ristafallet.radius
+        bearings = random.uniform(0, 360, 5000)
+        points = [
+            geopy.distance.geodesic(kilometers=distance).destination(
+                (privacy_zone_ristafallet.lat, privacy_zone_ristafallet.lng), bearing
+            )
+            for distance, bearing in zip(distances, bearings)
+        ]
+
+        latitudes = numpy.array([point.latitude for point in points])
+        longitudes = numpy.array([point.longitude for point in points])
+
+        expected = [
+            privacy_zone_ristafallet._is_point_inside(
+                Coordinates(latitude=latitude, longitude=longitude)
+            )
+            for latitude, longitude in zip(latitudes, longitudes)
+        ]
+
+        mask = privacy_zone_ristafallet.points_inside_mask(latitudes, longitudes)
+
+        assert mask.tolist() == expected
+        assert 0 < mask.sum() < len(mask)
+
+    def test_same_points_removed_as_geodesic(self, privacy_zone_ristafallet):
+        track = Track(path_on_sample_project('2021-05-07/hike2.gpx'))
+
+        expected_points = [
+            (point.latitude, point.longitude)
+            for gpx_track in track.data.tracks
+            for segment in gpx_track.segments
+            for point in segment.points
+            if not privacy_zone_ristafallet._is_point_inside(
+                Coordinates(latitude=point.latitude, longitude=point.longitude)
+            )
+        ]
+
+        processed = privacy_zone_ristafallet.process_track(track)
+
+        assert processed.is_dirty
+        assert [
+            (point.latitude, point.longitude)
+            for gpx_track in processed._data.tracks
+            for segment in gpx_track.segments
+            for point in segment.points
+        ] == expected_points
@@ -0,0 +1,80 @@
+import numpy
+from pytest import fixture
+from travel_log.models.coordinates import Coordinates
+from travel_log.models.privacy_zone import PrivacyZone
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
+
+
+@fixture
+def privacy_zones():
+    random = numpy.random.default_rng(7)
+
+    zones = [
+        PrivacyZone(name=f'zone {index}', lat=lat, lng=lng, radius=radius)
+        for index, (lat, lng, radius) in enumerate(
+            zip(
+                random.uniform(62, 64, 300),
+                random.uniform(12, 15, 300),
+                random.uniform(0.2, 5, 300),
+            )
+        )
+    ]
+
+    # Crossing the antimeridian and around the north pole
+    zones.append(PrivacyZone(name='antimeridian', lat=-17.0, lng=179.99, radius=5))
+    zones.append(PrivacyZone(name='north pole', lat=89.99, lng=0, radius=5))
+
+    return zones
+
+
+@fixture
+def points():
+    random = numpy.random.default_rng(8)
+
+    latitudes = numpy.concatenate(
+        [random.uniform(62, 64, 3000), random.uniform(-17.05, -16.95, 200), [89.995, 89.999]]
+    )
+    longitudes = numpy.concatenate(
+        [random.uniform(12, 15, 3000), random.uniform(-180, 180, 200) % 0.1 + 179.95, [120, -45]]
+    )
+    longitudes = (longitudes + 180) % 360 - 180
+
+    return latitudes, longitudes
+
+
+def test_mask_is_the_same_as_checking_all_zones(privacy_zones, points):
+    latitudes, longitudes = points
+
+    expected = numpy.zeros(len(latitudes), dtype=bool)
+    for privacy_zone in privacy_zones:
+        expected |= privacy_zone.points_inside_mask(latitudes, longitudes)
+
+    mask = PrivacyZoneIndex(privacy_zones).points_inside_mask(latitudes, longitudes)
+
+    assert mask.tolist() == expected.tolist()
+    assert mask[-2:].all()
+    assert mask[3000:3200].any()
+
+
+def test_zone_containing_is_the_same_as_checking_all_zones(privacy_zones, points):
+    index = PrivacyZoneIndex(privacy_zones)
+    latitudes, longitudes = points
+
+    # inside[zone, point] (the vectorized check being as exact as the geodesic one)
+    inside = numpy.array([zone.points_inside_mask(latitudes, longitudes) for zone in privacy_zones])
+
+    for point_index, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+        zone_indexes = numpy.flatnonzero(inside[:, point_index])
+        expected = privacy_zones[zone_indexes[0]] if len(zone_indexes) else None
+
+        coordinates = Coordinates(latitude=latitude, longitude=longitude)
+
+        assert index.zone_containing(coordinates) == expected
+
+
+def test_only_nearby_zones_are_candidates(privacy_zones):
+    index = PrivacyZoneIndex(privacy_zones)
+
+    candidates = index.candidates(Coordinates(latitude=63.0, longitude=13.5))
+
+    assert 0 < len(candidates) < len(privacy_zones) / 5
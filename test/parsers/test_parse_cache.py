@@ -0,0 +1,81 @@
+import os
+import shutil
+
+from pytest import fixture
+from travel_log.parsers.parse_cache import ParseCache
+from travel_log.parsers.trip_parser import TripParser
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def trip_folder(tmp_path):
+    folder = tmp_path / 'trip'
+    shutil.copytree(path_on_sample_project(''), folder)
+
+    return str(folder)
+
+
+@fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'parse_cache.pickle')
+
+
+def parse(trip_folder, cache_path):
+    cache = ParseCache.load(cache_path)
+    trip = TripParser.parse_folder(trip_folder, cache)
+    cache.save()
+
+    return trip, cache
+
+
+def all_coordinates(trip):
+    return [picture.coordinates for day in trip.trip_days for picture in day.pictures]
+
+
+def test_unchanged_trip_is_loaded_from_the_cache(trip_folder, cache_path):
+    trip, cache = parse(trip_folder, cache_path)
+    cached_trip, cached = parse(trip_folder, cache_path)
+
+    assert cache.hits == 0
+    assert cached.misses == 0
+    assert cached.hits == cache.misses
+    assert cached_trip == trip
+    assert all_coordinates(cached_trip) == all_coordinates(trip)
+    assert cached_trip.trip_days[0].metadata == trip.trip_days[0].metadata
+
+
+def test_only_changed_files_are_read_again(trip_folder, cache_path):
+    parse(trip_folder, cache_path)
+
+    day_yaml_path = os.path.join(trip_folder, '2021-05-03', 'day.yaml')
+
+    with open(day_yaml_path, 'a') as file:
+        file.write('\nextra: value\n')
+
+    trip, cache = parse(trip_folder, cache_path)
+
+    assert cache.misses == 1
+    assert trip.trip_days[0].metadata['extra'] == 'value'
+
+
+def test_removed_files_are_forgotten(trip_folder, cache_path):
+    parse(trip_folder, cache_path)
+
+    picture_path = os.path.join(trip_folder, '2021-05-03', 'day1-p1.jpg')
+    os.remove(picture_path)
+
+    trip, cache = parse(trip_folder, cache_path)
+
+    # Day folders are always listed (by the AssetScanner), and nothing else changed
+    assert cache.misses == 0
+    assert (picture_path, 'gps') not in ParseCache.load(cache_path).entries
+
+
+def test_without_path_nothing_is_saved(trip_folder, tmp_path):
+    cache = ParseCache()
+    TripParser.parse_folder(trip_folder, cache)
+    cache.save()
+
+    assert cache.hits == 0
+    assert sorted(os.listdir(tmp_path)) == ['trip']
@@ -0,0 +1,131 @@
+import datetime
+import os
+import shutil
+
+from pytest import fixture, raises
+from travel_log.parsers.trip_parser import TripParser, TripParsingError
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def trip_folder(tmp_path):
+    folder = tmp_path / 'trip'
+    shutil.copytree(path_on_sample_project(''), folder)
+
+    return str(folder)
+
+
+def summary(trip):
+    return (
+        [(day.date, [picture.filename for picture in day.pictures]) for day in trip.trip_days],
+        [(highlight.from_date, highlight.name) for highlight in trip.highlights],
+    )
+
+
+def test_parallel_parsing_gives_the_same_trip(trip_folder):
+    sequential = TripParser.parse_folder(trip_folder, max_workers=1)
+    parallel = TripParser.parse_folder(trip_folder, max_workers=4)
+
+    assert summary(parallel) == summary(sequential)
+    assert [day.date for day in parallel.trip_days] == sorted(
+        day.date for day in parallel.trip_days
+    )
+
+
+def test_errors_are_reported_per_folder(trip_folder):
+    os.mkdir(os.path.join(trip_folder, 'not-a-date'))
+    os.mkdir(os.path.join(trip_folder, 'neither'))
+
+    with raises(TripParsingError) as error:
+        TripParser.parse_folder(trip_folder, max_workers=4)
+
+    assert sorted(os.path.basename(folder) for folder in error.value.errors) == [
+        'neither',
+        'not-a-date',
+    ]
+    assert all(isinstance(e, ValueError) for e in error.value.errors.values())
+
+
+def test_update_parses_again_only_the_days_affected(trip_folder):
+    trip = TripParser.parse_folder(trip_folder)
+    unchanged_day, changed_day = trip.trip_days[0], trip.trip_days[1]
+
+    removed_picture = changed_day.pictures[0].path
+    os.remove(removed_picture)
+    new_day_folder = os.path.join(trip_folder, '2021-05-08')
+    shutil.copytree(os.path.join(trip_folder, '2021-05-07'), new_day_folder)
+
+    updated = TripParser.update(
+        trip,
+        trip_folder,
+        [removed_picture, new_day_folder, os.path.join(trip_folder, 'README.md')],
+    )
+
+    assert updated.trip_days[0] is unchanged_day
+    assert updated.trip_days[1] is not changed_day
+    assert len(updated.trip_days[1].pictures) == len(changed_day.pictures) - 1
+    assert [day.date_iso for day in updated.trip_days][-1] == '2021-05-08'
+
+    shutil.rmtree(new_day_folder)
+    updated = TripParser.update(updated, trip_folder, [new_day_folder])
+
+    assert summary(updated) == summary(TripParser.parse_folder(trip_folder))
+
+
+def test_update_of_the_trip_folder_parses_everything_again(trip_folder):
+    trip = TripParser.parse_folder(trip_folder)
+    # Not reported (eg: the watcher lost the event)
+    os.remove(trip.trip_days[1].pictures[0].path)
+
+    updated = TripParser.update(trip, trip_folder, [trip_folder])
+
+    assert len(updated.trip_days[1].pictures) == len(trip.trip_days[1].pictures) - 1
+    assert summary(updated) == summary(TripParser.parse_folder(trip_folder))
+
+
+def test_multiple_day_highlights(trip_folder):
+    with open(os.path.join(trip_folder, '2021-05-04', 'day.yaml'), 'a') as file:
+        file.write("\n  - name: Road trip\n    summary: Two days\n    to_date: '2021-05-05'\n")
+
+    trip = TripParser.parse_folder(trip_folder)
+    road_trip = next(highlight for highlight in trip.highlights if highlight.name == 'Road trip')
+
+    assert road_trip.to_date == datetime.date(2021, 5, 5)
+    assert road_trip in trip.highlights_on_date(datetime.date(2021, 5, 5))
+
+
+def test_streaming_gives_the_same_days_one_at_a_time(trip_folder):
+    trip = TripParser.parse_folder(trip_folder)
+    trip_stream = TripParser.stream_folder(trip_folder)
+
+    assert trip_stream.title == trip.title
+    assert trip_stream.dates == [day.date for day in trip.trip_days]
+    # Highlights are collected as the days are parsed
+    assert trip_stream.highlights == []
+
+    trip_days = list(trip_stream.trip_days)
+
+    assert summary(trip_stream.trip(trip_days)) == summary(trip)
+
+
+def test_streaming_errors_are_raised_before_or_on_the_day(trip_folder):
+    os.mkdir(os.path.join(trip_folder, 'not-a-date'))
+
+    with raises(TripParsingError) as error:
+        TripParser.stream_folder(trip_folder)
+
+    assert [os.path.basename(folder) for folder in error.value.errors] == ['not-a-date']
+
+    os.rmdir(os.path.join(trip_folder, 'not-a-date'))
+    with open(os.path.join(trip_folder, '2021-05-05', 'day.yaml'), 'a') as file:
+        file.write('\nhighlights: [not valid')
+
+    trip_days = TripParser.stream_folder(trip_folder).trip_days
+
+    assert next(trip_days).date_iso == '2021-05-03'
+
+    with raises(TripParsingError) as error:
+        list(trip_days)
+
+    assert [os.path.basename(folder) for folder in error.value.errors] == ['2021-05-05']
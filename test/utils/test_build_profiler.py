@@ -0,0 +1,84 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from travel_log.utils.build_profiler import BuildProfiler
+
+
+def test_stages_assets_and_counters_are_reported(tmp_path):
+    profiler = BuildProfiler()
+    output = tmp_path / 'index.html'
+    output.write_text('x' * 100)
+
+    with profiler.stage('render'):
+        for page in ('index.html', 'day.html'):
+            with profiler.asset('render', page):
+                time.sleep(0.01)
+
+        profiler.count_file('render', str(output))
+        profiler.count('render', 'unchanged')
+
+    with profiler.stage('render'):
+        pass
+
+    profiler.save_report(str(tmp_path / 'report.json'))
+    stage = json.loads((tmp_path / 'report.json').read_text())['stages']['render']
+
+    assert stage['calls'] == 2
+    assert stage['wall_time'] >= 0.02
+    assert stage['counters'] == {'bytes': 100, 'files': 1, 'unchanged': 1}
+    assert list(stage['assets']) == ['index.html', 'day.html']
+    assert stage['assets']['day.html']['wall_time'] >= 0.01
+    # Sleeping does not use the CPU
+    assert stage['assets']['day.html']['cpu_time'] < stage['assets']['day.html']['wall_time']
+
+
+def test_assets_can_be_recorded_from_threads_and_other_processes(tmp_path):
+    profiler = BuildProfiler()
+
+    def render(page):
+        with profiler.asset('render', page):
+            profiler.count('render', 'pages')
+
+    with profiler.stage('render'):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(render, [f'{day}.html' for day in range(20)]))
+
+    # Measured by a worker process
+    profiler.record_asset(
+        'pictures', 'day1/p1.jpg', started_at=time.time(), wall_time=0.5, cpu_time=0.4, pid=1
+    )
+
+    report = profiler.report()
+
+    assert report['stages']['render']['counters'] == {'pages': 20}
+    assert len(report['stages']['render']['assets']) == 20
+    assert report['stages']['pictures']['assets']['day1/p1.jpg'] == {
+        'wall_time': 0.5,
+        'cpu_time': 0.4,
+        'calls': 1,
+    }
+
+    profiler.save_trace(str(tmp_path / 'trace.json'))
+    trace = json.loads((tmp_path / 'trace.json').read_text())
+    events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    processes = {
+        event['pid']: event['args']['name'] for event in trace['traceEvents'] if event['ph'] == 'M'
+    }
+
+    assert len(events) == 22
+    assert [event['ts'] for event in events] == sorted(event['ts'] for event in events)
+    assert processes == {os.getpid(): 'build', 1: 'worker 1'}
+    assert [event for event in events if event['pid'] == 1][0]['dur'] == 500000
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = BuildProfiler(enabled=False)
+
+    with profiler.stage('render'), profiler.asset('render', 'index.html'):
+        profiler.count('render', 'pages')
+        profiler.count_file('render', str(tmp_path / 'missing.html'))
+
+    assert profiler.report()['stages'] == {}
+    assert profiler.trace_events == []
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from travel_log.utils.file_links import (
+    LINK_STRATEGY_COPY,
+    LINK_STRATEGY_HARDLINK,
+    LINK_STRATEGY_REFLINK,
+    break_hardlink,
+    link_file,
+)
+
+
+@pytest.fixture
+def source_path(tmp_path):
+    path = tmp_path / 'source.txt'
+    path.write_text('original')
+
+    return str(path)
+
+
+def test_copy(tmp_path, source_path):
+    destination_path = str(tmp_path / 'destination.txt')
+
+    assert link_file(source_path, destination_path, LINK_STRATEGY_COPY) == LINK_STRATEGY_COPY
+    assert not os.path.samefile(source_path, destination_path)
+    assert open(destination_path).read() == 'original'
+
+
+def test_hardlink(tmp_path, source_path):
+    destination_path = str(tmp_path / 'destination.txt')
+
+    assert (
+        link_file(source_path, destination_path, LINK_STRATEGY_HARDLINK) == LINK_STRATEGY_HARDLINK
+    )
+    assert os.path.samefile(source_path, destination_path)
+
+
+def test_reflink_is_an_independent_file(tmp_path, source_path):
+    destination_path = str(tmp_path / 'destination.txt')
+
+    # Falls back to a copy if the file system has no reflinks (eg: tmpfs, ext4)
+    assert link_file(source_path, destination_path, LINK_STRATEGY_REFLINK) in (
+        LINK_STRATEGY_REFLINK,
+        LINK_STRATEGY_COPY,
+    )
+
+    with open(destination_path, 'a') as file:
+        file.write(' modified')
+
+    assert open(source_path).read() == 'original'
+
+
+def test_existing_destination_is_replaced_and_not_written_through(tmp_path, source_path):
+    destination_path = str(tmp_path / 'destination.txt')
+    link_file(source_path, destination_path, LINK_STRATEGY_HARDLINK)
+
+    other_path = tmp_path / 'other.txt'
+    other_path.write_text('other')
+    link_file(str(other_path), destination_path, LINK_STRATEGY_COPY)
+
+    assert open(destination_path).read() == 'other'
+    assert open(source_path).read() == 'original'
+
+
+def test_missing_source_keeps_the_destination(tmp_path):
+    destination_path = tmp_path / 'destination.txt'
+    destination_path.write_text('previous')
+
+    with pytest.raises(FileNotFoundError):
+        link_file(str(tmp_path / 'missing.txt'), str(destination_path))
+
+    assert destination_path.read_text() == 'previous'
+
+
+def test_unknown_strategy(tmp_path, source_path):
+    with pytest.raises(RuntimeError):
+        link_file(source_path, str(tmp_path / 'destination.txt'), 'symlink')
+
+
+def test_break_hardlink(tmp_path, source_path):
+    destination_path = str(tmp_path / 'destination.txt')
+    link_file(source_path, destination_path, LINK_STRATEGY_HARDLINK)
+
+    assert break_hardlink(destination_path)
+    assert not break_hardlink(destination_path)
+
+    with open(destination_path, 'w') as file:
+        file.write('modified')
+
+    assert open(source_path).read() == 'original'
@@ -0,0 +1,76 @@
+import sys
+
+from pytest import fixture, mark
+from travel_log.utils.file_watcher import InotifyWatcher, PollingWatcher
+
+WATCHERS = [PollingWatcher]
+
+if sys.platform.startswith('linux'):
+    WATCHERS.append(InotifyWatcher)
+
+
+@fixture(params=WATCHERS)
+def watcher_class(request):
+    return request.param
+
+
+@fixture
+def folder(tmp_path):
+    (tmp_path / 'day').mkdir()
+    (tmp_path / 'day' / 'a.jpg').write_bytes(b'a')
+
+    return tmp_path
+
+
+def wait_for_changes(watcher):
+    changed = set()
+
+    # Polling compares with the previous snapshot, changes of the same size and mtime (fast
+    # filesystems) might need another round
+    for _ in range(5):
+        changed |= watcher.wait_for_changes(timeout=0.5)
+
+        if changed:
+            break
+
+    return changed
+
+
+def test_modified_created_and_deleted_files(watcher_class, folder):
+    watcher = watcher_class([str(folder)])
+
+    (folder / 'day' / 'a.jpg').write_bytes(b'modified')
+    (folder / 'day' / 'b.jpg').write_bytes(b'b')
+
+    assert {str(folder / 'day' / 'a.jpg'), str(folder / 'day' / 'b.jpg')} <= wait_for_changes(
+        watcher
+    )
+
+    (folder / 'day' / 'b.jpg').unlink()
+
+    assert str(folder / 'day' / 'b.jpg') in wait_for_changes(watcher)
+    watcher.close()
+
+
+def test_new_folders_are_watched(watcher_class, folder):
+    watcher = watcher_class([str(folder)])
+
+    (folder / 'new_day').mkdir()
+    (folder / 'new_day' / 'c.jpg').write_bytes(b'c')
+    wait_for_changes(watcher)
+
+    (folder / 'new_day' / 'c.jpg').write_bytes(b'changed')
+
+    assert str(folder / 'new_day' / 'c.jpg') in wait_for_changes(watcher)
+    watcher.close()
+
+
+@mark.parametrize('name', ['.DS_Store', '.hidden/a.jpg'])
+def test_hidden_files_are_ignored(watcher_class, folder, name):
+    (folder / '.hidden').mkdir()
+    watcher = watcher_class([str(folder)])
+
+    (folder / name).write_bytes(b'x')
+
+    assert watcher.wait_for_changes(timeout=0.3) == set()
+    watcher.close()
@@ -0,0 +1,27 @@
+import json
+import logging
+
+from travel_log.utils.logging_utils import JsonFormatter
+
+
+def test_json_logs_include_the_extra_fields():
+    record = logging.makeLogRecord(
+        {
+            'name': 'travel_log.test',
+            'levelno': logging.INFO,
+            'levelname': 'INFO',
+            'msg': 'Generated %d renditions of %s',
+            'args': (3, 'p1.jpg'),
+            'picture': '/trip/p1.jpg',
+            'renditions': 3,
+        }
+    )
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['level'] == 'INFO'
+    assert entry['logger'] == 'travel_log.test'
+    assert entry['message'] == 'Generated 3 renditions of p1.jpg'
+    assert entry['picture'] == '/trip/p1.jpg'
+    assert entry['renditions'] == 3
+    assert 'args' not in entry
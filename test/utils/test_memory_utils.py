@@ -0,0 +1,18 @@
+from pytest import raises
+from travel_log.utils.memory_utils import MemoryCeiling, MemoryLimitExceeded, current_rss
+
+
+def test_nothing_is_enforced_without_a_limit():
+    ceiling = MemoryCeiling()
+    rss = ceiling.check('day 1')
+
+    assert rss > 0
+    assert ceiling.peak == rss
+    assert current_rss() > 0
+
+
+def test_limit_is_enforced():
+    ceiling = MemoryCeiling(limit=1024 * 1024)
+
+    with raises(MemoryLimitExceeded, match='after day 1'):
+        ceiling.check('day 1')
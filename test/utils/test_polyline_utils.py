@@ -0,0 +1,14 @@
+import numpy
+from travel_log.utils.polyline_utils import encode_polyline
+
+
+def test_encode_polyline():
+    # Example from https://developers.google.com/maps/documentation/utilities/polylinealgorithm
+    latitudes = numpy.array([38.5, 40.7, 43.252])
+    longitudes = numpy.array([-120.2, -120.95, -126.453])
+
+    assert encode_polyline(latitudes, longitudes) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+
+def test_encode_empty_polyline():
+    assert encode_polyline(numpy.array([]), numpy.array([])) == ''
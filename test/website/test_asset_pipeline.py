@@ -0,0 +1,111 @@
+import gzip
+import os
+
+from travel_log.website.asset_pipeline import (
+    build_static_assets,
+    minify_css,
+    minify_js,
+    precompress_outputs,
+)
+from travel_log.website.build_manifest import BuildManifest, fingerprint
+
+
+def test_minify_css():
+    css = '''
+    /* Comment */
+    a :hover, b > c {
+        content: "  keep  ;  this  ";
+        color: #fff;
+    }
+    '''
+
+    assert minify_css(css) == 'a :hover,b>c{content:"  keep  ;  this  ";color:#fff}'
+
+
+def test_minify_js():
+    js = '''/*! License */
+    // Comment
+    const pattern = /[/"]+/g  // Trailing comment
+    const text = `  ${value} // not a comment  `
+
+    function half(value) {
+        /* Inner
+           comment */
+        return value / 2 /* divided */ / 1
+    }
+    '''
+
+    assert minify_js(js) == (
+        '/*! License */\n'
+        'const pattern = /[/"]+/g\n'
+        'const text = `  ${value} // not a comment  `\n'
+        'function half(value) {\n'
+        'return value / 2 / 1\n'
+        '}'
+    )
+
+
+def test_minify_js_regular_expressions_after_keywords():
+    js = '''function matches(text) {
+        if (typeof /a/ === 'object') return /  ['"]  /.test(text)
+        return text.in / 2 + (/  x  /g).source
+    }
+    '''
+
+    assert minify_js(js) == (
+        'function matches(text) {\n'
+        "if (typeof /a/ === 'object') return /  ['\"]  /.test(text)\n"
+        'return text.in / 2 + (/  x  /g).source\n'
+        '}'
+    )
+
+
+def build(folder, manifest_path, static_folder):
+    manifest = BuildManifest.load(str(folder), str(manifest_path))
+    asset_urls = build_static_assets(manifest, str(static_folder))
+    written = precompress_outputs(manifest)
+    manifest.remove_stale_outputs()
+    manifest.save()
+
+    return manifest, asset_urls, written
+
+
+def test_static_assets_are_fingerprinted_and_referenced(tmp_path):
+    static_folder = tmp_path / 'static'
+    os.makedirs(static_folder / 'images')
+    os.makedirs(static_folder / 'js')
+    (static_folder / 'images' / 'pin.png').write_bytes(b'png')
+    (static_folder / 'js' / 'scripts.js').write_text("icon('images/pin.png')\n")
+
+    manifest, asset_urls, written = build(tmp_path / 'website', tmp_path / 'm.json', static_folder)
+    script_path = manifest.output_path(asset_urls['js/scripts.js'])
+
+    assert asset_urls['images/pin.png'].startswith('images/pin.')
+    assert open(script_path).read() == f"icon('{asset_urls['images/pin.png']}')"
+    assert gzip.open(f'{script_path}.gz').read() == open(script_path, 'rb').read()
+    assert f'{asset_urls["js/scripts.js"]}.gz' in written
+
+    # Unchanged: nothing is written again
+    _, same_asset_urls, written = build(tmp_path / 'website', tmp_path / 'm.json', static_folder)
+
+    assert same_asset_urls == asset_urls
+    assert written == []
+
+    # A referenced file changed: the files referencing it are renamed too
+    (static_folder / 'images' / 'pin.png').write_bytes(b'new png')
+    manifest, new_asset_urls, _ = build(tmp_path / 'website', tmp_path / 'm.json', static_folder)
+
+    assert new_asset_urls['js/scripts.js'] != asset_urls['js/scripts.js']
+    assert not os.path.exists(script_path)
+    assert not os.path.exists(f'{script_path}.gz')
+
+
+def test_only_text_outputs_are_precompressed(tmp_path):
+    manifest = BuildManifest(str(tmp_path), str(tmp_path / 'm.json'))
+
+    for output in ('index.html', 'picture.jpeg'):
+        (tmp_path / output).write_text('content')
+        manifest.record(output, fingerprint(output))
+
+    assert [output for output in precompress_outputs(manifest) if 'picture' in output] == []
+    assert os.path.exists(tmp_path / 'index.html.gz')
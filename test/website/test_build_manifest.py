@@ -0,0 +1,60 @@
+import os
+
+from travel_log.website.build_manifest import BuildManifest, fingerprint
+
+
+def build(folder, manifest_path, outputs):
+    manifest = BuildManifest.load(str(folder), str(manifest_path))
+    written = []
+
+    for output, content in outputs.items():
+        output_fingerprint = fingerprint(content)
+
+        if manifest.is_fresh(output, output_fingerprint):
+            continue
+
+        os.makedirs(os.path.dirname(manifest.output_path(output)), exist_ok=True)
+        with open(manifest.output_path(output), 'w') as file:
+            file.write(content)
+
+        manifest.record(output, output_fingerprint)
+        written.append(output)
+
+    removed = manifest.remove_stale_outputs()
+    manifest.save()
+
+    return written, removed
+
+
+def test_only_changed_outputs_are_written(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    folder = tmp_path / 'website'
+
+    build(folder, manifest_path, {'a/1.txt': 'one', 'a/2.txt': 'two'})
+    written, removed = build(folder, manifest_path, {'a/1.txt': 'one', 'a/2.txt': 'changed'})
+
+    assert written == ['a/2.txt']
+    assert removed == []
+
+
+def test_outputs_are_written_again_if_deleted(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    folder = tmp_path / 'website'
+
+    build(folder, manifest_path, {'a/1.txt': 'one'})
+    os.remove(folder / 'a' / '1.txt')
+    written, _ = build(folder, manifest_path, {'a/1.txt': 'one'})
+
+    assert written == ['a/1.txt']
+
+
+def test_outputs_without_inputs_are_removed(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    folder = tmp_path / 'website'
+
+    build(folder, manifest_path, {'a/1.txt': 'one', 'b/2.txt': 'two'})
+    written, removed = build(folder, manifest_path, {'a/1.txt': 'one'})
+
+    assert written == []
+    assert removed == ['b/2.txt']
+    assert os.listdir(folder) == ['a']
@@ -0,0 +1,47 @@
+import logging
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from pytest import fixture, raises
+from travel_log.website.dev_server import LIVE_RELOAD_PATH, LIVE_RELOAD_SCRIPT, DevServer
+
+
+@fixture
+def server(tmp_path):
+    (tmp_path / 'index.html').write_text('<html><body>Trip</body></html>')
+    (tmp_path / 'data.json').write_text('{"body": "</body>"}')
+
+    server = DevServer(str(tmp_path), port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_live_reload_is_injected_in_pages_only(server):
+    with urlopen(server.url) as response:
+        assert response.read().decode() == f'<html><body>Trip{LIVE_RELOAD_SCRIPT}</body></html>'
+
+    with urlopen(f'{server.url}data.json') as response:
+        assert response.read().decode() == '{"body": "</body>"}'
+
+
+def test_pages_are_reloaded_after_a_rebuild(server):
+    with urlopen(f'{server.url.rstrip("/")}{LIVE_RELOAD_PATH}', timeout=5) as response:
+        threading.Timer(0.1, server.reload).start()
+
+        assert response.readline() == b'data: reload\n'
+
+
+def test_errors_are_logged(server, caplog):
+    with caplog.at_level(logging.DEBUG, logger='travel_log.website.dev_server'):
+        with urlopen(server.url):
+            pass
+
+        with raises(HTTPError):
+            urlopen(f'{server.url}missing.html')
+
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == 'WARNING']
+
+    assert len(warnings) == 1
+    assert 'code 404' in warnings[0]
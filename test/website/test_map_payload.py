@@ -0,0 +1,88 @@
+from pytest import fixture
+from travel_log.models.privacy_zone import PrivacyZone
+from travel_log.models.privacy_zone_index import PrivacyZoneIndex
+from travel_log.parsers.trip_day_parser import TripDayParser
+from travel_log.website.map_payload import trip_day_payload, trip_payload
+from travel_log.website.track_export import track_payload
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def trip_day():
+    return TripDayParser.parse_folder(path_on_sample_project('2021-05-07'))
+
+
+@fixture
+def privacy_zone_index():
+    return PrivacyZoneIndex([PrivacyZone('Ristafallet waterfall', 63.3123834, 13.3511221, 3)])
+
+
+def test_trip_day_payload(trip_day, privacy_zone_index):
+    payload = trip_day_payload(trip_day, privacy_zone_index, tolerance=5)
+
+    assert payload['date'] == '2021-05-07'
+    assert len(payload['pictures']) == len(trip_day.pictures)
+    assert payload['pictures'][0]['thumbnail'].startswith('pictures/2021-05-07/thumbnail/')
+    assert [track['name'] for track in payload['tracks']] == [
+        track.filename for track in trip_day.tracks
+    ]
+
+    (south, west), (north, east) = payload['bounds']
+
+    for picture in payload['pictures']:
+        assert south <= picture['lat'] <= north
+        assert west <= picture['lng'] <= east
+
+    for track in payload['tracks']:
+        if track['bounds']:
+            assert south <= track['bounds'][0][0] and track['bounds'][1][0] <= north
+            assert west <= track['bounds'][0][1] and track['bounds'][1][1] <= east
+
+
+def test_ignored_coordinates_have_no_marker(trip_day, privacy_zone_index):
+    trip_day.pictures[0].ignore_exif_coordinates()
+
+    payload = trip_day_payload(trip_day, privacy_zone_index, tolerance=5)
+
+    assert len(payload['pictures']) == len(trip_day.pictures) - 1
+    assert trip_day.pictures[0].filename not in str(payload['pictures'])
+
+
+def test_track_fully_inside_privacy_zone_has_no_geometry(trip_day, privacy_zone_index):
+    payload = trip_day_payload(trip_day, privacy_zone_index, tolerance=5)
+    hike2 = next(track for track in payload['tracks'] if track['name'] == 'hike2.gpx')
+
+    assert hike2['segments'] == []
+    assert hike2['bounds'] is None
+
+
+def test_tracks_crossing_a_privacy_zone_are_split(trip_day):
+    track = next(track for track in trip_day.tracks if track.filename == 'hike1.gpx')
+    segment = track.segments[0]
+    middle = len(segment) // 2
+    privacy_zone_index = PrivacyZoneIndex(
+        [PrivacyZone('Middle', segment.latitudes[middle], segment.longitudes[middle], 0.05)]
+    )
+    inside = privacy_zone_index.points_inside_mask(segment.latitudes, segment.longitudes)
+
+    # The runs of points outside the privacy zone
+    runs = sum(
+        1
+        for index, is_inside in enumerate(inside)
+        if not is_inside and (index == 0 or inside[index - 1])
+    )
+    payload = track_payload(track, privacy_zone_index, tolerance=5)
+
+    assert inside[middle] and runs > 1
+    assert len(payload['segments']) == runs + len(track.segments) - 1
+
+
+def test_trip_payload(trip_day, privacy_zone_index):
+    day_payload = trip_day_payload(trip_day, privacy_zone_index, tolerance=5)
+
+    payload = trip_payload([day_payload])
+
+    assert payload['days'][0]['tracks'] == day_payload['tracks']
+    assert 'pictures' not in payload['days'][0]
+    assert payload['bounds'] is not None
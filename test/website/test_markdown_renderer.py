@@ -0,0 +1,47 @@
+import json
+
+from travel_log.website.markdown_renderer import MarkdownRenderer
+
+
+def test_outputs_are_memoized_between_runs(tmp_path):
+    path = str(tmp_path / 'markdown.json')
+
+    renderer = MarkdownRenderer.load(path)
+    assert renderer.render('A *long* journal') == '<p>A <em>long</em> journal</p>'
+    assert renderer.render('A *long* journal') == '<p>A <em>long</em> journal</p>'
+    renderer.save()
+
+    assert (renderer.hits, renderer.misses) == (1, 1)
+
+    renderer = MarkdownRenderer.load(path)
+    assert renderer.render('A *long* journal') == '<p>A <em>long</em> journal</p>'
+    assert (renderer.hits, renderer.misses) == (1, 0)
+
+
+def test_unused_outputs_are_not_saved_again(tmp_path):
+    path = str(tmp_path / 'markdown.json')
+
+    renderer = MarkdownRenderer.load(path)
+    renderer.render('one')
+    renderer.render('two')
+    renderer.save()
+
+    renderer = MarkdownRenderer.load(path)
+    renderer.render('two')
+    renderer.save()
+
+    with open(path) as file:
+        assert list(json.load(file)['entries'].values()) == ['<p>two</p>']
+
+
+def test_cache_is_discarded_if_the_extensions_change(tmp_path):
+    path = str(tmp_path / 'markdown.json')
+
+    renderer = MarkdownRenderer.load(path)
+    renderer.render('| a |\n|---|\n| b |')
+    renderer.save()
+
+    renderer = MarkdownRenderer.load(path, extensions=['tables'])
+
+    assert '<table>' in renderer.render('| a |\n|---|\n| b |')
+    assert renderer.misses == 1
@@ -0,0 +1,92 @@
+import os
+
+from pytest import fixture
+from travel_log.parsers.trip_parser import TripParser
+from travel_log.utils.build_profiler import BuildProfiler
+from travel_log.website.build_manifest import BuildManifest
+from travel_log.website.page_renderer import Page, PageRenderer
+from travel_log.website.website_generator import render_pages_to_files
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def templates_folder(tmp_path):
+    folder = tmp_path / 'templates'
+    folder.mkdir()
+    (folder / 'day.html').write_text('{% for item in items %}{{ item }}{% endfor %}')
+
+    return str(folder)
+
+
+def build(tmp_path, renderer, pages, jobs=1):
+    manifest = BuildManifest.load(str(tmp_path / 'website'), str(tmp_path / 'manifest.json'))
+    os.makedirs(manifest.folder_path, exist_ok=True)
+
+    written = renderer.render_pages(pages, manifest, max_workers=jobs)
+    manifest.save()
+
+    return sorted(written)
+
+
+def test_only_changed_pages_are_written(tmp_path, templates_folder):
+    renderer = PageRenderer(templates_folder, str(tmp_path / 'bytecode'))
+    pages = [Page(f'{day}.html', 'day.html', {'items': [day, 'x']}) for day in range(4)]
+
+    assert build(tmp_path, renderer, pages, jobs=4) == [f'{day}.html' for day in range(4)]
+
+    pages[2].context['items'] = ['changed']
+
+    assert build(tmp_path, renderer, pages, jobs=4) == ['2.html']
+    assert (tmp_path / 'website' / '2.html').read_text() == 'changed'
+    assert not [name for name in os.listdir(tmp_path / 'website') if name.endswith('.tmp')]
+
+
+def test_templates_are_compiled_once(tmp_path, templates_folder):
+    bytecode_folder = tmp_path / 'bytecode'
+    page = Page('index.html', 'day.html', {'items': [1, 2]})
+
+    build(tmp_path, PageRenderer(templates_folder, str(bytecode_folder)), [page])
+
+    assert len(os.listdir(bytecode_folder)) == 1
+
+
+def test_one_page_per_day(tmp_path):
+    trip = TripParser.parse_folder(path_on_sample_project(''))
+    manifest = BuildManifest(str(tmp_path), str(tmp_path / 'manifest.json'))
+
+    render_pages_to_files(str(tmp_path), trip, manifest, page_per_day=True, jobs=2)
+
+    index = (tmp_path / 'index.html').read_text()
+    day_page = (tmp_path / f'{trip.trip_days[0].date_iso}.html').read_text()
+
+    for trip_day in trip.trip_days:
+        assert f'href="{trip_day.date_iso}.html"' in index
+        assert f'id="day-{trip_day.date}"' not in index
+
+    assert f'id="day-{trip.trip_days[0].date}"' in day_page
+    assert 'href="index.html#summary"' in day_page
+
+
+def test_pages_are_profiled(tmp_path, templates_folder):
+    renderer = PageRenderer(templates_folder)
+    pages = [Page(f'{day}.html', 'day.html', {'items': [day]}) for day in range(3)]
+    profiler = BuildProfiler()
+
+    for jobs in (1, 3):
+        manifest = BuildManifest.load(str(tmp_path / 'website'), str(tmp_path / 'manifest.json'))
+        os.makedirs(manifest.folder_path, exist_ok=True)
+        renderer.render_pages(pages, manifest, max_workers=jobs, profiler=profiler)
+        manifest.save()
+
+    stage = profiler.report()['stages']['render']
+
+    assert stage['counters'] == {
+        'bytes': 3,
+        'files': 3,
+        'markdown_hits': 0,
+        'markdown_misses': 0,
+        'unchanged': 3,
+    }
+    assert sorted(stage['assets']) == ['0.html', '1.html', '2.html']
+    assert all(asset['calls'] == 2 for asset in stage['assets'].values())
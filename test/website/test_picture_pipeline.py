@@ -0,0 +1,89 @@
+import os
+
+from PIL import Image
+from pytest import fixture
+from travel_log.assets.pictures.exif_reader import TAG_GPS_IFD
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import DEFAULT_RENDITIONS
+from travel_log.assets.pictures.rendition_cache import EXIF_POLICY_KEEP, EXIF_POLICY_STRIP_GPS
+from travel_log.website.picture_pipeline import (
+    PictureContext,
+    PictureJob,
+    PictureJobResult,
+    PictureProcessingError,
+    run_picture_jobs,
+)
+
+from test.conftest import path_on_sample_project
+
+
+@fixture
+def context():
+    return PictureContext()
+
+
+def make_job(tmp_path, picture_path, exif_policy=EXIF_POLICY_KEEP):
+    for rendition in DEFAULT_RENDITIONS:
+        os.makedirs(tmp_path / rendition.name, exist_ok=True)
+
+    return PictureJob(picture_path, str(tmp_path), exif_policy=exif_policy)
+
+
+def test_results_keep_the_order_of_the_jobs(tmp_path, context):
+    paths = [
+        path_on_sample_project('2021-05-07/day5-p1.jpeg'),
+        path_on_sample_project('2021-05-07/day5-p3.jpeg'),
+        path_on_sample_project('2021-05-06/day4-p1.jpeg'),
+    ]
+
+    policies = [EXIF_POLICY_STRIP_GPS, EXIF_POLICY_KEEP, EXIF_POLICY_KEEP]
+    jobs = [
+        make_job(tmp_path / str(index), path, policy)
+        for index, (path, policy) in enumerate(zip(paths, policies))
+    ]
+
+    results = run_picture_jobs(context, jobs, max_workers=2)
+
+    assert [result.picture_path for result in results] == paths
+    assert not any(result.error for result in results)
+
+    for job in jobs:
+        for rendition in DEFAULT_RENDITIONS:
+            has_coordinates = bool(Picture(job.picture_path).coordinates)
+
+            with Image.open(job.output_path(rendition)) as output:
+                assert output.format == rendition.image_format
+                exif = output.getexif()
+
+            keeps_coordinates = has_coordinates and job.exif_policy == EXIF_POLICY_KEEP
+
+            assert (TAG_GPS_IFD in exif) == keeps_coordinates
+            # The rest of the EXIF metadata is kept
+            assert exif
+
+
+def test_errors_are_collected_per_picture(tmp_path, context):
+    paths = [
+        path_on_sample_project('2021-05-07/missing.jpeg'),
+        path_on_sample_project('2021-05-07/day5-p3.jpeg'),
+    ]
+
+    results = run_picture_jobs(context, [make_job(tmp_path, path) for path in paths], max_workers=2)
+
+    assert 'FileNotFoundError' in results[0].error
+    assert results[0].error_repr.startswith('FileNotFoundError(')
+    assert results[1].error is None
+
+
+def test_errors_without_a_traceback_are_described_by_their_repr():
+    error = PictureProcessingError(
+        [
+            PictureJobResult('p1.jpeg', error='Traceback:\nOSError: broken\n'),
+            PictureJobResult('p2.jpeg', error='', error_repr="OSError('truncated')"),
+        ]
+    )
+
+    assert str(error).splitlines()[1:] == [
+        '* p1.jpeg: OSError: broken',
+        "* p2.jpeg: OSError('truncated')",
+    ]
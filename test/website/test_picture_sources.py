@@ -0,0 +1,38 @@
+from travel_log.assets.pictures.picture import Picture
+from travel_log.assets.pictures.picture_resizer import THUMBNAIL, responsive_renditions
+from travel_log.website.picture_sources import PictureSources
+
+from test.conftest import path_on_sample_project
+
+
+def test_srcset():
+    # 1024x576
+    picture = Picture(path_on_sample_project('2021-05-07/day5-p1.jpeg'))
+    sources = PictureSources(responsive_renditions(widths=(640, 1200)))
+
+    assert sources.formats == ['WEBP']
+    assert sources.size(picture) == (150, 84)
+    assert sources.url(picture, '2021-05-07') == 'pictures/2021-05-07/thumbnail/day5-p1.jpeg'
+
+    # The 1200 and 1600 renditions are not bigger than the original
+    assert sources.srcset(picture, '2021-05-07', 'WEBP') == (
+        'pictures/2021-05-07/webp-150/day5-p1.jpeg.webp 150w, '
+        'pictures/2021-05-07/webp-640/day5-p1.jpeg.webp 640w, '
+        'pictures/2021-05-07/webp-1200/day5-p1.jpeg.webp 1024w'
+    )
+    assert sources.srcset(picture, '2021-05-07', 'JPEG') == (
+        'pictures/2021-05-07/thumbnail/day5-p1.jpeg 150w, '
+        'pictures/2021-05-07/full/day5-p1.jpeg 1024w'
+    )
+
+
+def test_responsive_renditions_are_between_the_thumbnail_and_the_full_size():
+    renditions = responsive_renditions(widths=(100, 640, 2000))
+
+    assert [rendition.name for rendition in renditions] == [
+        'full',
+        THUMBNAIL.name,
+        'webp-150',
+        'webp-640',
+        'webp-1600',
+    ]
@@ -0,0 +1,76 @@
+import filecmp
+
+from pytest import raises
+from travel_log.models import trip as trip_module
+from travel_log.parsers.trip_parser import TripParser
+from travel_log.utils.memory_utils import MemoryLimitExceeded
+from travel_log.website.website_generator import generate_website, generate_website_streaming
+
+from test.conftest import path_on_sample_project
+
+
+def compare_folders(left, right):
+    comparison = filecmp.dircmp(left, right)
+    differences = comparison.left_only + comparison.right_only + comparison.diff_files
+
+    for subfolder in comparison.common_dirs:
+        differences += compare_folders(f'{left}/{subfolder}', f'{right}/{subfolder}')
+
+    return differences
+
+
+def test_streaming_build_gives_the_same_website(tmp_path):
+    trip_folder = path_on_sample_project('')
+    options = {'publish_gpx': True, 'precompress': False}
+
+    generate_website(
+        TripParser.parse_folder(trip_folder),
+        str(tmp_path / 'website'),
+        str(tmp_path / 'cache'),
+        page_per_day=True,
+        **options,
+    )
+    generate_website_streaming(
+        TripParser.stream_folder(trip_folder),
+        str(tmp_path / 'streamed'),
+        str(tmp_path / 'cache'),
+        **options,
+    )
+
+    assert compare_folders(str(tmp_path / 'website'), str(tmp_path / 'streamed')) == []
+
+
+def test_streaming_build_fails_over_the_memory_limit(tmp_path):
+    with raises(MemoryLimitExceeded, match='2021-05-03'):
+        generate_website_streaming(
+            TripParser.stream_folder(path_on_sample_project('')),
+            str(tmp_path / 'website'),
+            str(tmp_path / 'cache'),
+            precompress=False,
+            memory_limit=1024 * 1024,
+        )
+
+
+def test_streaming_build_builds_the_indexes_once(tmp_path, monkeypatch):
+    built = []
+
+    def counted(index_class):
+        def build(*args, **kwargs):
+            built.append(index_class.__name__)
+            return index_class(*args, **kwargs)
+
+        return build
+
+    monkeypatch.setattr(trip_module, 'PrivacyZoneIndex', counted(trip_module.PrivacyZoneIndex))
+    monkeypatch.setattr(trip_module, 'HighlightIndex', counted(trip_module.HighlightIndex))
+
+    trip_stream = TripParser.stream_folder(path_on_sample_project(''))
+    generate_website_streaming(
+        trip_stream, str(tmp_path / 'website'), str(tmp_path / 'cache'), precompress=False
+    )
+    days_with_highlights = len({highlight.from_date for highlight in trip_stream.highlights})
+
+    assert built.count('PrivacyZoneIndex') == 1
+    # Again only after a day with new highlights
+    assert built.count('HighlightIndex') <= days_with_highlights + 1
+    assert days_with_highlights < len(trip_stream.dates)